@@ -0,0 +1,101 @@
+"""
+Adaptive trial counts
+Runs the trials of a configuration until the means of the rules are known precisely enough,
+instead of a fixed number of trials: after each trial, the confidence intervals of the mean
+metrics (e.g., "top" and "topn") of every rule, or of the differences between every two rules,
+are compared with a target width, up to a maximum number of trials.
+
+All the rules of a trial are evaluated on the same profile (see
+compsoc.evaluate.evaluate_voting_rules), so the differences between two rules are paired: the
+variance of the profiles cancels out, and the intervals of the differences, which decide the
+ranking of the rules, are often much narrower than the intervals of the means.
+"""
+
+from itertools import combinations
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from compsoc.aggregate import ResultAggregator
+
+# Stopping criteria: the intervals of the means of the rules, or of their pairwise differences
+CRITERIA = ("means", "differences")
+
+
+def paired_differences(result: Dict[str, Dict[str, float]],
+                       metrics: Iterable[str] = ("top", "topn")) -> Dict[str, Dict[str, float]]:
+    """
+    Computes the differences of the metrics between every two rules of a trial.
+
+    :param result: The metrics of each rule in the trial.
+    :type result: Dict[str, Dict[str, float]]
+    :param metrics: The metrics, defaults to ("top", "topn").
+    :type metrics: Iterable[str], optional
+    :return: The differences, keyed by "<rule> - <other rule>", in the order of the rules.
+    :rtype: Dict[str, Dict[str, float]]
+    """
+    metrics = list(metrics)
+    return {f"{rule} - {other}": {metric: result[rule][metric] - result[other][metric] for metric in metrics}
+            for rule, other in combinations(result, 2)}
+
+
+def max_half_width(results: ResultAggregator, metrics: Iterable[str] = ("top", "topn"),
+                   confidence: float = 0.95) -> float:
+    """
+    Returns the largest half-width of the confidence intervals of the means of the metrics over
+    the rules, see ResultAggregator.half_width.
+
+    :param results: The aggregated trials.
+    :type results: ResultAggregator
+    :param metrics: The metrics, defaults to ("top", "topn").
+    :type metrics: Iterable[str], optional
+    :param confidence: The confidence level, defaults to 0.95.
+    :type confidence: float, optional
+    :return: The largest half-width, 0 without any rule.
+    :rtype: float
+    """
+    metrics = list(metrics)
+    return max((results.half_width(rule, metric, confidence) for rule in results.rules for metric in metrics),
+               default=0.)
+
+
+def run_adaptive(trial: Callable[[int], Dict[str, Dict[str, float]]], width: float,
+                 metrics: Iterable[str] = ("top", "topn"), criterion: str = "means", confidence: float = 0.95,
+                 min_trials: int = 10, max_trials: int = 1000,
+                 results: Optional[ResultAggregator] = None) -> Tuple[ResultAggregator, ResultAggregator]:
+    """
+    Runs trials until the confidence intervals of the criterion are narrower than the target
+    width, or max_trials trials ran.
+
+    :param trial: Runs the trial of the given index, e.g., evaluate_voting_rules with the index as
+                  the seed, and returns the metrics of each rule.
+    :type trial: Callable[[int], Dict[str, Dict[str, float]]]
+    :param width: The target width of the intervals, twice their half-width.
+    :type width: float
+    :param metrics: The metrics, defaults to ("top", "topn").
+    :type metrics: Iterable[str], optional
+    :param criterion: "means" for the intervals of the mean of each rule, or "differences" for the
+                      intervals of the mean difference between every two rules, defaults to "means".
+    :type criterion: str, optional
+    :param confidence: The confidence level of the intervals, defaults to 0.95.
+    :type confidence: float, optional
+    :param min_trials: The minimum number of trials, for reliable variances, defaults to 10.
+    :type min_trials: int, optional
+    :param max_trials: The maximum number of trials, defaults to 1000.
+    :type max_trials: int, optional
+    :param results: The aggregator of the trials, e.g., with the telemetry, defaults to None: a new one.
+    :type results: ResultAggregator, optional
+    :return: The aggregated trials, and the aggregated paired differences between the rules.
+    :rtype: Tuple[ResultAggregator, ResultAggregator]
+    """
+    if criterion not in CRITERIA:
+        raise ValueError(f"Unknown criterion: {criterion}, expected one of {', '.join(CRITERIA)}")
+    metrics = list(metrics)
+    results = results if results is not None else ResultAggregator()
+    differences = ResultAggregator()
+    watched = results if criterion == "means" else differences
+    for index in range(max_trials):
+        result = trial(index)
+        results.add(result)
+        differences.add(paired_differences(result, metrics))
+        if index + 1 >= min_trials and 2 * max_half_width(watched, metrics, confidence) <= width:
+            break
+    return results, differences
@@ -0,0 +1,212 @@
+"""
+Result aggregation
+Online statistics of the results of the trials of an evaluation (see
+compsoc.evaluate.evaluate_voting_rules): for each rule and metric, the number of trials, the mean
+and the sum of the squared deviations from the mean (Welford's algorithm), the minimum and the
+maximum. Results are consumed as they arrive, in constant memory whatever the number of trials,
+and the aggregators of separate runs can be merged.
+"""
+
+import math
+import numbers
+from statistics import NormalDist
+from typing import Dict, Iterable, List, Optional
+
+
+def t_quantile(probability: float, degrees: int) -> float:
+    """
+    Returns the quantile of Student's t distribution, by the Cornish-Fisher expansion around the
+    normal quantile, within 3e-3 from 5 degrees of freedom and 1e-3 from 8.
+
+    :param probability: The probability, in ]0, 1[.
+    :type probability: float
+    :param degrees: The degrees of freedom.
+    :type degrees: int
+    :return: The quantile.
+    :rtype: float
+    """
+    z = NormalDist().inv_cdf(probability)
+    return (z + (z ** 3 + z) / (4 * degrees) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * degrees ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * degrees ** 3))
+
+
+class _Moments:
+    """
+    The running statistics of one metric of one rule.
+    """
+
+    __slots__ = ("count", "mean", "m2", "minimum", "maximum")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.
+        self.m2 = 0.
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other: "_Moments"):
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+
+class ResultAggregator:
+    """
+    Aggregates the results of trials, each a dictionary of metrics (e.g., "top", "topn",
+    "wall_time") by rule, as returned by compsoc.evaluate.evaluate_voting_rules.
+
+    Attributes:
+        moments (Dict[str, Dict[str, _Moments]]): The running statistics by rule and metric, in
+            the order the rules and metrics first appeared.
+    """
+
+    def __init__(self, results: Optional[Iterable[Dict[str, Dict[str, float]]]] = None):
+        """
+        Initializes an aggregator, optionally with the results of some trials.
+
+        :param results: The results of trials, defaults to None.
+        :type results: Iterable[Dict[str, Dict[str, float]]], optional
+        """
+        self.moments: Dict[str, Dict[str, _Moments]] = {}
+        for result in results or ():
+            self.add(result)
+
+    def add(self, result: Dict[str, Dict[str, float]]) -> "ResultAggregator":
+        """
+        Adds the result of a trial. Real values, including NumPy scalars, are aggregated; other
+        values, e.g., booleans, are ignored.
+
+        :param result: The metrics of each rule in the trial.
+        :type result: Dict[str, Dict[str, float]]
+        :return: The aggregator.
+        :rtype: ResultAggregator
+        """
+        for rule, metrics in result.items():
+            rule_moments = self.moments.setdefault(rule, {})
+            for metric, value in metrics.items():
+                if isinstance(value, numbers.Real) and not isinstance(value, bool):
+                    moments = rule_moments.get(metric)
+                    if moments is None:
+                        moments = rule_moments[metric] = _Moments()
+                    moments.add(float(value))
+        return self
+
+    def merge(self, other: "ResultAggregator") -> "ResultAggregator":
+        """
+        Adds the trials of another aggregator, as if their results had been added one by one.
+
+        :param other: The other aggregator.
+        :type other: ResultAggregator
+        :return: The aggregator.
+        :rtype: ResultAggregator
+        """
+        for rule, metrics in other.moments.items():
+            rule_moments = self.moments.setdefault(rule, {})
+            for metric, moments in metrics.items():
+                rule_moments.setdefault(metric, _Moments()).merge(moments)
+        return self
+
+    @property
+    def rules(self) -> List[str]:
+        """
+        The rules, in the order they first appeared.
+        """
+        return list(self.moments)
+
+    def count(self, rule: str, metric: str) -> int:
+        """
+        Returns the number of trials of a rule with a metric.
+        """
+        return self.moments[rule][metric].count
+
+    def mean(self, rule: str, metric: str) -> float:
+        """
+        Returns the mean of a metric of a rule over the trials.
+        """
+        return self.moments[rule][metric].mean
+
+    def total(self, rule: str, metric: str) -> float:
+        """
+        Returns the sum of a metric of a rule over the trials.
+        """
+        moments = self.moments[rule][metric]
+        return moments.mean * moments.count
+
+    def variance(self, rule: str, metric: str) -> float:
+        """
+        Returns the sample variance of a metric of a rule over the trials, NaN for a single trial.
+        """
+        moments = self.moments[rule][metric]
+        return moments.m2 / (moments.count - 1) if moments.count > 1 else math.nan
+
+    def std(self, rule: str, metric: str) -> float:
+        """
+        Returns the sample standard deviation of a metric of a rule over the trials.
+        """
+        return math.sqrt(self.variance(rule, metric))
+
+    def half_width(self, rule: str, metric: str, confidence: float = 0.95) -> float:
+        """
+        Returns the half-width of the confidence interval of the mean of a metric of a rule, from
+        Student's t distribution, infinite for a single trial.
+
+        :param rule: The rule.
+        :type rule: str
+        :param metric: The metric.
+        :type metric: str
+        :param confidence: The confidence level, defaults to 0.95.
+        :type confidence: float, optional
+        :return: The half-width of the interval.
+        :rtype: float
+        """
+        count = self.count(rule, metric)
+        if count < 2:
+            return math.inf
+        return t_quantile((1 + confidence) / 2, count - 1) * self.std(rule, metric) / math.sqrt(count)
+
+    def minimum(self, rule: str, metric: str) -> float:
+        """
+        Returns the minimum of a metric of a rule over the trials.
+        """
+        return self.moments[rule][metric].minimum
+
+    def maximum(self, rule: str, metric: str) -> float:
+        """
+        Returns the maximum of a metric of a rule over the trials.
+        """
+        return self.moments[rule][metric].maximum
+
+    def summary(self, metrics: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Summarizes the trials, with the mean and the standard deviation of each metric.
+
+        :param metrics: The metrics to summarize, defaults to all.
+        :type metrics: List[str], optional
+        :return: For each rule, the number of trials ("trials"), and "<metric>_mean" and
+                 "<metric>_std" for each metric.
+        :rtype: Dict[str, Dict[str, float]]
+        """
+        summary = {}
+        for rule, rule_moments in self.moments.items():
+            rule_summary = {"trials": max((m.count for m in rule_moments.values()), default=0)}
+            for metric in rule_moments if metrics is None else metrics:
+                rule_summary[f"{metric}_mean"] = self.mean(rule, metric)
+                rule_summary[f"{metric}_std"] = self.std(rule, metric)
+            summary[rule] = rule_summary
+        return summary
@@ -0,0 +1,477 @@
+"""
+Axioms
+Checks whether voting rules satisfy axiomatic properties on profiles. Anonymity and neutrality
+are tested by relabeling the arrays of a profile (its ballots and net preference matrix) rather
+than building a new profile for every permutation. Monotonicity and participation are tested by
+applying single-ballot perturbations as delta updates of the pairwise and positional tallies.
+Pareto optimality and unanimity are checked on a ranking against the Pareto dominance matrix of
+the profile, which is computed once per profile.
+
+Rules whose score of a candidate only depends on the positions of that candidate, or on its own
+row of the net preference matrix, can set a truthy `local` attribute (e.g., Borda or Copeland).
+When a perturbation only moves a few candidates, only these candidates are then scored again.
+"""
+
+import random
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from compsoc.profile import Profile
+from compsoc.voter_model import get_profile_from_model
+
+OUTCOMES = ("winners", "scores")
+
+
+def _outcome(profile: Profile, rule: Callable[[Profile, int], any], outcome: str):
+    """
+    Returns the outcome of a rule on a profile: the set of winners, or the scores by candidate.
+    """
+    if outcome == "winners":
+        return profile.winners(rule)
+    if outcome == "scores":
+        return dict(profile.score(rule))
+    raise ValueError(f"Unknown outcome: {outcome}, expected one of {OUTCOMES}")
+
+
+def _same_scores(scores1: dict, scores2: dict) -> bool:
+    return scores1.keys() == scores2.keys() and \
+        all(np.isclose(float(scores1[c]), float(scores2[c])) for c in scores1)
+
+
+def _pairs_from_ragged(entries: np.ndarray, offsets: np.ndarray, counts: np.ndarray) -> list:
+    """
+    Converts ragged ballots (see Profile._ragged_ballots) back to a list of pairs, in the order of
+    the ballots.
+    """
+    entries, offsets = entries.tolist(), offsets.tolist()
+    return [(count, tuple(entries[offsets[i]:offsets[i + 1]])) for i, count in enumerate(counts.tolist())]
+
+
+def _take_ballots(entries: np.ndarray, offsets: np.ndarray, counts: np.ndarray,
+                  order: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Reorders ragged ballots (see Profile._ragged_ballots).
+    """
+    lengths = np.diff(offsets)[order]
+    new_offsets = np.concatenate(([0], np.cumsum(lengths)))
+    starts = np.repeat(offsets[:-1][order] - new_offsets[:-1], lengths)
+    return entries[starts + np.arange(new_offsets[-1])], new_offsets, counts[order]
+
+
+def candidate_permutations(num_candidates: int, num_permutations: int,
+                           rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    Draws random permutations of the candidates, one per row.
+
+    :param num_candidates: The number of candidates.
+    :type num_candidates: int
+    :param num_permutations: The number of permutations.
+    :type num_permutations: int
+    :param rng: The random generator, defaults to a new one.
+    :type rng: np.random.Generator, optional
+    :return: A (num_permutations x num_candidates) array, where row k maps candidate c to [k, c].
+    :rtype: np.ndarray
+    """
+    rng = rng or np.random.default_rng()
+    return rng.permuted(np.tile(np.arange(num_candidates), (num_permutations, 1)), axis=1)
+
+
+def relabel_candidates(profile: Profile, permutations: np.ndarray) -> List[Profile]:
+    """
+    Relabels the candidates of a profile with a batch of permutations. The ballots of all the
+    permutations are relabeled at once, and the net preference matrix and the votes per candidate
+    are permuted instead of being recomputed from the ballots.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param permutations: The permutations, one per row, mapping candidate c to [k, c].
+    :type permutations: np.ndarray
+    :return: The relabeled profiles, one per permutation.
+    :rtype: List[Profile]
+    """
+    entries, offsets, counts = profile._ragged_ballots()
+    net_preference = profile._net_preference_matrix()
+    relabeled = permutations[:, entries]
+    profiles = []
+    for permutation, relabeled_entries in zip(permutations, relabeled):
+        inverse = np.argsort(permutation)
+        pairs = set(_pairs_from_ragged(relabeled_entries, offsets, counts))
+        votes_per_candidate = [profile.votes_per_candidate[c] for c in inverse.tolist()]
+        profiles.append(profile._derive(pairs, net_preference[np.ix_(inverse, inverse)],
+                                        votes_per_candidate))
+    return profiles
+
+
+def reorder_voters(profile: Profile, orders: np.ndarray) -> List[Profile]:
+    """
+    Reorders the ballots of a profile with a batch of orders. Since a profile stores an unordered
+    set of ballots, a rule can only depend on the voters through the iteration order of its pairs;
+    the reordered profiles therefore expose their pairs as lists in the given order. The preference
+    graphs are shared with the original profile.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param orders: The orders of the ballots, one permutation of the rows per row.
+    :type orders: np.ndarray
+    :return: The reordered profiles, one per order.
+    :rtype: List[Profile]
+    """
+    entries, offsets, counts = profile._ragged_ballots()
+    net_preference = profile._net_preference_matrix()
+    profiles = []
+    for order in orders:
+        ragged = _take_ballots(entries, offsets, counts, order)
+        pairs = _pairs_from_ragged(*ragged)
+        cache = {"ragged": ragged}
+        profiles.append(profile._derive(pairs, net_preference, profile.votes_per_candidate, cache))
+    return profiles
+
+
+def check_neutrality(profile: Profile, rule: Callable[[Profile, int], any], num_permutations: int = 100,
+                     outcome: str = "winners", batch_size: int = 100,
+                     rng: Optional[np.random.Generator] = None) -> float:
+    """
+    Estimates how often a rule violates neutrality on a profile: relabeling the candidates should
+    relabel the outcome in the same way.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param rule: The voting rule function.
+    :type rule: Callable[[Profile, int], any]
+    :param num_permutations: The number of random relabelings, defaults to 100.
+    :type num_permutations: int, optional
+    :param outcome: "winners" to compare the winners, "scores" to compare all the scores, defaults to "winners".
+    :type outcome: str, optional
+    :param batch_size: The number of relabelings built at once, defaults to 100.
+    :type batch_size: int, optional
+    :param rng: The random generator, defaults to a new one.
+    :type rng: np.random.Generator, optional
+    :return: The fraction of relabelings for which the outcome is not relabeled accordingly.
+    :rtype: float
+    """
+    rng = rng or np.random.default_rng()
+    reference = _outcome(profile, rule, outcome)
+    violations = 0
+    for start in range(0, num_permutations, batch_size):
+        permutations = candidate_permutations(len(profile.candidates), min(batch_size, num_permutations - start), rng)
+        for permutation, relabeled in zip(permutations, relabel_candidates(profile, permutations)):
+            result = _outcome(relabeled, rule, outcome)
+            if outcome == "winners":
+                violations += result != {int(permutation[c]) for c in reference}
+            else:
+                violations += not _same_scores(result, {int(permutation[c]): s for c, s in reference.items()})
+    return violations / num_permutations
+
+
+def check_anonymity(profile: Profile, rule: Callable[[Profile, int], any], num_permutations: int = 100,
+                    outcome: str = "winners", batch_size: int = 100,
+                    rng: Optional[np.random.Generator] = None) -> float:
+    """
+    Estimates how often a rule violates anonymity on a profile: reordering the voters should not
+    change the outcome.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param rule: The voting rule function.
+    :type rule: Callable[[Profile, int], any]
+    :param num_permutations: The number of random orders of the voters, defaults to 100.
+    :type num_permutations: int, optional
+    :param outcome: "winners" to compare the winners, "scores" to compare all the scores, defaults to "winners".
+    :type outcome: str, optional
+    :param batch_size: The number of orders built at once, defaults to 100.
+    :type batch_size: int, optional
+    :param rng: The random generator, defaults to a new one.
+    :type rng: np.random.Generator, optional
+    :return: The fraction of orders for which the outcome changes.
+    :rtype: float
+    """
+    rng = rng or np.random.default_rng()
+    reference = _outcome(profile, rule, outcome)
+    violations = 0
+    for start in range(0, num_permutations, batch_size):
+        orders = candidate_permutations(len(profile.pairs), min(batch_size, num_permutations - start), rng)
+        for reordered in reorder_voters(profile, orders):
+            result = _outcome(reordered, rule, outcome)
+            violations += result != reference if outcome == "winners" else not _same_scores(result, reference)
+    return violations / num_permutations
+
+
+def axiom_sweep(rules: Union[Dict[str, Callable], List[Callable]], num_candidates: int, num_voters: int,
+                voters_model: str, num_profiles: int = 10, num_permutations: int = 100,
+                distortion_ratio: float = 0.0, outcome: str = "winners",
+                seed: Optional[int] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Reports the anonymity and neutrality violation rates of rules over randomly generated profiles.
+
+    :param rules: The voting rules, by name, or a list of rules named by their __name__.
+    :type rules: Union[Dict[str, Callable], List[Callable]]
+    :param num_candidates: The number of candidates.
+    :type num_candidates: int
+    :param num_voters: The number of voters.
+    :type num_voters: int
+    :param voters_model: The model used to generate the voter profiles.
+    :type voters_model: str
+    :param num_profiles: The number of generated profiles, defaults to 10.
+    :type num_profiles: int, optional
+    :param num_permutations: The number of permutations per profile and axiom, defaults to 100.
+    :type num_permutations: int, optional
+    :param distortion_ratio: The distortion rate of the profiles, defaults to 0.0.
+    :type distortion_ratio: float, optional
+    :param outcome: "winners" to compare the winners, "scores" to compare all the scores, defaults to "winners".
+    :type outcome: str, optional
+    :param seed: The seed of the profiles and permutations, defaults to None.
+    :type seed: int, optional
+    :return: For each rule, the violation rate of each axiom over all the permutations.
+    :rtype: Dict[str, Dict[str, float]]
+    """
+    if not isinstance(rules, dict):
+        rules = {rule.__name__: rule for rule in rules}
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    rng = np.random.default_rng(seed)
+    rates = {name: {"anonymity": 0., "neutrality": 0.} for name in rules}
+    for _ in range(num_profiles):
+        profile = get_profile_from_model(num_candidates, num_voters, voters_model)
+        profile.distort(distortion_ratio)
+        for name, rule in rules.items():
+            rates[name]["anonymity"] += check_anonymity(profile, rule, num_permutations, outcome,
+                                                        rng=rng) / num_profiles
+            rates[name]["neutrality"] += check_neutrality(profile, rule, num_permutations, outcome,
+                                                          rng=rng) / num_profiles
+    return rates
+
+
+def _ranking_winners(ranking: List[Tuple[int, float]]) -> set:
+    best_score = ranking[0][1]
+    return {candidate for candidate, score in ranking if score == best_score}
+
+
+def pareto_violations(profile: Profile, ranking: List[Tuple[int, float]]) -> List[Tuple[int, int]]:
+    """
+    Lists the pairs of candidates whose order in a ranking contradicts Pareto dominance.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param ranking: A ranking of the candidates, as given by Profile.ranking.
+    :type ranking: List[Tuple[int, float]]
+    :return: The pairs (a, b) such that a Pareto dominates b, but b has a strictly higher score.
+    :rtype: List[Tuple[int, int]]
+    """
+    dominance = profile.pareto_dominance_matrix()
+    candidates = np.array([candidate for candidate, _ in ranking])
+    scores = np.array([float(score) for _, score in ranking])
+    order = np.argsort(candidates)
+    scores = scores[order]
+    dominated, dominating = np.nonzero(dominance.T & (scores[:, None] > scores[None, :]))
+    return list(zip(candidates[order][dominating].tolist(), candidates[order][dominated].tolist()))
+
+
+def pareto_optimal(profile: Profile, ranking: List[Tuple[int, float]]) -> bool:
+    """
+    Checks that no winner of a ranking is Pareto dominated by another candidate.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param ranking: A ranking of the candidates, as given by Profile.ranking.
+    :type ranking: List[Tuple[int, float]]
+    :return: True if all the winners are Pareto optimal.
+    :rtype: bool
+    """
+    winners = list(_ranking_winners(ranking))
+    return not profile.pareto_dominance_matrix()[:, winners].any()
+
+
+def unanimity(profile: Profile, ranking: List[Tuple[int, float]]) -> bool:
+    """
+    Checks that when all the voters rank the same candidate first, this candidate is the only
+    winner of a ranking. Holds trivially when the voters disagree on their first choice.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param ranking: A ranking of the candidates, as given by Profile.ranking.
+    :type ranking: List[Tuple[int, float]]
+    :return: True if the ranking satisfies unanimity.
+    :rtype: bool
+    """
+    firsts = {ballot[0] for _, ballot in profile.pairs}
+    return len(firsts) != 1 or _ranking_winners(ranking) == firsts
+
+
+def _winners(scores: dict) -> set:
+    best_score = max(scores.values())
+    return {candidate for candidate, score in scores.items() if score == best_score}
+
+
+def _best_position(ballot: Tuple[int, ...], winners: set) -> int:
+    """
+    Returns the position in a ballot of the preferred winner, unranked winners coming last.
+    """
+    return min(ballot.index(w) if w in ballot else len(ballot) for w in winners)
+
+
+def _perturbed(profile: Profile, freqs: dict, net_preference: np.ndarray,
+               removed: Optional[Tuple[int, ...]] = None, added: Optional[Tuple[int, ...]] = None) -> Profile:
+    """
+    Derives the profile in which one voter casting `removed` leaves, and one voter casting `added`
+    joins. The net preference matrix and the votes per candidate are updated with the deltas of
+    these two ballots only.
+    """
+    freqs = dict(freqs)
+    net_preference = net_preference.copy()
+    votes_per_candidate = list(profile.votes_per_candidate)
+    for ballot, sign in ((removed, -1), (added, 1)):
+        if ballot is None:
+            continue
+        freqs[ballot] = freqs.get(ballot, 0) + sign
+        for i, candidate in enumerate(ballot):
+            votes_per_candidate[candidate] = dict(votes_per_candidate[candidate])
+            votes_per_candidate[candidate][i] += sign
+            later = list(ballot[i + 1:])
+            net_preference[candidate, later] += sign
+            net_preference[later, candidate] -= sign
+    pairs = set((freq, ballot) for ballot, freq in freqs.items() if freq > 0)
+    return profile._derive(pairs, net_preference, votes_per_candidate)
+
+
+def check_monotonicity(profile: Profile, rule: Callable[[Profile, int], any], max_steps: int = 1,
+                       max_witnesses: Optional[int] = None) -> Tuple[int, List[dict]]:
+    """
+    Checks monotonicity exhaustively over single-ballot perturbations: raising a winner by up to
+    `max_steps` positions in the ballot of one voter should keep it a winner.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param rule: The voting rule function.
+    :type rule: Callable[[Profile, int], any]
+    :param max_steps: The maximum number of positions a winner is raised, defaults to 1.
+    :type max_steps: int, optional
+    :param max_witnesses: Stop after this number of violations, defaults to None (no limit).
+    :type max_witnesses: int, optional
+    :return: The number of checked perturbations and the violation witnesses.
+    :rtype: Tuple[int, List[dict]]
+    """
+    scores = dict(profile.score(rule))
+    winners = _winners(scores)
+    freqs = {ballot: freq for freq, ballot in profile.pairs}
+    net_preference = profile._net_preference_matrix()
+    local = getattr(rule, "local", False)
+    checks, witnesses = 0, []
+    for ballot in sorted(freqs):
+        for winner in sorted(winners & set(ballot)):
+            position = ballot.index(winner)
+            for steps in range(1, min(max_steps, position) + 1):
+                raised = ballot[:position - steps] + (winner,) + ballot[position - steps:position] + \
+                    ballot[position + 1:]
+                perturbed = _perturbed(profile, freqs, net_preference, removed=ballot, added=raised)
+                if local:
+                    # Only the raised winner and the candidates it passed have new scores
+                    new_scores = dict(scores)
+                    new_scores.update((c, rule(perturbed, c)) for c in ballot[position - steps:position + 1])
+                    new_winners = _winners(new_scores)
+                else:
+                    new_winners = perturbed.winners(rule)
+                checks += 1
+                if winner not in new_winners:
+                    witnesses.append({"axiom": "monotonicity", "ballot": ballot, "new_ballot": raised,
+                                      "candidate": winner, "winners": winners, "new_winners": new_winners})
+                    if max_witnesses is not None and len(witnesses) >= max_witnesses:
+                        return checks, witnesses
+    return checks, witnesses
+
+
+def check_participation(profile: Profile, rule: Callable[[Profile, int], any],
+                        ballots: Optional[List[Tuple[int, ...]]] = None,
+                        max_witnesses: Optional[int] = None) -> Tuple[int, List[dict]]:
+    """
+    Checks participation over single-voter perturbations: a voter joining the profile should not
+    get a winner they like less than when abstaining, and a voter leaving should not get a winner
+    they like more. Winners are compared by the position of the preferred one in the ballot.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param rule: The voting rule function.
+    :type rule: Callable[[Profile, int], any]
+    :param ballots: The ballots of the joining voters, defaults to the ballots of the profile.
+    :type ballots: List[Tuple[int, ...]], optional
+    :param max_witnesses: Stop after this number of violations, defaults to None (no limit).
+    :type max_witnesses: int, optional
+    :return: The number of checked perturbations and the violation witnesses.
+    :rtype: Tuple[int, List[dict]]
+    """
+    winners = profile.winners(rule)
+    freqs = {ballot: freq for freq, ballot in profile.pairs}
+    net_preference = profile._net_preference_matrix()
+    checks, witnesses = 0, []
+    perturbations = [("join", ballot) for ballot in (sorted(freqs) if ballots is None else ballots)]
+    # A voter leaving must not leave an empty profile
+    if profile.total_votes > 1:
+        perturbations += [("leave", ballot) for ballot in sorted(freqs)]
+    for perturbation, ballot in perturbations:
+        if perturbation == "join":
+            perturbed = _perturbed(profile, freqs, net_preference, added=ballot)
+        else:
+            perturbed = _perturbed(profile, freqs, net_preference, removed=ballot)
+        new_winners = perturbed.winners(rule)
+        checks += 1
+        position, new_position = _best_position(ballot, winners), _best_position(ballot, new_winners)
+        if (perturbation == "join" and new_position > position) or \
+                (perturbation == "leave" and new_position < position):
+            witnesses.append({"axiom": "participation", "perturbation": perturbation, "ballot": ballot,
+                              "winners": winners, "new_winners": new_winners})
+            if max_witnesses is not None and len(witnesses) >= max_witnesses:
+                break
+    return checks, witnesses
+
+
+def perturbation_sweep(rules: Union[Dict[str, Callable], List[Callable]], num_candidates: int, num_voters: int,
+                       voters_model: str, num_profiles: int = 100, distortion_ratio: float = 0.0,
+                       max_steps: int = 1, max_witnesses: Optional[int] = 10,
+                       seed: Optional[int] = None) -> Dict[str, Dict[str, dict]]:
+    """
+    Reports the monotonicity and participation violations of rules over randomly generated profiles.
+
+    :param rules: The voting rules, by name, or a list of rules named by their __name__.
+    :type rules: Union[Dict[str, Callable], List[Callable]]
+    :param num_candidates: The number of candidates.
+    :type num_candidates: int
+    :param num_voters: The number of voters.
+    :type num_voters: int
+    :param voters_model: The model used to generate the voter profiles.
+    :type voters_model: str
+    :param num_profiles: The number of generated profiles, defaults to 100.
+    :type num_profiles: int, optional
+    :param distortion_ratio: The distortion rate of the profiles, defaults to 0.0.
+    :type distortion_ratio: float, optional
+    :param max_steps: The maximum number of positions a winner is raised, defaults to 1.
+    :type max_steps: int, optional
+    :param max_witnesses: The number of witnesses kept per rule and axiom, defaults to 10.
+    :type max_witnesses: int, optional
+    :param seed: The seed of the profiles, defaults to None.
+    :type seed: int, optional
+    :return: For each rule and axiom, the number of checks, of violations, and the first witnesses,
+             each with the pairs of its profile.
+    :rtype: Dict[str, Dict[str, dict]]
+    """
+    if not isinstance(rules, dict):
+        rules = {rule.__name__: rule for rule in rules}
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    report = {name: {axiom: {"checks": 0, "violations": 0, "witnesses": []}
+                     for axiom in ("monotonicity", "participation")} for name in rules}
+    for _ in range(num_profiles):
+        profile = get_profile_from_model(num_candidates, num_voters, voters_model)
+        profile.distort(distortion_ratio)
+        for name, rule in rules.items():
+            for axiom, (checks, witnesses) in (
+                    ("monotonicity", check_monotonicity(profile, rule, max_steps)),
+                    ("participation", check_participation(profile, rule))):
+                entry = report[name][axiom]
+                entry["checks"] += checks
+                entry["violations"] += len(witnesses)
+                for witness in witnesses:
+                    if max_witnesses is None or len(entry["witnesses"]) < max_witnesses:
+                        entry["witnesses"].append(dict(witness, pairs=sorted(profile.pairs)))
+    return report
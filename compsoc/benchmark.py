@@ -0,0 +1,347 @@
+"""
+Benchmark suite
+Measures the speed of profiles, voting rules, voter models and evaluation over scaling grids
+of candidates and voters, and the import time of the modules in a fresh interpreter. Results
+are written as JSON, and a compare mode flags the regressions against a stored baseline.
+
+python -m compsoc.benchmark run --grid quick --output bench.json
+python -m compsoc.benchmark compare baseline.json bench.json --threshold 0.2
+"""
+
+import argparse
+import json
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from compsoc.evaluate import get_rule_utility
+from compsoc.profile import Profile
+from compsoc.voter_model import get_pairs_from_model
+from compsoc.voting_rules.borda import borda_rule
+from compsoc.voting_rules.borda_gamma import get_borda_gamma
+from compsoc.voting_rules.borda_random import borda_random_gamma
+from compsoc.voting_rules.copeland import copeland_rule
+from compsoc.voting_rules.dowdall import dowdall_rule
+from compsoc.voting_rules.ranked_pairs import ranked_pairs_rule
+from compsoc.voting_rules.simpson import simpson_rule
+
+# Scaling grids over (candidates, voters)
+GRIDS = {
+    "quick": {"candidates": [5, 10], "voters": [10 ** 2, 10 ** 3]},
+    "full": {"candidates": [5, 10, 20, 50, 100, 200], "voters": [10 ** k for k in range(2, 8)]},
+}
+
+# Bundled voting rules
+RULES = {
+    "borda": borda_rule,
+    "borda_gamma": get_borda_gamma(0.5),
+    "borda_random": borda_random_gamma,
+    "copeland": copeland_rule,
+    "dowdall": dowdall_rule,
+    "ranked_pairs": ranked_pairs_rule,
+    "simpson": simpson_rule,
+}
+
+# The Gaussian model enumerates all permutations of the candidates
+MAX_CANDIDATES = {"gaussian": 8}
+
+VOTER_MODELS = ["random", "gaussian", "multinomial_dirichlet"]
+
+# Modules whose import time is measured, those executing rules first
+IMPORTS = ["compsoc.profile", "compsoc.voting_rules.borda", "compsoc.voting_rules.copeland", "compsoc.evaluate"]
+
+# Slow dependencies that importing the modules above must not load, only the functions using them
+HEAVY_MODULES = ["matplotlib", "pandas", "scipy"]
+
+_IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+duration = time.perf_counter() - start
+print(json.dumps({{"time": duration, "heavy": sorted(m for m in {heavy!r} if m in sys.modules)}}))
+"""
+
+
+def time_call(function: Callable[[], any], setup: Optional[Callable[[], any]] = None,
+              repeat: int = 3) -> List[float]:
+    """
+    Times a function several times. The setup, if any, is run before each call and is not timed;
+    its return value is passed to the function.
+
+    :param function: The function to time.
+    :type function: Callable
+    :param setup: The function preparing the argument of each call, defaults to None.
+    :type setup: Callable, optional
+    :param repeat: The number of timed calls, defaults to 3.
+    :type repeat: int, optional
+    :return: The duration of each call in seconds.
+    :rtype: List[float]
+    """
+    times = []
+    for _ in range(repeat):
+        args = () if setup is None else (setup(),)
+        start = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def time_import(module: str, heavy: Optional[List[str]] = None) -> dict:
+    """
+    Imports a module in a fresh interpreter, as a new worker process would.
+
+    :param module: The name of the module.
+    :type module: str
+    :param heavy: The slow dependencies to look for, defaults to HEAVY_MODULES.
+    :type heavy: List[str], optional
+    :return: The import time in seconds ("time"), and the slow dependencies it loaded ("heavy").
+    :rtype: dict
+    """
+    script = _IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES if heavy is None else heavy)
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def run_import_benchmarks(modules: Optional[List[str]] = None, repeat: int = 3, pattern: str = ".*",
+                          log=None) -> List[dict]:
+    """
+    Measures the import time of modules, each in fresh interpreters. The records have 0 candidates
+    and 0 voters, and are compared like the other benchmarks.
+
+    :param modules: The names of the modules, defaults to IMPORTS.
+    :type modules: List[str], optional
+    :param repeat: The number of timed imports per module, defaults to 3.
+    :type repeat: int, optional
+    :param pattern: A regular expression selecting the benchmarks by name, defaults to all.
+    :type pattern: str, optional
+    :param log: A text stream for progress messages, defaults to None.
+    :type log: TextIO, optional
+    :return: One record per module, with the slow dependencies it loaded.
+    :rtype: List[dict]
+    """
+    selected = re.compile(pattern)
+    records = []
+    for module in IMPORTS if modules is None else modules:
+        name = f"import.{module}"
+        if not selected.search(name):
+            continue
+        if log:
+            print(name, file=log, flush=True)
+        imports = [time_import(module) for _ in range(repeat)]
+        record = _record(name, 0, 0, [i["time"] for i in imports])
+        record["heavy"] = imports[-1]["heavy"]
+        records.append(record)
+    return records
+
+
+def _record(name: str, num_candidates: int, num_voters: int, times: List[float]) -> dict:
+    return {"name": name,
+            "candidates": num_candidates,
+            "voters": num_voters,
+            "times": times,
+            "min": min(times),
+            "median": statistics.median(times)}
+
+
+def _cases(num_candidates: int, pairs, profile_factory) -> List[Tuple[str, Callable, Optional[Callable]]]:
+    """
+    Lists the benchmarks of one point of the grid as (name, function, setup).
+    """
+    num = num_candidates
+    cases = [
+        ("profile.init", lambda: Profile(pairs), None),
+        ("profile.distort", lambda profile: profile.distort(0.5), profile_factory),
+    ]
+    for rule_name, rule in RULES.items():
+        cases.append((f"rule.{rule_name}.score", lambda profile, r=rule: profile.score(r), profile_factory))
+        cases.append((f"rule.{rule_name}.ranking", lambda profile, r=rule: profile.ranking(r), profile_factory))
+        cases.append((f"rule.{rule_name}.winners", lambda profile, r=rule: profile.winners(r), profile_factory))
+    cases.append(("evaluate.get_rule_utility",
+                  lambda profile: get_rule_utility(profile, borda_rule, min(2, num)), profile_factory))
+    return cases
+
+
+def run_benchmarks(candidates: List[int], voters: List[int], repeat: int = 3, budget: float = 10.,
+                   pattern: str = ".*", seed: int = 0, log=None) -> List[dict]:
+    """
+    Runs the benchmarks over a grid of candidates and voters. A benchmark that exceeds the time
+    budget at some point of the grid is skipped at every larger point.
+
+    :param candidates: The numbers of candidates of the grid.
+    :type candidates: List[int]
+    :param voters: The numbers of voters of the grid.
+    :type voters: List[int]
+    :param repeat: The number of timed calls per benchmark, defaults to 3.
+    :type repeat: int, optional
+    :param budget: The time budget of one call in seconds, defaults to 10.
+    :type budget: float, optional
+    :param pattern: A regular expression selecting the benchmarks by name, defaults to all.
+    :type pattern: str, optional
+    :param seed: The seed of the generated profiles, defaults to 0.
+    :type seed: int, optional
+    :param log: A text stream for progress messages, defaults to None.
+    :type log: TextIO, optional
+    :return: One record per benchmark and point of the grid.
+    :rtype: List[dict]
+    """
+    selected = re.compile(pattern)
+    # Smallest (candidates, voters) at which each benchmark went over budget
+    over_budget: Dict[str, List[Tuple[int, int]]] = {}
+
+    def skipped(name, num_candidates, num_voters):
+        return any(num_candidates >= c and num_voters >= v for c, v in over_budget.get(name, []))
+
+    def run(name, num_candidates, num_voters, function, setup=None):
+        if not selected.search(name) or skipped(name, num_candidates, num_voters):
+            return
+        if log:
+            print(f"{name} candidates={num_candidates} voters={num_voters}", file=log, flush=True)
+        times = time_call(function, setup, repeat)
+        records.append(_record(name, num_candidates, num_voters, times))
+        if min(times) > budget:
+            over_budget.setdefault(name, []).append((num_candidates, num_voters))
+
+    records = []
+    for num_candidates in sorted(candidates):
+        for num_voters in sorted(voters):
+            for model in VOTER_MODELS:
+                if num_candidates <= MAX_CANDIDATES.get(model, num_candidates):
+                    run(f"voter_model.{model}", num_candidates, num_voters,
+                        lambda m=model: get_pairs_from_model(num_candidates, num_voters, m))
+            names = [name for name, _, _ in _cases(num_candidates, None, None)]
+            if all(not selected.search(name) or skipped(name, num_candidates, num_voters) for name in names):
+                continue
+            if skipped("profile.init", num_candidates, num_voters):
+                # Every other benchmark needs the profile
+                for name in names:
+                    over_budget.setdefault(name, []).append((num_candidates, num_voters))
+                continue
+            random.seed(seed)
+            np.random.seed(seed)
+            pairs = set(get_pairs_from_model(num_candidates, num_voters, "random"))
+            profile = Profile(pairs)
+
+            def profile_factory():
+                # Copy of the reference profile, without recomputing the preference graphs
+                copy = Profile.__new__(Profile)
+                copy.__dict__.update(profile.__dict__)
+                # Rules caching their scores must not reuse them across calls
+                copy._cache = dict(profile._cache)
+                return copy
+
+            for name, function, setup in _cases(num_candidates, pairs, profile_factory):
+                run(name, num_candidates, num_voters, function, setup)
+    return records
+
+
+def compare(baseline: List[dict], current: List[dict], threshold: float = 0.2) -> List[dict]:
+    """
+    Compares benchmark records against a baseline, matched by name, candidates and voters. A
+    baseline benchmark missing from the current records, e.g., skipped after going over the time
+    budget at a smaller grid point, is flagged as a regression.
+
+    :param baseline: The baseline records.
+    :type baseline: List[dict]
+    :param current: The current records.
+    :type current: List[dict]
+    :param threshold: The relative slowdown of the median flagged as a regression, defaults to 0.2.
+    :type threshold: float, optional
+    :return: One comparison per benchmark of the baseline or of the current records, with the
+             medians (None when missing), their ratio, a status ("ok", "regression", "missing" from
+             the current records, or "new" in them) and a regression flag, True for the
+             regressions and the missing benchmarks.
+    :rtype: List[dict]
+    """
+    def key(record):
+        return record["name"], record["candidates"], record["voters"]
+
+    reference = {key(r): r["median"] for r in baseline}
+    medians = {key(r): r["median"] for r in current}
+    comparisons = []
+    # The baseline benchmarks first, then the new ones
+    for name, num_candidates, num_voters in list(reference) + [k for k in medians if k not in reference]:
+        base_median = reference.get((name, num_candidates, num_voters))
+        median = medians.get((name, num_candidates, num_voters))
+        if median is None:
+            ratio, status = float("inf"), "missing"
+        elif base_median is None:
+            ratio, status = None, "new"
+        else:
+            ratio = median / base_median if base_median > 0 else float("inf")
+            status = "regression" if ratio > 1. + threshold else "ok"
+        comparisons.append({"name": name,
+                            "candidates": num_candidates,
+                            "voters": num_voters,
+                            "baseline": base_median,
+                            "current": median,
+                            "ratio": ratio,
+                            "status": status,
+                            "regression": status in ("regression", "missing")})
+    return comparisons
+
+
+def _metadata() -> dict:
+    return {"python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "date": datetime.now(timezone.utc).isoformat()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark suite of the compsoc package")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument("--grid", choices=GRIDS, default="quick", help="Scaling grid")
+    run_parser.add_argument("--candidates", type=int, nargs="+", help="Overrides the candidates of the grid")
+    run_parser.add_argument("--voters", type=int, nargs="+", help="Overrides the voters of the grid")
+    run_parser.add_argument("--repeat", type=int, default=3, help="Timed calls per benchmark")
+    run_parser.add_argument("--budget", type=float, default=10., help="Time budget of one call in seconds")
+    run_parser.add_argument("--filter", default=".*", help="Regular expression selecting the benchmarks")
+    run_parser.add_argument("--seed", type=int, default=0, help="Seed of the generated profiles")
+    run_parser.add_argument("--output", help="JSON file for the results, defaults to stdout")
+    compare_parser = commands.add_parser("compare", help="Compare results against a baseline")
+    compare_parser.add_argument("baseline", help="JSON file of the baseline results")
+    compare_parser.add_argument("current", help="JSON file of the current results")
+    compare_parser.add_argument("--threshold", type=float, default=0.2,
+                                help="Relative slowdown flagged as a regression")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        grid = GRIDS[args.grid]
+        records = run_import_benchmarks(repeat=args.repeat, pattern=args.filter, log=sys.stderr)
+        records += run_benchmarks(args.candidates or grid["candidates"], args.voters or grid["voters"],
+                                  repeat=args.repeat, budget=args.budget, pattern=args.filter,
+                                  seed=args.seed, log=sys.stderr)
+        output = json.dumps({"metadata": _metadata(), "results": records}, indent=1)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(output)
+        else:
+            print(output)
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)["results"]
+    comparisons = compare(baseline, current, args.threshold)
+    for c in comparisons:
+        flag = "" if c["status"] == "ok" else c["status"].upper()
+        medians = [f"{median:>12.6f}" if median is not None else f"{'-':>12}"
+                   for median in (c["baseline"], c["current"])]
+        ratio = f"{c['ratio']:>7.2f}x" if c["ratio"] is not None else f"{'-':>8}"
+        print(f"{c['name']:<32} {c['candidates']:>5} {c['voters']:>9} {medians[0]} {medians[1]} {ratio} {flag}")
+    # Non-zero exit status when any benchmark regressed or is missing
+    return 1 if any(c["regression"] for c in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
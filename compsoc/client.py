@@ -0,0 +1,256 @@
+"""
+Rule execution client
+An asyncio client of the execute_rule API (see the README, and compsoc.server for a local
+stand-in), to submit many rule and profile combinations at once: the requests share a pool of
+keep-alive connections, at most max_concurrency of them are in flight, and the requests failing
+with a transport error or a transient status are retried with exponential backoff.
+
+The pairs of a profile are encoded in the Pair schema ({"frequency": int, "ballot": List[int]})
+one at a time, and the body of a request can be streamed rather than built in memory.
+
+The client needs httpx (pip install httpx), which is imported when a client is created.
+"""
+
+import asyncio
+import json
+import random
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Tuple, Union
+
+from compsoc.profile import Profile
+
+DEFAULT_URL = "https://api.algocratic.org/execute_rule"
+
+# Statuses worth retrying: the server is busy or restarting
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# A submission: the code, the profile or its pairs, and topn
+Submission = Tuple[str, Union[Profile, Iterable[Tuple[int, Tuple[int, ...]]]], int]
+
+
+class ExecutionError(Exception):
+    """
+    Raised when the API rejects a request, or keeps failing after the retries.
+
+    Attributes:
+        status (Optional[int]): The HTTP status of the last response, None after a transport error.
+        detail (str): The error message of the server.
+    """
+
+    def __init__(self, status: Optional[int], detail: str):
+        super().__init__(f"{status}: {detail}" if status is not None else detail)
+        self.status = status
+        self.detail = detail
+
+
+def iter_pairs(profile: Union[Profile, Iterable[Tuple[int, Tuple[int, ...]]]]) -> Iterator[dict]:
+    """
+    Yields the pairs of a profile in the Pair schema of the API, one at a time. The pairs of a
+    profile built from arrays (see Profile.from_arrays) are read from its arrays, without
+    creating them.
+
+    :param profile: The profile, or its pairs (frequency, ballot).
+    :type profile: Union[Profile, Iterable[Tuple[int, Tuple[int, ...]]]]
+    :return: The pairs, as {"frequency": int, "ballot": List[int]}.
+    :rtype: Iterator[dict]
+    """
+    if isinstance(profile, Profile) and profile._pairs is None:
+        entries, offsets, counts = profile._ragged_ballots()
+        offsets = offsets.tolist()
+        for i, count in enumerate(counts.tolist()):
+            yield {"frequency": count, "ballot": entries[offsets[i]:offsets[i + 1]].tolist()}
+        return
+    for frequency, ballot in (profile.pairs if isinstance(profile, Profile) else profile):
+        yield {"frequency": int(frequency), "ballot": [int(c) for c in ballot]}
+
+
+def encode_request(code: str, profile: Union[Profile, Iterable[Tuple[int, Tuple[int, ...]]]], topn: int = 1,
+                   timeout: Optional[int] = 60, chunk_pairs: int = 1024) -> Iterator[bytes]:
+    """
+    Encodes the JSON body of an execute_rule request by chunks of pairs.
+
+    :param code: The code of the rule.
+    :type code: str
+    :param profile: The profile, or its pairs (frequency, ballot).
+    :type profile: Union[Profile, Iterable[Tuple[int, Tuple[int, ...]]]]
+    :param topn: The number of top candidates to consider for utility calculation, defaults to 1.
+    :type topn: int, optional
+    :param timeout: The timeout of the rule in seconds, defaults to 60.
+    :type timeout: int, optional
+    :param chunk_pairs: The number of pairs per chunk, defaults to 1024.
+    :type chunk_pairs: int, optional
+    :return: The chunks of the body.
+    :rtype: Iterator[bytes]
+    """
+    yield (f'{{"code": {json.dumps(code)}, "topn": {json.dumps(topn)}, '
+           f'"timeout": {json.dumps(timeout)}, "pairs": [').encode("utf-8")
+    chunk = []
+    for i, pair in enumerate(iter_pairs(profile)):
+        chunk.append(("," if i else "") + json.dumps(pair))
+        if len(chunk) == chunk_pairs:
+            yield "".join(chunk).encode("utf-8")
+            chunk = []
+    yield ("".join(chunk) + "]}").encode("utf-8")
+
+
+class RuleClient:
+    """
+    An asynchronous client of the execute_rule API, used as an async context manager:
+
+    async with RuleClient(url, max_concurrency=16) as client:
+        results = await client.execute_many(submissions)
+
+    Attributes:
+        url (str): The URL of the execute_rule endpoint.
+        max_concurrency (int): The maximum number of requests in flight.
+        retries (int): The number of retries of a failing request.
+        backoff (float): The delay before the first retry in seconds, doubled at each retry.
+        max_backoff (float): The maximum delay before a retry in seconds.
+        stream (bool): Whether the bodies are streamed, with chunked transfer encoding.
+    """
+
+    def __init__(self, url: str = DEFAULT_URL, max_concurrency: int = 8, retries: int = 3, backoff: float = 0.5,
+                 max_backoff: float = 10., stream: bool = False, http_timeout: Optional[float] = None,
+                 transport=None):
+        """
+        Creates a client and its pool of connections.
+
+        :param url: The URL of the execute_rule endpoint, defaults to DEFAULT_URL.
+        :type url: str, optional
+        :param max_concurrency: The maximum number of requests in flight, and of pooled
+                                connections, defaults to 8.
+        :type max_concurrency: int, optional
+        :param retries: The number of retries of a failing request, defaults to 3.
+        :type retries: int, optional
+        :param backoff: The delay before the first retry in seconds, defaults to 0.5.
+        :type backoff: float, optional
+        :param max_backoff: The maximum delay before a retry in seconds, defaults to 10.
+        :type max_backoff: float, optional
+        :param stream: Stream the bodies instead of building them in memory, defaults to False.
+        :type stream: bool, optional
+        :param http_timeout: The timeout of a request in seconds, defaults to None: the timeout
+                             of the rule plus 30 seconds.
+        :type http_timeout: float, optional
+        :param transport: The httpx transport, e.g., a mock for testing, defaults to None.
+        :type transport: httpx.AsyncBaseTransport, optional
+        """
+        import httpx
+
+        self.url = url
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stream = stream
+        self.http_timeout = http_timeout
+        self._httpx = httpx
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+            headers={"Content-Type": "application/json"}, transport=transport)
+
+    async def __aenter__(self) -> "RuleClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """
+        Closes the connections.
+        """
+        await self._client.aclose()
+
+    def _delay(self, attempt: int) -> float:
+        # Exponential backoff with jitter, so that failed requests do not come back together
+        return min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.)
+
+    def _body(self, code: str, profile, topn: int, timeout: Optional[int]):
+        chunks = encode_request(code, profile, topn, timeout)
+        if not self.stream:
+            return b"".join(chunks)
+
+        async def stream() -> AsyncIterator[bytes]:
+            for chunk in chunks:
+                yield chunk
+
+        return stream()
+
+    async def execute(self, code: str, profile: Union[Profile, Iterable[Tuple[int, Tuple[int, ...]]]],
+                      topn: int = 1, timeout: Optional[int] = 60) -> dict:
+        """
+        Evaluates a rule on a profile with the API.
+
+        :param code: The code of the rule.
+        :type code: str
+        :param profile: The profile, or its pairs (frequency, ballot).
+        :type profile: Union[Profile, Iterable[Tuple[int, Tuple[int, ...]]]]
+        :param topn: The number of top candidates to consider for utility calculation, defaults to 1.
+        :type topn: int, optional
+        :param timeout: The timeout of the rule in seconds, defaults to 60.
+        :type timeout: int, optional
+        :return: The utilities of the rule, {"top": float, "topn": float}.
+        :rtype: dict
+        """
+        if not isinstance(profile, Profile):
+            # The pairs are read again at each attempt
+            profile = list(profile)
+        http_timeout = self.http_timeout if self.http_timeout is not None else (timeout or 60) + 30.
+        async with self._semaphore:
+            for attempt in range(self.retries + 1):
+                last = attempt == self.retries
+                try:
+                    response = await self._client.post(self.url, content=self._body(code, profile, topn, timeout),
+                                                       timeout=http_timeout)
+                except self._httpx.TransportError as error:
+                    if last:
+                        raise ExecutionError(None, f"{type(error).__name__}: {error}") from error
+                else:
+                    if response.status_code == 200:
+                        return response.json()["result"]
+                    if last or response.status_code not in RETRY_STATUSES:
+                        try:
+                            detail = response.json().get("detail", response.text)
+                        except ValueError:
+                            detail = response.text
+                        raise ExecutionError(response.status_code, str(detail))
+                await asyncio.sleep(self._delay(attempt))
+
+    async def execute_many(self, submissions: Iterable[Submission], timeout: Optional[int] = 60,
+                           return_exceptions: bool = True) -> List[Union[dict, Exception]]:
+        """
+        Evaluates many rule and profile combinations concurrently, at most max_concurrency at a time.
+
+        :param submissions: The submissions (code, profile or pairs, topn).
+        :type submissions: Iterable[Submission]
+        :param timeout: The timeout of each rule in seconds, defaults to 60.
+        :type timeout: int, optional
+        :param return_exceptions: Return the errors in place of the results if True, defaults to
+                                  True; otherwise the first error is raised.
+        :type return_exceptions: bool, optional
+        :return: The results, in the order of the submissions.
+        :rtype: List[Union[dict, Exception]]
+        """
+        tasks = [self.execute(code, profile, topn, timeout) for code, profile, topn in submissions]
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+
+
+def execute_all(submissions: Iterable[Submission], url: str = DEFAULT_URL, timeout: Optional[int] = 60,
+                **kwargs) -> List[Union[dict, Exception]]:
+    """
+    Evaluates many rule and profile combinations with the API, from synchronous code.
+
+    :param submissions: The submissions (code, profile or pairs, topn).
+    :type submissions: Iterable[Submission]
+    :param url: The URL of the execute_rule endpoint, defaults to DEFAULT_URL.
+    :type url: str, optional
+    :param timeout: The timeout of each rule in seconds, defaults to 60.
+    :type timeout: int, optional
+    :param kwargs: The other arguments of RuleClient.
+    :return: The results, or the errors, in the order of the submissions.
+    :rtype: List[Union[dict, Exception]]
+    """
+    async def run():
+        async with RuleClient(url, **kwargs) as client:
+            return await client.execute_many(submissions, timeout)
+
+    return asyncio.run(run())
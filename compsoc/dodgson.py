@@ -0,0 +1,297 @@
+"""
+Dodgson and Young scores
+The Dodgson score of a candidate is the smallest number of swaps of adjacent candidates in the
+ballots making it a Condorcet winner, and its Young score the smallest number of voters to remove
+for the same purpose. A candidate is a Condorcet winner when its net preference against every
+other candidate is positive; a ballot missing one of two candidates does not count for the pair,
+as in Profile._net_preference_matrix.
+
+Both scores are computed exactly by a branch and bound search over the unique ballots, pruned
+by lower bounds derived from the net preferences of the candidate. Greedy solutions give upper
+bounds in polynomial time: the approximations report them along with the lower bounds, which
+bound their error.
+"""
+
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+from compsoc.profile import Profile
+
+
+def _deficits(profile: Profile, candidate: int) -> np.ndarray:
+    """
+    Returns the number of voters the candidate has to gain over each other candidate to beat it.
+    Moving the candidate above another one in a ballot raises its net preference by 2.
+    """
+    net_preference = profile._net_preference_matrix()[candidate]
+    deficits = np.where(net_preference <= 0, -net_preference // 2 + 1, 0)
+    deficits[candidate] = 0
+    return deficits
+
+
+def _dodgson_instance(profile: Profile, candidate: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the deficits of the candidate over the candidates it does not beat, and, for each
+    unique ballot ranking one of them above the candidate, its count and the depth of each of them
+    above the candidate: 1 for the candidate just above it, 0 for the candidates below it.
+    """
+    deficits = _deficits(profile, candidate)
+    behind = np.flatnonzero(deficits)
+    _, _, counts = profile._ragged_ballots()
+    positions = profile._positions()
+    position = positions[:, [candidate]]
+    # A ballot not ranking the candidate has no swap changing its net preferences
+    depths = np.where((positions[:, behind] < position) & (position < len(deficits)),
+                      position - positions[:, behind], 0)
+    relevant = depths.any(axis=1)
+    return deficits[behind], depths[relevant], counts[relevant]
+
+
+def _dodgson_costs(depths: np.ndarray, counts: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Returns, for each deficit, the depths of its candidate above the scored candidate in the
+    ballots ranking it above, by increasing depth, and the counts of these ballots.
+    """
+    costs = []
+    for column in depths.T:
+        above = np.flatnonzero(column)
+        order = np.argsort(column[above], kind="stable")
+        costs.append((column[above][order], counts[above][order]))
+    return costs
+
+
+def _dodgson_lower_bound(deficits: np.ndarray, costs: List[Tuple[np.ndarray, np.ndarray]]) -> float:
+    """
+    Returns a lower bound of the number of swaps covering the deficits: each swap covers a single
+    unit of deficit, and the deficit of each candidate alone needs its cheapest swaps.
+    """
+    bound = int(deficits.sum())
+    for need, (depths, counts) in zip(deficits.tolist(), costs):
+        if not need:
+            continue
+        covered = np.cumsum(counts)
+        if not len(covered) or covered[-1] < need:
+            return math.inf
+        last = int(np.searchsorted(covered, need))
+        cost = int(depths[:last] @ counts[:last]) + (need - int(covered[last]) + int(counts[last])) * int(depths[last])
+        bound = max(bound, cost)
+    return bound
+
+
+def _dodgson_greedy(deficits: np.ndarray, depths: np.ndarray, counts: np.ndarray) -> float:
+    """
+    Covers the largest remaining deficit with the cheapest swaps, until all the deficits are
+    covered, and returns the number of swaps, or infinity if a deficit cannot be covered.
+    """
+    deficits = deficits.copy()
+    # Groups of voters of the same ballot whose candidate moved to the same depth
+    ballot, moved, voters = np.arange(len(counts)), np.zeros(len(counts), dtype=np.int64), counts.copy()
+    total = 0
+    while deficits.any():
+        target = int(np.argmax(deficits))
+        costs = depths[ballot, target] - moved
+        options = np.flatnonzero((costs > 0) & (voters > 0))
+        options = options[np.argsort(costs[options], kind="stable")]
+        # Cheapest groups first, the last one possibly split
+        taken = np.minimum(voters[options], np.maximum(deficits[target] - np.cumsum(voters[options])
+                                                       + voters[options], 0))
+        options, taken = options[taken > 0], taken[taken > 0]
+        if taken.sum() < deficits[target]:
+            return math.inf
+        total += int(taken @ costs[options])
+        # Candidates passed by the moves of each group
+        passed = (depths[ballot[options]] > moved[options, None]) & \
+                 (depths[ballot[options]] <= moved[options, None] + costs[options, None])
+        np.maximum(deficits - taken @ passed, 0, out=deficits)
+        voters[options] -= taken
+        ballot = np.concatenate((ballot, ballot[options]))
+        moved = np.concatenate((moved, moved[options] + costs[options]))
+        voters = np.concatenate((voters, taken))
+    return total
+
+
+def dodgson_bounds(profile: Profile, candidate: int) -> Tuple[float, float]:
+    """
+    Approximates the Dodgson score of a candidate in polynomial time.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param candidate: The candidate.
+    :type candidate: int
+    :return: A lower bound of the Dodgson score, and the number of swaps of a greedy solution,
+             an upper bound. The bounds are equal when the approximation is exact, and infinite
+             when no swaps make the candidate a Condorcet winner.
+    :rtype: Tuple[float, float]
+    """
+    deficits, depths, counts = _dodgson_instance(profile, candidate)
+    return _dodgson_lower_bound(deficits, _dodgson_costs(depths, counts)), _dodgson_greedy(deficits, depths, counts)
+
+
+def dodgson_score(profile: Profile, candidate: int, max_nodes: int = 10 ** 6) -> float:
+    """
+    Computes the Dodgson score of a candidate exactly. The search decides, for each unique ballot
+    in turn, how many of its voters move the candidate up and to which depth; a voter only moves
+    the candidate just above a candidate it does not beat yet.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param candidate: The candidate.
+    :type candidate: int
+    :param max_nodes: The maximum number of nodes of the search, defaults to 10 ** 6.
+    :type max_nodes: int, optional
+    :return: The Dodgson score of the candidate, infinity if no swaps make it a Condorcet winner.
+    :rtype: float
+    """
+    deficits, depths, counts = _dodgson_instance(profile, candidate)
+    best = _dodgson_greedy(deficits, depths, counts)
+    if _dodgson_lower_bound(deficits, _dodgson_costs(depths, counts)) >= best:
+        return best
+    # Swap costs of the ballots from each one on
+    costs = [_dodgson_costs(depths[t:], counts[t:]) for t in range(len(counts))]
+    # Index of the deficit of each candidate above the scored one, from the closest, -1 if none
+    above = []
+    for row in depths.tolist():
+        indices = [-1] * max(row)
+        for i, depth in enumerate(row):
+            if depth:
+                indices[depth - 1] = i
+        above.append(indices)
+    counts = counts.tolist()
+    nodes = 0
+
+    def search(t, max_depth, left, deficits, cost):
+        nonlocal best, nodes
+        nodes += 1
+        if nodes > max_nodes:
+            raise ValueError(f"The search for the Dodgson score exceeds {max_nodes} nodes")
+        if not deficits.any():
+            best = min(best, cost)
+            return
+        if t == len(counts) or cost + _dodgson_lower_bound(deficits, costs[t]) >= best:
+            return
+        for depth in range(max_depth, 0, -1):
+            deepest = above[t][depth - 1]
+            if deepest < 0 or not deficits[deepest]:
+                continue
+            for voters in range(min(left, int(deficits[deepest])), 0, -1):
+                covered = deficits.copy()
+                passed = [i for i in above[t][:depth] if i >= 0]
+                covered[passed] = np.maximum(covered[passed] - voters, 0)
+                search(t, depth - 1, left - voters, covered, cost + voters * depth)
+        if t + 1 < len(counts):
+            search(t + 1, len(above[t + 1]), counts[t + 1], deficits, cost)
+
+    search(0, len(above[0]), counts[0], deficits, 0)
+    return best
+
+
+def _young_instance(profile: Profile, candidate: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the net preferences of the candidate, and, for each unique ballot ranking another
+    candidate above it, its count and the change of the net preferences of the candidate when one
+    of its voters is removed: +1 for the candidates ranked above it, -1 for the ones ranked below.
+    """
+    net_preference = profile._net_preference_matrix()[candidate].copy()
+    _, _, counts = profile._ragged_ballots()
+    positions = profile._positions()
+    num_candidates = len(net_preference)
+    ranked = (positions < num_candidates) & (positions[:, [candidate]] < num_candidates)
+    changes = np.where(ranked, np.sign(positions[:, [candidate]] - positions), 0)
+    # The candidate has to beat every other candidate, but not itself
+    net_preference[candidate] = 1
+    helpful = (changes > 0).any(axis=1)
+    return net_preference, counts[helpful], changes[helpful]
+
+
+def _young_lower_bound(net_preference: np.ndarray, counts: np.ndarray, changes: np.ndarray) -> float:
+    """
+    Returns a lower bound of the number of voters to remove: each removal raises each net
+    preference by at most 1, and only the voters ranking a candidate above the scored one do.
+    """
+    deficits = np.maximum(1 - net_preference, 0)
+    if (counts @ (changes > 0) < deficits).any():
+        return math.inf
+    return int(deficits.max())
+
+
+def _young_greedy(net_preference: np.ndarray, counts: np.ndarray, changes: np.ndarray) -> float:
+    """
+    Removes the voters covering the most deficits and creating the fewest new ones, until all the
+    deficits are covered, and returns the number of removed voters, or infinity if it gets stuck.
+    """
+    net_preference, counts = net_preference.copy(), counts.copy()
+    total = 0
+    while (net_preference < 1).any():
+        if not len(counts):
+            return math.inf
+        behind, tight = net_preference < 1, net_preference == 1
+        gains = (changes[:, behind] > 0).sum(axis=1) - (changes[:, tight] < 0).sum(axis=1)
+        gains[counts == 0] = np.iinfo(np.int64).min
+        t = int(np.argmax(gains))
+        if counts[t] == 0 or not (changes[t, behind] > 0).any():
+            return math.inf
+        # Voters of the same ballot are removed together while they only cover deficits
+        removed = 1
+        if not (changes[t] < 0).any():
+            removed = int(min(counts[t], (1 - net_preference[behind & (changes[t] > 0)]).min()))
+        counts[t] -= removed
+        net_preference += removed * changes[t]
+        total += removed
+    return total
+
+
+def young_bounds(profile: Profile, candidate: int) -> Tuple[float, float]:
+    """
+    Approximates the Young score of a candidate in polynomial time.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param candidate: The candidate.
+    :type candidate: int
+    :return: A lower bound of the Young score, and the number of removed voters of a greedy
+             solution, an upper bound. The bounds are equal when the approximation is exact, and
+             infinite when no removal makes the candidate a Condorcet winner.
+    :rtype: Tuple[float, float]
+    """
+    net_preference, counts, changes = _young_instance(profile, candidate)
+    return (_young_lower_bound(net_preference, counts, changes),
+            _young_greedy(net_preference, counts, changes))
+
+
+def young_score(profile: Profile, candidate: int, max_nodes: int = 10 ** 6) -> float:
+    """
+    Computes the Young score of a candidate exactly. The search decides, for each unique ballot in
+    turn, how many of its voters to remove.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param candidate: The candidate.
+    :type candidate: int
+    :param max_nodes: The maximum number of nodes of the search, defaults to 10 ** 6.
+    :type max_nodes: int, optional
+    :return: The Young score of the candidate, infinity if no removal makes it a Condorcet winner.
+    :rtype: float
+    """
+    net_preference, counts, changes = _young_instance(profile, candidate)
+    best = _young_greedy(net_preference, counts, changes)
+    if _young_lower_bound(net_preference, counts, changes) >= best:
+        return best
+    nodes = 0
+
+    def search(t, net_preference, cost):
+        nonlocal best, nodes
+        nodes += 1
+        if nodes > max_nodes:
+            raise ValueError(f"The search for the Young score exceeds {max_nodes} nodes")
+        if (net_preference >= 1).all():
+            best = min(best, cost)
+            return
+        if t == len(counts) or cost + _young_lower_bound(net_preference, counts[t:], changes[t:]) >= best:
+            return
+        for removed in range(int(counts[t]), -1, -1):
+            search(t + 1, net_preference + removed * changes[t], cost + removed)
+
+    search(0, net_preference, 0)
+    return best
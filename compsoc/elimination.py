@@ -0,0 +1,220 @@
+"""
+Elimination engine
+Round-based elimination rules (IRV, Coombs, Baldwin, Nanson) on the ragged ballots of a profile.
+Instead of building a new profile every round, the engine keeps, for each unique ballot, a cursor
+to its first and last remaining candidates, and a mask of the eliminated candidates. The first and
+last place tallies are updated incrementally from the ballots whose cursors moved.
+
+Truncated ballots rank their listed candidates above the missing ones: a ballot whose listed
+candidates are all eliminated is exhausted, and a ballot only casts a last place vote while it
+ranks all the remaining candidates.
+"""
+
+from typing import Callable, Iterable, List
+
+import numpy as np
+
+from compsoc.profile import Profile
+
+
+class EliminationState:
+    """
+    The state of an elimination over the ballots of a profile.
+
+    Attributes:
+        eliminated (np.ndarray): The mask of the eliminated candidates.
+        first_places (np.ndarray): The number of voters ranking each candidate first among the
+        remaining candidates.
+        last_places (np.ndarray): The number of voters ranking each candidate last among the
+        remaining candidates.
+    """
+
+    def __init__(self, profile: Profile):
+        """
+        Initializes the elimination with all the candidates of a profile.
+
+        :param profile: The voting profile.
+        :type profile: Profile
+        """
+        self.entries, self.offsets, self.counts = profile._ragged_ballots()
+        self.lengths = np.diff(self.offsets)
+        self.num_candidates = len(profile.candidates)
+        self.eliminated = np.zeros(self.num_candidates, dtype=bool)
+        # Ballot of each entry
+        self._rows = np.repeat(np.arange(len(self.counts)), self.lengths)
+        # Borda supports where a ranked candidate beats the missing ones:
+        # voters ranking a, minus voters ranking b above a
+        ranked = profile._positional_matrix().sum(axis=1)
+        self._borda_support = ranked[:, None] - profile._support_matrix().T
+        np.fill_diagonal(self._borda_support, 0)
+        self._front = np.zeros(len(self.counts), dtype=np.int64)
+        self._back = self.lengths - 1
+        # Number of remaining candidates ranked by each ballot
+        self._ranked = self.lengths.copy()
+        voting = np.flatnonzero(self.lengths > 0)
+        self.first_places = self._tally(self._at(voting, self._front), self.counts[voting])
+        complete = np.flatnonzero(self._ranked == self.num_candidates)
+        self.last_places = self._tally(self._at(complete, self._back), self.counts[complete])
+
+    def _at(self, rows: np.ndarray, cursors: np.ndarray) -> np.ndarray:
+        """
+        Returns the candidates under the cursors of some ballots.
+        """
+        return self.entries[self.offsets[rows] + cursors[rows]]
+
+    def _tally(self, candidates: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        return np.bincount(candidates, weights=counts, minlength=self.num_candidates).astype(np.int64)
+
+    @property
+    def remaining(self) -> np.ndarray:
+        """
+        The remaining candidates.
+        """
+        return np.flatnonzero(~self.eliminated)
+
+    def eliminate(self, candidates):
+        """
+        Eliminates candidates, moves the cursors of the ballots pointing to them, and updates the
+        tallies from these ballots only.
+
+        :param candidates: The candidates to eliminate.
+        :type candidates: Iterable[int]
+        """
+        candidates = np.asarray(list(candidates), dtype=np.int64)
+        complete_before = self._ranked == self.num_candidates - int(self.eliminated.sum())
+        self.eliminated[candidates] = True
+        newly_eliminated = np.zeros(self.num_candidates, dtype=bool)
+        newly_eliminated[candidates] = True
+        self._ranked -= np.bincount(self._rows[newly_eliminated[self.entries]], minlength=len(self.counts))
+        complete = self._ranked == self.num_candidates - int(self.eliminated.sum())
+
+        # Advance the front cursors pointing to an eliminated candidate
+        rows = np.flatnonzero(self._front < self.lengths)
+        moved = rows = rows[self.eliminated[self._at(rows, self._front)]]
+        while len(rows):
+            self._front[rows] += 1
+            rows = rows[self._front[rows] < self.lengths[rows]]
+            rows = rows[self.eliminated[self._at(rows, self._front)]]
+        voting = moved[self._front[moved] < self.lengths[moved]]
+        self.first_places[candidates] = 0
+        self.first_places += self._tally(self._at(voting, self._front), self.counts[voting])
+
+        # Move back the back cursors pointing to an eliminated candidate
+        rows = np.flatnonzero(self._back >= 0)
+        rows = rows[self.eliminated[self._at(rows, self._back)]]
+        moved = np.zeros(len(self.counts), dtype=bool)
+        moved[rows] = True
+        while len(rows):
+            self._back[rows] -= 1
+            rows = rows[self._back[rows] >= 0]
+            rows = rows[self.eliminated[self._at(rows, self._back)]]
+        # Complete ballots keep ranking all the remaining candidates: they vote again if their
+        # last candidate changed, as do the ballots that just became complete
+        voting = np.flatnonzero(complete & (moved | ~complete_before) & (self._back >= 0))
+        self.last_places[candidates] = 0
+        self.last_places += self._tally(self._at(voting, self._back), self.counts[voting])
+
+    def borda_scores(self) -> np.ndarray:
+        """
+        Computes the Borda scores restricted to the remaining candidates, from the pairwise
+        supports rather than from the ballots.
+
+        :return: The Borda score of each candidate, 0 for the eliminated ones.
+        :rtype: np.ndarray
+        """
+        remaining = ~self.eliminated
+        return np.where(remaining, self._borda_support[:, remaining].sum(axis=1), 0)
+
+
+def _last_of_lowest(candidates: np.ndarray, values: np.ndarray) -> List[int]:
+    """
+    Returns the candidate with the lowest value, ties going to the highest candidate id.
+    """
+    lowest = np.flatnonzero(values == values.min())
+    return [int(candidates[lowest[-1]])]
+
+
+def fewest_first_places(state: EliminationState) -> List[int]:
+    """
+    Selects the remaining candidate ranked first by the fewest voters (IRV).
+
+    :param state: The state of the elimination.
+    :type state: EliminationState
+    :return: The candidate to eliminate.
+    :rtype: List[int]
+    """
+    remaining = state.remaining
+    return _last_of_lowest(remaining, state.first_places[remaining])
+
+
+def most_last_places(state: EliminationState) -> List[int]:
+    """
+    Selects the remaining candidate ranked last by the most voters (Coombs). A candidate ranked
+    first by a majority of the non-exhausted ballots wins, and is never eliminated. When no ballot
+    casts a last place vote, the candidate with the fewest first places is selected instead.
+
+    :param state: The state of the elimination.
+    :type state: EliminationState
+    :return: The candidate to eliminate.
+    :rtype: List[int]
+    """
+    remaining = state.remaining
+    first_places = state.first_places[remaining]
+    eligible = remaining[2 * first_places <= first_places.sum()]
+    if not state.last_places[eligible].any():
+        return _last_of_lowest(eligible, state.first_places[eligible])
+    return _last_of_lowest(eligible, -state.last_places[eligible])
+
+
+def lowest_borda(state: EliminationState) -> List[int]:
+    """
+    Selects the remaining candidate with the lowest Borda score among the remaining candidates
+    (Baldwin).
+
+    :param state: The state of the elimination.
+    :type state: EliminationState
+    :return: The candidate to eliminate.
+    :rtype: List[int]
+    """
+    remaining = state.remaining
+    return _last_of_lowest(remaining, state.borda_scores()[remaining])
+
+
+def below_average_borda(state: EliminationState) -> List[int]:
+    """
+    Selects all the remaining candidates whose Borda score among the remaining candidates is below
+    the average (Nanson). When all the scores are equal, all the remaining candidates are selected.
+
+    :param state: The state of the elimination.
+    :type state: EliminationState
+    :return: The candidates to eliminate.
+    :rtype: List[int]
+    """
+    remaining = state.remaining
+    scores = state.borda_scores()[remaining]
+    below = remaining[scores < scores.mean()]
+    return (below if len(below) else remaining).tolist()
+
+
+def elimination_scores(profile: Profile, select: Callable[[EliminationState], Iterable[int]]) -> List[int]:
+    """
+    Runs an elimination until at most one candidate remains. The score of a candidate is the
+    round it was eliminated in, from 0, so that the candidates eliminated last rank first.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param select: Selects the candidates to eliminate in a round, e.g., fewest_first_places.
+    :type select: Callable[[EliminationState], Iterable[int]]
+    :return: The score of each candidate.
+    :rtype: List[int]
+    """
+    state = EliminationState(profile)
+    scores = np.zeros(state.num_candidates, dtype=np.int64)
+    elimination_round = 0
+    while len(state.remaining) > 1:
+        losers = list(select(state))
+        scores[losers] = elimination_round
+        state.eliminate(losers)
+        elimination_round += 1
+    scores[state.remaining] = elimination_round
+    return scores.tolist()
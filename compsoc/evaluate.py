@@ -1,14 +1,23 @@
 """
 Evaluation functions
 """
-from typing import List, Tuple, Callable
+import random
+import time
+import tracemalloc
+from typing import List, Optional, Tuple, Callable, Union
 
+import numpy as np
+
+from compsoc.aggregate import ResultAggregator
+from compsoc.axioms import pareto_optimal, unanimity
 from compsoc.profile import Profile
+from compsoc.trace import DEBUG, INFO, Tracer, get_tracer
 from compsoc.voter_model import get_profile_from_model, generate_distorted_from_normal_profile
 from compsoc.voting_rules.borda import borda_rule
 from compsoc.voting_rules.borda_gamma import get_borda_gamma
 from compsoc.voting_rules.copeland import copeland_rule
 from compsoc.voting_rules.dowdall import dowdall_rule
+from compsoc.voting_rules.ranked_pairs import ranked_pairs_rule
 from compsoc.voting_rules.simpson import simpson_rule
 
 
@@ -41,12 +50,47 @@ def voter_subjective_utility_for_elected_candidate(elected: List[int], vote: Tup
     return utility_for_top, total_utility
 
 
+def _ranking_utilities(profile: Profile, elected: List[int], topn: int) -> Tuple[float, float]:
+    """
+    Sums voter_subjective_utility_for_elected_candidate over the voters, at once over the ragged
+    ballots of the profile rather than ballot by ballot, or over the nodes of its ballot trie
+    when it was built.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param elected: The candidates, ranked.
+    :type elected: List[int]
+    :param topn: The number of top candidates to consider for utility calculation.
+    :type topn: int
+    :return: The total utility for the top candidates and for the top n candidates of the voters.
+    :rtype: Tuple[float, float]
+    """
+    if "trie" in profile._cache:
+        return profile.ballot_trie().utilities(elected, topn)
+    entries, _, _ = profile._ragged_ballots()
+    ranks, _, weights = profile._ragged_segments()
+    num_candidates = len(elected)
+    increments = np.empty(max(elected) + 1)
+    increments[elected] = (num_candidates - np.arange(num_candidates)) / num_candidates
+    utilities = weights * increments[entries]
+    return float(utilities[ranks == 0].sum()), float(utilities[ranks < topn].sum())
+
+
 def get_rule_utility(profile: Profile,
                      rule: Callable[[Profile, int], any],
                      topn: int,
-                     verbose=False):
+                     verbose=False,
+                     telemetry=False,
+                     axioms=False,
+                     tracer: Optional[Tracer] = None,
+                     memory=False):
     """
     Calculates the total utility and "top n" utility for a given rule.
+    With telemetry enabled, the cost of ranking the candidates with the rule is also
+    recorded: wall time and CPU time in seconds, and the number of calls into the scorer. With
+    memory enabled, the peak memory allocated (in bytes) is recorded as well, from a separate
+    ranking tracing the allocations. With axioms enabled, whether the ranking is Pareto optimal
+    and satisfies unanimity is also recorded (1.0 if so, 0.0 otherwise).
 
     :param profile: The voting profile.
     :type profile: Profile
@@ -56,30 +100,171 @@ def get_rule_utility(profile: Profile,
     :type topn: int
     :param verbose: Print additional information if True, defaults to False.
     :type verbose: bool, optional
-    :return: A dictionary containing the total utility for the top candidate and the total utility for top n candidates.
+    :param telemetry: Record the performance of the rule if True, defaults to False.
+    :type telemetry: bool, optional
+    :param axioms: Check Pareto optimality and unanimity if True, defaults to False.
+    :type axioms: bool, optional
+    :param tracer: Traces the ranking and a sample of the ballots with their utilities, defaults
+                   to None: the current tracer, see compsoc.trace.
+    :type tracer: Tracer, optional
+    :param memory: Record the peak memory of the rule if True, which ranks the candidates once
+                   more, defaults to False.
+    :type memory: bool, optional
+    :return: A dictionary containing the total utility for the top candidate and the total utility for top n candidates,
+             plus "wall_time", "cpu_time" and "calls" when telemetry is enabled, "peak_memory" when
+             memory is enabled, and "pareto" and "unanimity" when axioms are enabled.
     :rtype: dict[str, float]
     """
+    result, elected_candidates = _rule_utility(profile, rule, topn, verbose, telemetry, axioms, memory)
+    _trace_rule(tracer if tracer is not None else get_tracer(), profile, rule.__name__, topn, result,
+                elected_candidates)
+    return result
+
+
+def _rule_utility(profile: Profile, rule: Callable[[Profile, int], any], topn: int, verbose: bool,
+                  telemetry: bool, axioms: bool, memory: bool = False) -> Tuple[dict, List[int]]:
+    """
+    Evaluates a rule as get_rule_utility, without tracing it, and returns its results and its
+    ranking of the candidates.
+    """
     rule_name = rule.__name__
-    ranking = profile.ranking(rule)
+    measures = {}
+    if telemetry:
+        ranking, measures = _measure_ranking(profile, rule)
+    else:
+        ranking = profile.ranking(rule)
+    if memory:
+        measures["peak_memory"] = _measure_memory(profile, rule)
     elected_candidates = [c[0] for c in ranking]
     if verbose:
         print(f"Ranking based on '{rule_name}' gives {ranking} with winners {elected_candidates}")
         print("======================================================================")
-    total_u, total_u_n = 0., 0.
+    total_u, total_u_n = _ranking_utilities(profile, elected_candidates, topn)
     if verbose:
         print("Counts \t Ballot \t Utility of first")
-    for pair in profile.pairs:
-        # Utility of the ballot given elected_candidates, multipled by its counts
-        u, u_n = voter_subjective_utility_for_elected_candidate(elected_candidates, pair[1],
-                                                                topn=topn)
-        if verbose:
+        for pair in profile.pairs:
+            u, _ = voter_subjective_utility_for_elected_candidate(elected_candidates, pair[1], topn=topn)
             print(f"{pair[0]} \t {pair[1]} \t {u}")
-        total_u += pair[0] * u
-        total_u_n += pair[0] * u_n
-    if verbose:
         print("Total : ", total_u)
 
-    return {"top": total_u, "topn": total_u_n}
+    result = {"top": total_u, "topn": total_u_n}
+    result.update(measures)
+    if axioms:
+        result["pareto"] = float(pareto_optimal(profile, ranking))
+        result["unanimity"] = float(unanimity(profile, ranking))
+    return result, elected_candidates
+
+
+def _trace_rule(tracer: Tracer, profile: Profile, rule: str, topn: int, result: dict, elected: List[int]):
+    """
+    Traces the results and the ranking of a rule, and a sample of the ballots with their utilities.
+    """
+    if tracer.enabled(INFO):
+        tracer.emit("rule", rule=rule, ranking=elected, **result)
+    if tracer.enabled(DEBUG):
+        _trace_ballots(tracer, profile, topn, rule=rule, elected=elected)
+
+
+def _trace_ballots(tracer: Tracer, profile: Profile, topn: int, rule: Optional[str] = None,
+                   elected: Optional[List[int]] = None):
+    """
+    Traces a sample of the ballots of a profile, with their utilities if the ranking of a rule is given.
+    """
+    entries, offsets, counts = profile._ragged_ballots()
+    for i in tracer.sample(len(counts)):
+        ballot = entries[offsets[i]:offsets[i + 1]].tolist()
+        fields = {"count": int(counts[i]), "ballot": ballot}
+        if elected is not None:
+            fields["top"], fields["topn"] = voter_subjective_utility_for_elected_candidate(elected, ballot, topn)
+            fields["rule"] = rule
+        tracer.emit("ballot", DEBUG, **fields)
+
+
+def _measure_ranking(profile: Profile, rule: Callable[[Profile, int], any]):
+    """
+    Ranks the candidates with a rule while measuring its wall time, CPU time and number of calls
+    into the scorer. The allocations are not traced, whose hook would slow down the rules
+    allocating the most, see _measure_memory.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param rule: The voting rule function.
+    :type rule: Callable[[Profile, int], any]
+    :return: The ranking and a dictionary with the measures.
+    :rtype: tuple
+    """
+    calls = 0
+
+    def counted_rule(p, candidate):
+        nonlocal calls
+        calls += 1
+        return rule(p, candidate)
+
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    ranking = profile.ranking(counted_rule)
+    wall_time = time.perf_counter() - wall_start
+    cpu_time = time.process_time() - cpu_start
+    return ranking, {"wall_time": wall_time,
+                     "cpu_time": cpu_time,
+                     "calls": calls}
+
+
+def _measure_memory(profile: Profile, rule: Callable[[Profile, int], any]) -> int:
+    """
+    Measures the peak memory allocated by a rule ranking the candidates, tracing the allocations.
+    The rule ranks the candidates of a copy of the profile without any derived data, so that the
+    arrays and scores the rule computes and caches count as they do on a new profile, even after
+    the profile was ranked by the rule or by other rules.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param rule: The voting rule function.
+    :type rule: Callable[[Profile, int], any]
+    :return: The peak allocated memory in bytes.
+    :rtype: int
+    """
+    cold_profile = profile._cold_copy()
+    # Do not interfere with a caller that is already tracing allocations
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base_memory, _ = tracemalloc.get_traced_memory()
+        cold_profile.ranking(rule)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    return max(0, peak_memory - base_memory)
+
+
+def summarize_telemetry(results: Union[dict[int, dict[str, dict[str, float]]], ResultAggregator]
+                        ) -> dict[str, dict[str, float]]:
+    """
+    Summarizes the telemetry recorded over several iterations of evaluate_voting_rules.
+
+    :param results: The results of the iterations, keyed by the index of the iteration, or a
+                    ResultAggregator of the iterations.
+    :type results: Union[dict[int, dict[str, dict[str, float]]], ResultAggregator]
+    :return: For each rule, the total and mean wall time, the total CPU time, the total number of
+             calls into the scorer and, if recorded, the maximum peak memory.
+    :rtype: dict[str, dict[str, float]]
+    """
+    if not isinstance(results, ResultAggregator):
+        results = ResultAggregator(results.values())
+    summary = {}
+    for rule_name in results.rules:
+        if "wall_time" not in results.moments[rule_name]:
+            continue
+        summary[rule_name] = {"trials": results.count(rule_name, "wall_time"),
+                              "wall_time": results.total(rule_name, "wall_time"),
+                              "cpu_time": results.total(rule_name, "cpu_time"),
+                              "calls": round(results.total(rule_name, "calls")),
+                              "mean_wall_time": results.mean(rule_name, "wall_time")}
+        if "peak_memory" in results.moments[rule_name]:
+            summary[rule_name]["peak_memory"] = results.maximum(rule_name, "peak_memory")
+    return summary
 
 
 def evaluate_voting_rules(num_candidates: int,
@@ -87,7 +272,13 @@ def evaluate_voting_rules(num_candidates: int,
                           topn: int,
                           voters_model: str,
                           distortion_ratio: float = 0.0,
-                          verbose: bool = False
+                          verbose: bool = False,
+                          telemetry: bool = False,
+                          axioms: bool = False,
+                          seed: Optional[int] = None,
+                          processes: Optional[int] = None,
+                          tracer: Optional[Tracer] = None,
+                          memory: bool = False
                           ) -> dict[str, dict[str, float]]:
     """
     Evaluates various voting rules and returns a dictionary with the results.
@@ -104,27 +295,65 @@ def evaluate_voting_rules(num_candidates: int,
     :type distortion_ratio: int, optional
     :param verbose: Print additional information if True, defaults to False.
     :type verbose: bool, optional
+    :param telemetry: Record the performance of each rule if True, defaults to False.
+    :type telemetry: bool, optional
+    :param axioms: Check Pareto optimality and unanimity of each rule if True, defaults to False.
+    :type axioms: bool, optional
+    :param seed: Seeds the random generators before generating the profile if given, defaults to
+                 None. The same seed gives the same profile, e.g., to pair the trials of two
+                 configurations.
+    :type seed: int, optional
+    :param processes: Evaluates the rules in this many worker processes sharing the arrays of the
+                      profile if given, see compsoc.shared, defaults to None: one after the other.
+    :type processes: int, optional
+    :param tracer: Traces the profile, the rules and a summary of the trial, defaults to None: the
+                   current tracer, see compsoc.trace.
+    :type tracer: Tracer, optional
+    :param memory: Record the peak memory of each rule if True, see get_rule_utility, defaults to False.
+    :type memory: bool, optional
     :return: A dictionary containing the results for each voting rule.
     :rtype: dict[str, dict[str, float]]
 
     """
+    tracer = tracer if tracer is not None else get_tracer()
+    start = time.perf_counter()
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
     profile = get_profile_from_model(num_candidates, num_voters, voters_model)
     profile.distort(distortion_ratio)
+    configuration = {"candidates": num_candidates, "voters": num_voters, "model": voters_model,
+                     "distortion_ratio": distortion_ratio, "seed": seed}
     if verbose:
         print(profile.pairs)
+    if tracer.enabled(INFO):
+        tracer.emit("profile", ballots=len(profile.pairs), **configuration)
+    if tracer.enabled(DEBUG):
+        _trace_ballots(tracer, profile, topn)
     borda_rule.__name__ = "Borda"
     copeland_rule.__name__ = "Copeland"
     dowdall_rule.__name__ = "Dowdall"
     simpson_rule.__name__ = "Simpson"
+    ranked_pairs_rule.__name__ = "Ranked Pairs"
 
-    rules = [borda_rule, copeland_rule, dowdall_rule, simpson_rule]
+    rules = [borda_rule, copeland_rule, dowdall_rule, simpson_rule, ranked_pairs_rule]
     # Adding some extra Borda variants, with decay parameter
     for gamma in [1.0, 0.99, 0.75, 0.6, 0.25, 0.01]:
         gamma_rule = get_borda_gamma(gamma)
         gamma_rule.__name__ = f"Borda Gamma({gamma})"
         rules.append(gamma_rule)
 
-    result = {}
-    for rule in rules:
-        result[rule.__name__] = get_rule_utility(profile, rule, topn, verbose)
+    if processes is not None:
+        # compsoc.shared imports this module
+        from compsoc.shared import evaluate_rules_shared
+        result = evaluate_rules_shared(profile, rules, topn, processes, verbose, telemetry, axioms, tracer=tracer,
+                                       memory=memory)
+    else:
+        result = {}
+        for rule in rules:
+            result[rule.__name__] = get_rule_utility(profile, rule, topn, verbose, telemetry, axioms, tracer, memory)
+    if tracer.enabled(INFO):
+        tracer.emit("trial", duration=time.perf_counter() - start, **configuration,
+                    top={name: r["top"] for name, r in result.items()},
+                    topn={name: r["topn"] for name, r in result.items()})
     return result
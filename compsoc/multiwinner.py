@@ -0,0 +1,223 @@
+"""
+Multiwinner rules
+Committee selection rules on the ballot arrays of a profile: SNTV, Bloc, Chamberlin-Courant and
+Proportional Approval Voting (PAV). Chamberlin-Courant and PAV are selected greedily, with lazy
+evaluation of the marginal gains through a priority queue: since their objectives are
+submodular, a gain computed in an earlier round is an upper bound of the current one, and only
+the candidates reaching the top of the queue are evaluated again. An exact search over all the
+committees is available for small instances.
+"""
+
+import heapq
+from itertools import combinations
+from math import comb
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from compsoc.profile import Profile
+
+
+def _top_k(values: np.ndarray, k: int) -> List[int]:
+    """
+    Returns the k candidates with the highest values, ties going to the lowest candidate ids.
+    """
+    return np.lexsort((np.arange(len(values)), -values))[:k].tolist()
+
+
+def sntv(profile: Profile, k: int) -> List[int]:
+    """
+    Selects the committee of the k candidates ranked first by the most voters (Single
+    Non-Transferable Vote).
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param k: The size of the committee.
+    :type k: int
+    :return: The committee, by decreasing number of first places.
+    :rtype: List[int]
+    """
+    return _top_k(profile._positional_matrix()[:, 0], k)
+
+
+def bloc(profile: Profile, k: int) -> List[int]:
+    """
+    Selects the committee of the k candidates ranked in the top k positions by the most voters.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param k: The size of the committee.
+    :type k: int
+    :return: The committee, by decreasing number of top k positions.
+    :rtype: List[int]
+    """
+    return _top_k(profile._positional_matrix()[:, :k].sum(axis=1), k)
+
+
+def _borda_utilities(profile: Profile) -> np.ndarray:
+    """
+    Returns the Borda utility of each ballot for each candidate, 0 for the missing candidates.
+    """
+    positions = profile._positions()
+    num_candidates = len(profile.candidates)
+    return np.where(positions < num_candidates, num_candidates - 1 - positions, 0)
+
+
+def _approvals(profile: Profile, depth: int) -> np.ndarray:
+    """
+    Returns whether each ballot approves each candidate, i.e., ranks it in the top depth positions.
+    """
+    return profile._positions() < depth
+
+
+def _lazy_greedy(num_candidates: int, k: int, gain: Callable[[int], float], add: Callable[[int], None]) -> List[int]:
+    """
+    Selects k candidates greedily by marginal gain, re-evaluating a gain only when its candidate
+    reaches the top of the queue. Ties go to the lowest candidate ids.
+
+    :param num_candidates: The number of candidates.
+    :type num_candidates: int
+    :param k: The size of the committee.
+    :type k: int
+    :param gain: The marginal gain of adding a candidate to the current committee.
+    :type gain: Callable[[int], float]
+    :param add: Adds a candidate to the current committee.
+    :type add: Callable[[int], None]
+    :return: The committee, in the order of selection.
+    :rtype: List[int]
+    """
+    # Entries are (-gain, candidate, size of the committee when the gain was computed)
+    queue = [(-gain(candidate), candidate, 0) for candidate in range(num_candidates)]
+    heapq.heapify(queue)
+    committee = []
+    while len(committee) < k and queue:
+        negative_gain, candidate, size = heapq.heappop(queue)
+        if size == len(committee):
+            committee.append(candidate)
+            add(candidate)
+        else:
+            heapq.heappush(queue, (-gain(candidate), candidate, len(committee)))
+    return committee
+
+
+def _exact(num_candidates: int, k: int, objective: Callable[[List[int]], float], max_committees: int) -> List[int]:
+    """
+    Searches all the committees of size k for the best objective.
+    """
+    if comb(num_candidates, k) > max_committees:
+        raise ValueError(f"Exact search over {comb(num_candidates, k)} committees exceeds {max_committees}")
+    best, best_value = None, -np.inf
+    for committee in combinations(range(num_candidates), k):
+        value = objective(list(committee))
+        if value > best_value + 1e-9:
+            best, best_value = list(committee), value
+    return best
+
+
+def chamberlin_courant(profile: Profile, k: int, exact: bool = False, max_committees: int = 100000) -> List[int]:
+    """
+    Selects the committee maximizing the Borda utility of each voter for their preferred member
+    (Chamberlin-Courant).
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param k: The size of the committee.
+    :type k: int
+    :param exact: Search all the committees instead of the greedy selection, defaults to False.
+    :type exact: bool, optional
+    :param max_committees: The maximum number of committees of an exact search, defaults to 100000.
+    :type max_committees: int, optional
+    :return: The committee, in the order of selection, or by candidate id for an exact search.
+    :rtype: List[int]
+    """
+    _, _, counts = profile._ragged_ballots()
+    utilities = _borda_utilities(profile)
+    if exact:
+        return _exact(len(profile.candidates), k,
+                      lambda committee: counts @ utilities[:, committee].max(axis=1), max_committees)
+    # Utility of each ballot for its preferred member of the current committee
+    represented = np.zeros(len(counts), dtype=np.int64)
+
+    def gain(candidate):
+        return counts @ np.maximum(utilities[:, candidate] - represented, 0)
+
+    def add(candidate):
+        np.maximum(represented, utilities[:, candidate], out=represented)
+
+    return _lazy_greedy(len(profile.candidates), k, gain, add)
+
+
+def pav(profile: Profile, k: int, approval_depth: Optional[int] = None, exact: bool = False,
+        max_committees: int = 100000) -> List[int]:
+    """
+    Selects the committee maximizing the sum over voters of 1 + 1/2 + ... + 1/j, where j is the
+    number of members the voter approves (Proportional Approval Voting). A voter approves the
+    candidates in the top positions of their ballot.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param k: The size of the committee.
+    :type k: int
+    :param approval_depth: The number of top positions approved by each voter, defaults to k.
+    :type approval_depth: int, optional
+    :param exact: Search all the committees instead of the greedy selection, defaults to False.
+    :type exact: bool, optional
+    :param max_committees: The maximum number of committees of an exact search, defaults to 100000.
+    :type max_committees: int, optional
+    :return: The committee, in the order of selection, or by candidate id for an exact search.
+    :rtype: List[int]
+    """
+    _, _, counts = profile._ragged_ballots()
+    approvals = _approvals(profile, approval_depth or k)
+    if exact:
+        harmonic = np.concatenate(([0.], np.cumsum(1. / np.arange(1, k + 1))))
+        return _exact(len(profile.candidates), k,
+                      lambda committee: counts @ harmonic[approvals[:, committee].sum(axis=1)], max_committees)
+    # Number of approved members of the current committee, for each ballot
+    approved = np.zeros(len(counts), dtype=np.int64)
+
+    def gain(candidate):
+        voters = approvals[:, candidate]
+        return counts[voters] @ (1. / (approved[voters] + 1))
+
+    def add(candidate):
+        approved[approvals[:, candidate]] += 1
+
+    return _lazy_greedy(len(profile.candidates), k, gain, add)
+
+
+def get_committee_rule(method: Callable[..., List[int]], k: int, **kwargs) -> Callable[[Profile, int], int]:
+    """
+    Returns a scoring function ranking the members of the committee selected by a multiwinner
+    rule first, in their order in the committee, so that the committee is the top k of
+    Profile.ranking.
+
+    :param method: The multiwinner rule, e.g., pav.
+    :type method: Callable[..., List[int]]
+    :param k: The size of the committee.
+    :type k: int
+    :param kwargs: The other arguments of the rule.
+    :return: A callable scoring function.
+    :rtype: Callable[[Profile, int], int]
+    """
+    key = (method.__name__, k, tuple(sorted(kwargs.items())))
+
+    def committee_rule(profile: Profile, candidate: int) -> int:
+        """
+        Calculates the score of a candidate: k for the first member of the committee, down to 1
+        for the last one, and 0 for the candidates outside of the committee.
+
+        :param profile: The voting profile.
+        :type profile: VotingProfile
+        :param candidate: The base candidate for scoring.
+        :type candidate: int
+        :return: The committee score for the candidate.
+        :rtype: int
+        """
+        if key not in profile._cache:
+            committee = method(profile, k, **kwargs)
+            profile._cache[key] = {member: k - i for i, member in enumerate(committee)}
+        return profile._cache[key].get(candidate, 0)
+
+    committee_rule.__name__ = f"{method.__name__}_{k}"
+    return committee_rule
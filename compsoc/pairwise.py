@@ -0,0 +1,273 @@
+"""
+Pairwise tallies
+The pairwise comparisons of the candidates, as a dense C x C matrix or, over many candidates
+ranked by short ballots, as a sparse matrix of the pairs ranked together in some ballot. Unique
+ballots of lengths L_1, ..., L_U rank at most the sum of L_i * (L_i - 1) ordered pairs together,
+far fewer than C * C when the ballots are short, and pairwise_tally picks the layout from this
+density.
+
+Two semantics of the unranked candidates are supported. By default, a ballot missing one of two
+candidates does not count for the pair, as in Profile._net_preference_matrix. With unranked_below,
+a ballot ranks its candidates above the candidates it misses (see compsoc.preflib): the net
+preference of a over b then also gains the number of voters ranking a and subtracts the number of
+voters ranking b, and only these per-candidate offsets are kept besides the pairs ranked together.
+
+The Copeland and Simpson scores and the Condorcet winner and loser are computed without the dense
+matrix: the pairs never ranked together only depend on the offsets, and are counted by sorting
+the offsets once.
+"""
+
+from typing import TYPE_CHECKING, Optional, Tuple, Union
+
+import numpy as np
+
+from compsoc.tournament import simpson_scores as dense_simpson_scores
+
+if TYPE_CHECKING:
+    from scipy.sparse import csr_matrix
+
+    from compsoc.profile import Profile
+
+# Fraction of the C * C pairs ranked together above which the dense layout is used
+DENSITY = 0.1
+
+
+class PairwiseTally:
+    """
+    The net preferences of a profile, where the preference of candidate a over candidate b is
+    net[a, b] + offsets[a] - offsets[b].
+
+    Attributes:
+        net (Union[np.ndarray, csr_matrix]): The net preferences counting the ballots ranking both
+            candidates, dense, or sparse over the pairs ranked together in some ballot.
+        offsets (np.ndarray): The per-candidate offsets, the number of voters ranking each
+            candidate with unranked_below, 0 otherwise.
+    """
+
+    def __init__(self, net: Union[np.ndarray, "csr_matrix"], offsets: np.ndarray):
+        self.net = net
+        self.offsets = offsets
+
+    @property
+    def sparse(self) -> bool:
+        """
+        Whether the net preferences are stored as a sparse matrix.
+        """
+        return not isinstance(self.net, np.ndarray)
+
+    @property
+    def num_candidates(self) -> int:
+        """
+        The number of candidates.
+        """
+        return len(self.offsets)
+
+    def row(self, candidate: int) -> np.ndarray:
+        """
+        Returns the net preferences of a candidate over every candidate, 0 over itself.
+
+        :param candidate: The candidate.
+        :type candidate: int
+        :return: The row of the candidate in the net preference matrix (C).
+        :rtype: np.ndarray
+        """
+        net = self.net[candidate].toarray().ravel() if self.sparse else self.net[candidate]
+        row = net + self.offsets[candidate] - self.offsets
+        row[candidate] = 0
+        return row
+
+    def to_dense(self) -> np.ndarray:
+        """
+        Returns the net preference matrix, where entry [a, b] is the preference of candidate a
+        over candidate b.
+
+        :return: The net preference matrix (C x C).
+        :rtype: np.ndarray
+        """
+        net = self.net.toarray() if self.sparse else self.net
+        return net + self.offsets[:, None] - self.offsets[None, :]
+
+    def _stored(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the rows, columns and net preferences, offsets included, of the stored
+        off-diagonal pairs of a sparse tally.
+        """
+        net = self.net.tocoo()
+        off_diagonal = net.row != net.col
+        rows, columns = net.row[off_diagonal], net.col[off_diagonal]
+        return rows, columns, net.data[off_diagonal] + self.offsets[rows] - self.offsets[columns]
+
+    def outcomes(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Counts the pairwise wins, ties and losses of each candidate against the other candidates.
+
+        :return: The wins (C), the ties (C) and the losses (C).
+        :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray]
+        """
+        num_candidates = self.num_candidates
+        if not self.sparse:
+            net_preference = self.to_dense()
+            return ((net_preference > 0).sum(axis=1), (net_preference == 0).sum(axis=1) - 1,
+                    (net_preference < 0).sum(axis=1))
+        # As if no pair was ranked together: a candidate beats the candidates of smaller offsets
+        ordered = np.sort(self.offsets)
+        wins = np.searchsorted(ordered, self.offsets, side="left")
+        losses = num_candidates - np.searchsorted(ordered, self.offsets, side="right")
+        ties = num_candidates - 1 - wins - losses
+        # Then the outcomes of the stored pairs replace the ones of their offsets
+        rows, columns, net = self._stored()
+        without = np.sign(self.offsets[rows] - self.offsets[columns])
+        with_net = np.sign(net)
+        for outcome, sign in ((wins, 1), (ties, 0), (losses, -1)):
+            outcome += np.bincount(rows, weights=(with_net == sign).astype(np.int64) - (without == sign),
+                                   minlength=num_candidates).astype(np.int64)
+        return wins, ties, losses
+
+    def copeland_scores(self, tie_credit: Optional[float] = None) -> np.ndarray:
+        """
+        Computes the Copeland scores of all the candidates, see compsoc.tournament.copeland_scores.
+
+        :param tie_credit: The credit of a pairwise tie, a win being worth 1 and a loss 0. Defaults to
+                           None, for the number of wins minus the number of losses.
+        :type tie_credit: float, optional
+        :return: The Copeland score of each candidate.
+        :rtype: np.ndarray
+        """
+        wins, ties, losses = self.outcomes()
+        if tie_credit is None:
+            return wins - losses
+        return wins + tie_credit * ties
+
+    def simpson_scores(self) -> np.ndarray:
+        """
+        Computes the Simpson (minimax) scores of all the candidates, see
+        compsoc.tournament.simpson_scores.
+
+        :return: The Simpson score of each candidate.
+        :rtype: np.ndarray
+        """
+        if not self.sparse:
+            return dense_simpson_scores(self.to_dense())
+        num_candidates = self.num_candidates
+        candidates = np.arange(num_candidates)
+        # The worst pair never ranked together is against the candidate of largest offset outside
+        # of the stored pairs of the row: the first rank, by decreasing offset, that they skip
+        by_offset = np.argsort(-self.offsets, kind="stable")
+        rank = np.empty(num_candidates, dtype=np.int64)
+        rank[by_offset] = candidates
+        rows, columns, net = self._stored()
+        # The stored pairs are unique and off the diagonal
+        keys = np.sort(np.concatenate((rows, candidates)) * num_candidates
+                       + rank[np.concatenate((columns, candidates))])
+        key_rows, key_ranks = keys // num_candidates, keys % num_candidates
+        index = np.arange(len(keys)) - np.searchsorted(key_rows, candidates)[key_rows]
+        first_skipped = np.bincount(key_rows, minlength=num_candidates)
+        skipped = key_ranks != index
+        np.minimum.at(first_skipped, key_rows[skipped], index[skipped])
+        scores = np.full(num_candidates, np.iinfo(np.int64).max, dtype=np.int64)
+        unpaired = first_skipped < num_candidates
+        scores[unpaired] = self.offsets[unpaired] - self.offsets[by_offset[first_skipped[unpaired]]]
+        np.minimum.at(scores, rows, net)
+        return scores
+
+    def condorcet_winner(self) -> Optional[int]:
+        """
+        Finds the Condorcet winner, who beats every other candidate.
+
+        :return: The Condorcet winner, or None if there is none.
+        :rtype: Optional[int]
+        """
+        wins, _, _ = self.outcomes()
+        winners = np.flatnonzero(wins == self.num_candidates - 1)
+        return int(winners[0]) if len(winners) else None
+
+    def condorcet_loser(self) -> Optional[int]:
+        """
+        Finds the Condorcet loser, who is beaten by every other candidate.
+
+        :return: The Condorcet loser, or None if there is none.
+        :rtype: Optional[int]
+        """
+        _, _, losses = self.outcomes()
+        losers = np.flatnonzero(losses == self.num_candidates - 1)
+        return int(losers[0]) if len(losers) else None
+
+
+def _sparse_support(profile: "Profile") -> "csr_matrix":
+    """
+    Returns the pairwise supports as a sparse C x C matrix, see Profile._support_matrix, storing
+    only the pairs ranked together in some ballot.
+    """
+    # SciPy is slow to import, and only needed for the sparse layout
+    from scipy.sparse import coo_matrix, csr_matrix
+
+    entries, _, _ = profile._ragged_ballots()
+    _, remaining, weights = profile._ragged_segments()
+    num_candidates = len(profile.candidates)
+    support = csr_matrix((num_candidates, num_candidates), dtype=np.int64)
+    # Entries by decreasing number of entries after them in their ballot, as in Profile._support_matrix
+    order = np.argsort(-remaining, kind="stable")
+    with_successor = np.cumsum(np.bincount(remaining)[::-1])[::-1]
+    rows, columns, values, size = [], [], [], 0
+    for distance in range(1, len(with_successor)):
+        above = order[:with_successor[distance]]
+        rows.append(entries[above])
+        columns.append(entries[above + distance])
+        values.append(weights[above])
+        size += len(above)
+        # Sum the pairs by batches of bounded size
+        if size >= 2 ** 22 or distance == len(with_successor) - 1:
+            support = support + coo_matrix((np.concatenate(values), (np.concatenate(rows), np.concatenate(columns))),
+                                           shape=(num_candidates, num_candidates)).tocsr()
+            rows, columns, values, size = [], [], [], 0
+    return support
+
+
+def pair_density(profile: "Profile") -> float:
+    """
+    Returns an upper bound of the fraction of the C * C pairs of candidates ranked together in
+    some ballot, from the lengths of the unique ballots.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :return: The density of the pairs ranked together.
+    :rtype: float
+    """
+    _, offsets, _ = profile._ragged_ballots()
+    lengths = np.diff(offsets)
+    return float((lengths * (lengths - 1)).sum()) / len(profile.candidates) ** 2
+
+
+def pairwise_tally(profile: "Profile", unranked_below: bool = False, sparse: Optional[bool] = None) -> PairwiseTally:
+    """
+    Returns the pairwise tally of a profile, built at the first call and kept with the profile.
+
+    :param profile: The voting profile.
+    :type profile: Profile
+    :param unranked_below: Whether a ballot ranks its candidates above the candidates it misses,
+                           defaults to False: a ballot missing a candidate does not count for its pairs.
+    :type unranked_below: bool, optional
+    :param sparse: Whether to store the pairs ranked together as a sparse matrix, defaults to None:
+                   sparse when their density is below DENSITY, unless the profile already has a
+                   dense matrix, e.g., a profile derived from precomputed data.
+    :type sparse: bool, optional
+    :return: The pairwise tally.
+    :rtype: PairwiseTally
+    """
+    if sparse is None:
+        dense_cached = "net_preference" in profile._cache or "support" in profile._cache
+        sparse = not dense_cached and pair_density(profile) < DENSITY
+    key = ("pairwise", unranked_below, sparse)
+    if key not in profile._cache:
+        if sparse:
+            support = _sparse_support(profile)
+            net = (support - support.T).tocsr()
+        else:
+            net = profile._net_preference_matrix()
+        offsets = np.zeros(len(profile.candidates), dtype=np.int64)
+        if unranked_below:
+            entries, _, _ = profile._ragged_ballots()
+            _, _, weights = profile._ragged_segments()
+            offsets = np.bincount(entries, weights=weights, minlength=len(offsets)).astype(np.int64)
+        profile._cache[key] = PairwiseTally(net, offsets)
+    return profile._cache[key]
@@ -1,26 +1,154 @@
 """
 Plotting the scores
+Figures are rendered from the summaries of the trials (see compsoc.aggregate.ResultAggregator),
+only when requested: to a file, and as a base64-encoded PNG if asked for.
 """
 
+import os
+from base64 import b64encode
+from io import BytesIO
+from typing import Dict, List, Optional
+
 import numpy as np
-import pandas as pd
 from matplotlib import pylab as plt
 from matplotlib import use
-from base64 import b64encode
-from io import BytesIO
+
+from compsoc.aggregate import ResultAggregator
 
 use("Agg")  # Use non-interactive backend for mpl
 
+
+def figure_name(voter_model: str, num_voters: int, num_candidates: int, number_iterations: int,
+                distortion_ratio: float = 0.0) -> str:
+    """
+    Returns the file name of the figure of a configuration.
+
+    :param voter_model: The generative model to use.
+    :type voter_model: str
+    :param num_voters: The number of voters in the model.
+    :type num_voters: int
+    :param num_candidates: The number of candidates in the model.
+    :type num_candidates: int
+    :param number_iterations: The number of iterations for the simulation.
+    :type number_iterations: int
+    :param distortion_ratio: The distortion ratio, defaults to 0.0.
+    :type distortion_ratio: float, optional
+    :return: The file name.
+    :rtype: str
+    """
+    return f"scores_{num_candidates}_{num_voters}_{voter_model}_{number_iterations}_" \
+           f"{distortion_ratio if distortion_ratio != 0.0 else None}.png"
+
+
+def plot_summary(summary: Dict[str, Dict[str, float]], voter_model: str, num_voters: int, num_candidates: int,
+                 num_topn: int, number_iterations: int, distortion_ratio: float = 0.0,
+                 file_path: Optional[str] = None, dpi: int = 300, encode: bool = False,
+                 figure=None) -> Optional[str]:
+    """
+    Plots the mean scores of the voting rules, with their standard deviations.
+
+    :param summary: The summary of the trials, with "top_mean", "top_std", "topn_mean" and
+                    "topn_std" by rule, see ResultAggregator.summary.
+    :type summary: Dict[str, Dict[str, float]]
+    :param voter_model: The generative model to use.
+    :type voter_model: str
+    :param num_voters: The number of voters in the model.
+    :type num_voters: int
+    :param num_candidates: The number of candidates in the model.
+    :type num_candidates: int
+    :param num_topn: The number of top candidates to consider.
+    :type num_topn: int
+    :param number_iterations: The number of iterations for the simulation.
+    :type number_iterations: int
+    :param distortion_ratio: The distortion ratio, defaults to 0.0.
+    :type distortion_ratio: float, optional
+    :param file_path: The PNG file to save the figure to, defaults to None.
+    :type file_path: str, optional
+    :param dpi: The resolution of the images, defaults to 300.
+    :type dpi: int, optional
+    :param encode: If True, returns the figure as a base64-encoded PNG, defaults to False.
+    :type encode: bool, optional
+    :param figure: A figure with two axes to draw on, e.g., reused over a batch, defaults to
+                   None: a new figure is created, and closed when done.
+    :type figure: matplotlib.figure.Figure, optional
+    :return: Base64 encoded string representation of the plot image if encode is True.
+    :rtype: Optional[str]
+    """
+    fig = figure if figure is not None else plt.subplots(1, 2, figsize=(10, 5))[0]
+    fig.subplots_adjust(bottom=0.25)
+    rules = list(summary)
+    x = np.arange(len(rules))
+    for ax, metric, color, title in zip(fig.axes, ("top", "topn"), ("b", "g"), ("Top mean", f"Top{num_topn} mean")):
+        ax.clear()
+        ax.errorbar(x, [summary[rule][f"{metric}_mean"] for rule in rules],
+                    yerr=[summary[rule][f"{metric}_std"] for rule in rules], capsize=2, fmt="o-", color=color)
+        ax.set_xticks(x)
+        ax.set_xticklabels(rules, rotation=90)
+        ax.set_xlabel("Voting rules")
+        ax.set_ylabel("Mean scores")
+        ax.set_title(title)
+        ax.grid(color="gray", linestyle="dashed", linewidth=0.1)
+    fig.suptitle(
+        f"{num_voters} voters and {num_candidates} candidates. {number_iterations} iterations. " +
+        (f"Profiles are {voter_model} with distortion ratio {distortion_ratio}" if distortion_ratio != 0.0 else ""))
+    encoded = None
+    try:
+        if file_path is not None:
+            fig.savefig(file_path, format="png", dpi=dpi)
+        if encode:
+            tmpfile = BytesIO()
+            fig.savefig(tmpfile, format="png", dpi=dpi)
+            encoded = b64encode(tmpfile.getvalue()).decode("utf-8")
+    finally:
+        if figure is None:
+            plt.close(fig)
+    return encoded
+
+
+def plot_summaries(configurations: List[dict], directory: str = "figures", dpi: int = 300) -> List[str]:
+    """
+    Renders the figures of many configurations, e.g., of a sweep, to files, on a single figure.
+
+    :param configurations: The configurations, each with a "summary" and the other arguments of
+                           plot_summary (voter_model, num_voters, num_candidates, num_topn,
+                           number_iterations and optionally distortion_ratio).
+    :type configurations: List[dict]
+    :param directory: The directory of the files, defaults to "figures".
+    :type directory: str, optional
+    :param dpi: The resolution of the images, defaults to 300.
+    :type dpi: int, optional
+    :return: The paths of the files, named by figure_name.
+    :rtype: List[str]
+    """
+    os.makedirs(directory, exist_ok=True)
+    fig, _ = plt.subplots(1, 2, figsize=(10, 5))
+    paths = []
+    try:
+        for configuration in configurations:
+            configuration = dict(configuration)
+            summary = configuration.pop("summary")
+            path = os.path.join(directory, figure_name(
+                configuration["voter_model"], configuration["num_voters"], configuration["num_candidates"],
+                configuration["number_iterations"], configuration.get("distortion_ratio", 0.0)))
+            plot_summary(summary, file_path=path, dpi=dpi, figure=fig, **configuration)
+            paths.append(path)
+    finally:
+        plt.close(fig)
+    return paths
+
+
 def plot_comparison_results(voter_model: str, results: dict, num_voters: int, num_candidates: int,
                             num_topn: int,
-                            number_iterations: int, distortion_ratio = 0.0 , save_figure: bool = False):
+                            number_iterations: int, distortion_ratio=0.0, save_figure: bool = False,
+                            encode: bool = True):
     """
     Plot the mean scores for all voting rules.
 
     :param voter_model: The generative model to use.
     :type voter_model: str
-    :param results: The voting rule result data to be plotted. Key is the index of iteration.
-    :type results: dict
+    :param results: The voting rule result data to be plotted, keyed by the index of the
+                    iteration, or a ResultAggregator of the iterations.
+    :type results: Union[dict, ResultAggregator]
     :param num_voters: The number of voters in the model.
     :type num_voters: int
     :param num_candidates: The number of candidates in the model.
@@ -31,56 +159,29 @@ def plot_comparison_results(voter_model: str, results: dict, num_voters: int, nu
     :type number_iterations: int
     :param save_figure: If True, saves the figure as a png file, defaults to False.
     :type save_figure: bool, optional
-    :return: Base64 encoded string representation of the plot image.
+    :param encode: If True, returns the figure as a base64-encoded PNG, defaults to True.
+    :type encode: bool, optional
+    :return: Base64 encoded string representation of the plot image, if encode is True.
     :rtype: str
     """
-    # Aggregate results
-    voting_rules = list(results[0].keys())
-    results_agg = []
-    for rule in voting_rules:
-        for i in range(number_iterations):
-            r = results[i][rule]
-            r["rule"] = rule
-            results_agg.append(r)
-    df = pd.DataFrame(results_agg)
-    df = df.set_index("rule")
-    # Summarize the results using pivot_table
-    df_summary = df.pivot_table(values=["top", "topn"],
-                                index=df.index.get_level_values(0),
-                                aggfunc={"top": ["mean", "std"],
-                                         "topn": ["mean", "std"]})
-    df_summary.columns = df_summary.columns.map("_".join)
-    # Plot the scores for all voting rules
-    fig, axes = plt.subplots(1, 2, figsize=(10, 5))
-    fig.subplots_adjust(bottom=0.25)
-    df_summary.plot(y="top_mean", yerr="top_std", legend=False,
-                    capsize=2, fmt="o-", color="b",
-                    rot=90, ax=axes[0])
-    axes[0].set_xticks(np.arange(len(df_summary)))
-    axes[0].set_xticklabels(df_summary.index)
-    axes[0].set_xlabel("Voting rules")
-    axes[0].set_ylabel("Mean scores")
-    axes[0].set_title("Top mean")
-    axes[0].grid(color="gray", linestyle="dashed", linewidth=0.1)
-    df_summary.plot(y="topn_mean", yerr="topn_std", legend=False,
-                    capsize=2, fmt="o-", color="g",
-                    rot=90, ax=axes[1])
-    axes[1].set_xticks(np.arange(len(df_summary)))
-    axes[1].set_xticklabels(df_summary.index)
-    axes[1].set_xlabel("Voting rules")
-    axes[1].set_ylabel("Mean scores")
-    axes[1].set_title(f"Top{num_topn} mean")
-    axes[1].grid(color="gray", linestyle="dashed", linewidth=0.1)
-    fig.suptitle(
-        f"{num_voters} voters and {num_candidates} candidates. {number_iterations} iterations. " +
-        (f"Profiles are {voter_model} with distortion ratio {distortion_ratio}" if distortion_ratio != 0.0 else ""))
+    if not save_figure and not encode:
+        return None
+    if not isinstance(results, ResultAggregator):
+        # The results of the iterations are read, not modified
+        results = ResultAggregator(results[i] for i in range(number_iterations))
+    summary = results.summary(["top", "topn"])
+    file_path = None
     if save_figure:
-        plt.savefig(
-            f"figures/scores_{num_candidates}_{num_voters}_{voter_model}_{number_iterations}_{distortion_ratio if distortion_ratio != 0.0 else None}.png",
-            format="png", dpi=500)
-
-    # Instantiate tmp file
-    tmpfile = BytesIO()
-    plt.savefig(tmpfile, format="png", dpi=300)
-    encoded = b64encode(tmpfile.getvalue()).decode("utf-8")
-    return encoded
+        file_path = os.path.join("figures", figure_name(voter_model, num_voters, num_candidates,
+                                                        number_iterations, distortion_ratio))
+    fig, _ = plt.subplots(1, 2, figsize=(10, 5))
+    try:
+        plot_summary(summary, voter_model, num_voters, num_candidates, num_topn, number_iterations,
+                     distortion_ratio, file_path=file_path, dpi=500, figure=fig)
+        if not encode:
+            return None
+        tmpfile = BytesIO()
+        fig.savefig(tmpfile, format="png", dpi=300)
+        return b64encode(tmpfile.getvalue()).decode("utf-8")
+    finally:
+        plt.close(fig)
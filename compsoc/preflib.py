@@ -0,0 +1,161 @@
+"""
+PrefLib loader
+Reads PrefLib files of strict orders, complete (.soc) or incomplete (.soi), and of orders with
+ties (.toc), optionally gzip-compressed (e.g., 00004-00000001.soi.gz). The file is streamed in
+chunks of lines: the counts and ballots of a chunk are converted to integers at once with NumPy,
+and the profile is built from the ballot arrays directly.
+
+Alternatives are numbered from 1 in PrefLib files, and from 0 in profiles. Profiles have no
+ties: a ballot of a .toc file is cut before its first group of tied alternatives, which ends up
+with the unranked alternatives, below the ranked ones.
+"""
+
+import gzip
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+from compsoc.profile import Profile
+
+EXTENSIONS = ("soc", "soi", "toc")
+
+# Separators of the counts and alternatives become commas, braces and spaces are dropped
+_SEPARATORS = bytes.maketrans(b":\n", b",,")
+_IGNORED = b"{} \t\r"
+
+
+def data_type(file_path: str) -> str:
+    """
+    Returns the data type of a PrefLib file from its extension.
+
+    :param file_path: Path to the PrefLib file.
+    :type file_path: str
+    :return: One of EXTENSIONS.
+    :rtype: str
+    """
+    name = file_path[:-3] if file_path.endswith(".gz") else file_path
+    extension = name.rsplit(".", 1)[-1]
+    if extension not in EXTENSIONS:
+        raise ValueError(f"Unknown PrefLib data type: {extension}, expected one of {EXTENSIONS}")
+    return extension
+
+
+def _read_lines(file_path: str, chunk_size: int) -> Iterator[List[bytes]]:
+    """
+    Reads a file by chunks of about chunk_size bytes, and yields the complete lines of each chunk.
+    """
+    opener = gzip.open if file_path.endswith(".gz") else open
+    rest = b""
+    with opener(file_path, "rb") as f:
+        while True:
+            block = f.read(chunk_size)
+            if not block:
+                break
+            block = rest + block
+            end = block.rfind(b"\n") + 1
+            rest = block[end:]
+            if end:
+                yield block[:end - 1].split(b"\n")
+    if rest:
+        yield [rest]
+
+
+def parse_lines(lines: List[bytes], ties: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Parses data lines of a PrefLib file, like "7: 1,2,3" or "2: 1,{2,3},4" with ties.
+
+    :param lines: The data lines, without the comments and the empty lines.
+    :type lines: List[bytes]
+    :param ties: Whether the lines may contain tied alternatives, defaults to False.
+    :type ties: bool, optional
+    :return: The counts of the lines, the lengths of their ballots and the alternatives of all
+             the ballots, one after the other, numbered from 0.
+    :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray]
+    """
+    data = b"\n".join(lines)
+    chars = np.frombuffer(data, dtype=np.uint8)
+    separators = (chars == ord(",")) | (chars == ord(":"))
+    line_of_char = np.cumsum(chars == ord("\n"))
+    # A line has a count and one alternative per separator
+    lengths = np.bincount(line_of_char[separators], minlength=len(lines))
+    values = np.fromstring(data.translate(_SEPARATORS, _IGNORED), dtype=np.int64, sep=",")
+    if len(values) != len(lines) + lengths.sum():
+        raise ValueError("Malformed PrefLib data lines")
+    starts = np.cumsum(lengths + 1) - lengths - 1
+    counts = values[starts]
+    is_count = np.zeros(len(values), dtype=bool)
+    is_count[starts] = True
+    alternatives = values[~is_count] - 1
+    if ties:
+        braces = np.flatnonzero(chars == ord("{"))
+        if len(braces):
+            # Index in its ballot of the alternative opening each group of ties
+            separators_before = np.concatenate(([0], np.cumsum(separators)))
+            line_starts = np.concatenate(([0], np.flatnonzero(chars == ord("\n")) + 1))
+            tied_lines = line_of_char[braces]
+            index = separators_before[braces] - separators_before[line_starts[tied_lines]] - 1
+            tied_lines, first = np.unique(tied_lines, return_index=True)
+            cut = lengths.copy()
+            cut[tied_lines] = index[first]
+            offsets = np.arange(len(alternatives)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+            alternatives = alternatives[offsets < np.repeat(cut, lengths)]
+            lengths = cut
+    return counts, lengths, alternatives
+
+
+def read_preflib(file_path: str, chunk_size: int = 2 ** 24) -> Profile:
+    """
+    Reads a PrefLib file, streamed by chunks, into a profile. Identical ballots are merged, and
+    ballots without any ranked alternative are dropped.
+
+    :param file_path: Path to the PrefLib file, ending with .soc, .soi or .toc, and .gz if
+                      compressed.
+    :type file_path: str
+    :param chunk_size: The number of bytes read at once, defaults to 16 MiB.
+    :type chunk_size: int, optional
+    :return: The profile of the file.
+    :rtype: Profile
+    """
+    ties = data_type(file_path) == "toc"
+    num_candidates = None
+    all_counts, all_lengths, all_alternatives = [], [], []
+    for lines in _read_lines(file_path, chunk_size):
+        data = []
+        for line in lines:
+            if line.startswith(b"#"):
+                if line.startswith(b"# NUMBER ALTERNATIVES:"):
+                    # Lines like: "# NUMBER ALTERNATIVES: 379"
+                    num_candidates = int(line.split(b":")[1])
+            elif line.strip():
+                data.append(line)
+        if data:
+            counts, lengths, alternatives = parse_lines(data, ties)
+            all_counts.append(counts)
+            all_lengths.append(lengths)
+            all_alternatives.append(alternatives)
+    if not all_counts:
+        raise ValueError(f"No votes found in {file_path}")
+    counts, lengths = np.concatenate(all_counts), np.concatenate(all_lengths)
+    alternatives = np.concatenate(all_alternatives)
+    if num_candidates is None:
+        num_candidates = int(alternatives.max()) + 1
+
+    # As many columns as the longest ballot: short ballots over many alternatives stay small
+    ballots = np.full((len(counts), int(lengths.max())), -1, dtype=np.int64)
+    rows = np.repeat(np.arange(len(counts)), lengths)
+    ranks = np.arange(len(alternatives)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    ballots[rows, ranks] = alternatives
+    ranked = lengths > 0
+    if not ranked.any():
+        raise ValueError(f"No ranked alternatives found in {file_path}")
+    ballots, counts = ballots[ranked], counts[ranked]
+    # Merge identical ballots, e.g., .toc ballots cut at the same group of ties, sorting the
+    # ballots by column rather than as rows of bytes
+    order = np.lexsort(ballots.T[::-1])
+    ballots, counts = ballots[order], counts[order]
+    first = np.ones(len(ballots), dtype=bool)
+    first[1:] = (ballots[1:] != ballots[:-1]).any(axis=1)
+    counts = np.add.reduceat(counts, np.flatnonzero(first))
+    ballots = ballots[first]
+    lengths = (ballots >= 0).sum(axis=1)
+    return Profile.from_arrays(ballots, lengths, counts, num_candidates)
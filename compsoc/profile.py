@@ -2,15 +2,36 @@
 Voting profiles
 """
 
+import struct
 import sys
 from collections import Counter
-from itertools import combinations
+from itertools import chain, combinations
 from typing import List, Tuple, Set, Optional
 
 import numpy as np
 
+from compsoc.trie import BallotTrie
+
 sys.setrecursionlimit(1000000)
 
+# Binary profile files, see Profile.save
+_MAGIC = b"COMPSOC\0"
+_VERSION = 3
+_HEADER = struct.Struct("<8sIIqqqq")
+_ALIGNMENT = 64
+# Header flag: the support and positional matrices follow the ballot arrays
+_WITH_MATRICES = 1
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    """
+    Returns a read-only view of an array, so that no rule can modify the arrays shared with the
+    other rules.
+    """
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
 
 class Profile:
     """
@@ -28,6 +49,10 @@ class Profile:
         net_preference_graph (Dict[int, Dict[int, int]]): Represents the net preference graph.
         votes_per_candidate (List[Dict[int, int]]): The total votes for each candidate
         per rank position.
+
+    The rules can also read the profile as read-only arrays, shared by all the rules evaluated on
+    the profile: ballot_matrix, ballot_lengths, ballot_counts, positions, positional_counts,
+    pairwise_support and net_preferences.
         """
 
     def __init__(self, pairs: Set[Tuple[int, Tuple[int, ...]]], num_candidates: Optional[int] = None, distorted: bool = False):
@@ -54,13 +79,130 @@ class Profile:
 
         # Sum the frequencies of all the pairs
         self.total_votes = sum(pair[0] for pair in pairs)
-        # Create a Net Preference Graph
-        self.__calc_net_preference()
-        # Set votes_per_candidate for Plurality
-        self.__calc_votes_per_candidate()
+        # Cache of the array representation of the ballots and derived data
+        self._cache = {}
+        # Keys of the cache given at the creation of the profile rather than derived, see _cold_copy
+        self._inputs = ()
+        # The Net Preference Graph and the votes per candidate are created at the first access
+        self.net_preference_graph = None
+        self.votes_per_candidate = None
         # Initialize a Path Preference Graph
         self.path_preference_graph = {candidate: {} for candidate in self.candidates}
 
+    @property
+    def pairs(self):
+        """
+        The pairs (number of votes, ballot) of the profile. A profile built from ballot arrays
+        creates its pairs at the first access, as a list in the order of the arrays.
+        """
+        if self._pairs is None:
+            entries, offsets, counts = self._ragged_ballots()
+            entries, offsets = entries.tolist(), offsets.tolist()
+            self._pairs = [(count, tuple(entries[offsets[i]:offsets[i + 1]]))
+                           for i, count in enumerate(counts.tolist())]
+        return self._pairs
+
+    @pairs.setter
+    def pairs(self, pairs):
+        self._pairs = pairs
+
+    @property
+    def net_preference_graph(self):
+        """
+        The net preference graph, where net_preference_graph[a][b] is the preference of candidate a
+        over candidate b, created from the net preference matrix at the first access. Only the
+        ballots ranking both candidates count for a pair. Over many candidates, prefer the pairwise
+        tallies of compsoc.pairwise, which stay sparse for short ballots.
+        """
+        if self._net_preference_graph is None:
+            candidates = sorted(self.candidates)
+            self._net_preference_graph = {candidate: dict(zip(candidates, row)) for candidate, row
+                                          in zip(candidates, self._net_preference_matrix().tolist())}
+        return self._net_preference_graph
+
+    @net_preference_graph.setter
+    def net_preference_graph(self, net_preference_graph):
+        self._net_preference_graph = net_preference_graph
+
+    @property
+    def votes_per_candidate(self):
+        """
+        The total votes for each candidate for each rank position, created from the positional
+        counts at the first access.
+        """
+        if self._votes_per_candidate is None:
+            candidates = sorted(self.candidates)
+            self._votes_per_candidate = [dict(zip(candidates, row)) for row in self._positional_matrix().tolist()]
+        return self._votes_per_candidate
+
+    @votes_per_candidate.setter
+    def votes_per_candidate(self, votes_per_candidate):
+        self._votes_per_candidate = votes_per_candidate
+
+    # ---------------------------------------------
+    # Array API for the rules
+    # ---------------------------------------------
+    # Read-only arrays of the profile, computed at the first access and shared by every rule
+    # evaluated on the profile. Candidates are 0, ..., C-1, and the U unique ballots are in the
+    # iteration order of the pairs. For example, the Borda score of every candidate is
+    # profile.positional_counts @ np.arange(C - 1, -1, -1).
+    @property
+    def ballot_matrix(self) -> np.ndarray:
+        """
+        The ballots (U x L), ballot_matrix[i, r] being the candidate at position r of ballot i,
+        padded with -1 after the last ranked candidate of truncated ballots. The width L is at
+        most C, and is the length of the longest ballot for profiles built from arrays or loaded
+        from a file: index the positions up to ballot_lengths[i], not C. The matrix is built at
+        the first access: the other arrays are computed from the ballots without it.
+        """
+        return _read_only(self._ballot_arrays()[0])
+
+    @property
+    def ballot_lengths(self) -> np.ndarray:
+        """
+        The number of candidates ranked by each ballot (U).
+        """
+        return _read_only(np.diff(self._ragged_ballots()[1]))
+
+    @property
+    def ballot_counts(self) -> np.ndarray:
+        """
+        The number of voters of each ballot (U).
+        """
+        return _read_only(self._ragged_ballots()[2])
+
+    @property
+    def positions(self) -> np.ndarray:
+        """
+        The positions of the candidates in the ballots (U x C), positions[i, c] being the position
+        of candidate c in ballot i, from 0, or C if ballot i does not rank c.
+        """
+        return _read_only(self._positions())
+
+    @property
+    def positional_counts(self) -> np.ndarray:
+        """
+        The positional counts (C x C), positional_counts[c, r] being the number of voters ranking
+        candidate c at position r.
+        """
+        return _read_only(self._positional_matrix())
+
+    @property
+    def pairwise_support(self) -> np.ndarray:
+        """
+        The pairwise supports (C x C), pairwise_support[a, b] being the number of voters ranking
+        candidate a above candidate b. Ballots missing a or b do not count for the pair.
+        """
+        return _read_only(self._support_matrix())
+
+    @property
+    def net_preferences(self) -> np.ndarray:
+        """
+        The net preferences (C x C), net_preferences[a, b] being the preference of candidate a
+        over candidate b, as in the net preference graph.
+        """
+        return _read_only(self._net_preference_matrix())
+
     # ---------------------------------------------
     # Comparison routines
     # ---------------------------------------------
@@ -80,24 +222,41 @@ class Profile:
 
     def does_pareto_dominate(self, candidate1, candidate2) -> bool:
         """
-        Checks if candidate1 is preferred over candidate2 in all ballots.
+        Checks if candidate1 Pareto dominates candidate2, see pareto_dominance_matrix.
 
         :param candidate1: The first candidate to be compared.
         :type candidate1: int
         :param candidate2: The second candidate to be compared.
         :type candidate2: int
-        :return: True if candidate1 is preferred in all ballots, False otherwise.
+        :return: True if candidate1 Pareto dominates candidate2, False otherwise.
         :rtype: bool
         """
-        # A boolean list as candidate1 preferred
-        preferred = []
-        for pair in self.pairs:
-            if (candidate1 in pair[1]) and (candidate2 in pair[1]):
-                preferred.append(pair[1].index(candidate1) < pair[1].index(candidate2))
-
-        if len(preferred) == 0:
-            return True
-        return all(preferred)
+        return bool(self.pareto_dominance_matrix()[candidate1, candidate2])
+
+    def pareto_dominance_matrix(self) -> np.ndarray:
+        """
+        Computes the Pareto dominance between all pairs of candidates at once. Candidate a
+        dominates candidate b if no voter prefers b to a, and at least one voter prefers a to b.
+        In distorted ballots, a voter prefers every ranked candidate to the candidates missing
+        from their ballot, and is indifferent between two missing candidates.
+
+        :return: A C x C boolean matrix, where entry [a, b] is True if a dominates b.
+        :rtype: np.ndarray
+        """
+        if "pareto_dominance" not in self._cache:
+            positions = self._positions()
+            num_ballots, num_candidates = positions.shape
+            never_worse = np.ones((num_candidates, num_candidates), dtype=bool)
+            sometimes_better = np.zeros((num_candidates, num_candidates), dtype=bool)
+            # Bound the size of the (ballots x C x C) comparisons
+            chunk = max(1, 2 ** 22 // max(1, num_candidates ** 2))
+            for start in range(0, num_ballots, chunk):
+                block = positions[start:start + chunk]
+                before = block[:, :, None] < block[:, None, :]
+                never_worse &= ~before.transpose(0, 2, 1).any(axis=0)
+                sometimes_better |= before.any(axis=0)
+            self._cache["pareto_dominance"] = never_worse & sometimes_better
+        return self._cache["pareto_dominance"]
 
     def score(self, scorer) -> List[tuple[int, float]]:
         """
@@ -149,78 +308,6 @@ class Profile:
         # Return a set of winners
         return set(winners)
 
-    @staticmethod
-    def __preference(num_votes, candidate_1_index, candidate_2_index) -> int:
-        """
-        Computes the preference between two candidates and returns the preference
-        according to the number of votes.
-
-        :param num_votes: Number of votes.
-        :type num_votes: int
-        :param candidate_1_index: Index of the first candidate.
-        :type candidate_1_index: int
-        :param candidate_2_index: Index of the second candidate.
-        :type candidate_2_index: int
-        :return: The preference value.
-        :rtype: int
-        """
-        n = candidate_1_index - candidate_2_index
-        # Exception: if n is equal to 0, preference is 0,
-        # otherwise preference is num_votes * sign(n)
-        return 0 if n == 0 else num_votes * np.sign(n)
-
-    def __calc_net_preference(self):
-        """
-        Create a Net Preference Graph for the voting profile.
-        """
-        candidates = list(self.candidates)
-        num_candidates = len(candidates)
-        self.net_preference_graph = {candidate: {} for candidate in candidates}
-        for i in range(num_candidates):
-            candidate_1 = candidates[i]
-            for j in range(i, num_candidates):
-                candidate_2 = candidates[j]
-                # Preference list
-                preferences = []
-                # For each pair of voting data
-                for freq, ballot in self.pairs:
-                    # If both candidates are in the ballot
-                    if candidate_1 in ballot and candidate_2 in ballot:
-                        candidate_1_index = ballot.index(candidate_1)
-                        candidate_2_index = ballot.index(candidate_2)
-
-                        pref = self.__preference(freq,
-                                                 candidate_2_index,
-                                                 candidate_1_index)
-                        preferences.append(pref)  # save preference
-                # Computes the preference
-                preference = sum(preferences)
-                # Save preferencess
-                # candidate1 VS candidate2
-                self.net_preference_graph[candidate_1][candidate_2] = preference
-                # candidate2 VS candidate1
-                self.net_preference_graph[candidate_2][candidate_1] = -preference
-
-    def __calc_votes_per_candidate(self):
-        """
-        Computes the total votes for each candidate for each rank position.
-        """
-        # Initialize structure to save the scores
-        self.votes_per_candidate = []
-        # Number of candidate
-        n_candidates = len(self.candidates)
-        # For each candidate
-        for i in range(n_candidates):
-            self.votes_per_candidate.append(
-                {candidate: 0 for candidate in self.candidates})
-            # For each ballot's candidate, add votes
-            for freq, ballot in self.pairs:
-                # for distorted ballots
-                if i not in ballot:
-                    continue
-                self.votes_per_candidate[i][list(ballot).index(i)] += freq
-                # self.votes_per_candidate[i][ballot[i]] += freq
-
     def __calc_path_preference(self):
         """
         Computes paths' strengths for the Schulze method.
@@ -326,31 +413,81 @@ class Profile:
     @classmethod
     def parse_voting_data(cls, file_path):
         """
-        Parses a voting data file and creates a Profile instance.
+        Parses a PrefLib voting data file (.soc, .soi or .toc, optionally gzip-compressed) and
+        creates a Profile instance, see compsoc.preflib.read_preflib.
 
         :param file_path: Path to the voting data file.
         :type file_path: str
         :return: A Profile instance.
         :rtype: Profile
         """
-        if file_path[-3:] != "soi":
-            raise EncodingWarning("The extension has to be .soi")
-        pairs = []
-        num_candidates = None
-        with open(file_path, "r", encoding="utf-8") as f:
-            for line in f.readlines():
-                if line[0] == "#":
-                    if "NUMBER ALTERNATIVES" in line:
-                        # Parse lines like: "# NUMBER ALTERNATIVES: 379"
-                        num_candidates = int(line.split(":")[1].strip())
-                else:
-                    num_voters, order = line.split(":")
-                    ballot = tuple(order.strip().split(","))
-                    pair = (num_voters, ballot)
-                    pairs.append(pair)
-        if not set:
-            print("No votes found in file")
-        return cls(pairs, num_candidates=num_candidates)
+        # The loader builds profiles, and is imported when needed
+        from compsoc.preflib import read_preflib
+        return read_preflib(file_path)
+
+    @classmethod
+    def from_arrays(cls, ballots: np.ndarray, lengths: np.ndarray, counts: np.ndarray,
+                    num_candidates: int, cache: Optional[dict] = None) -> "Profile":
+        """
+        Creates a Profile instance from ballot arrays, in the layout of _ballot_arrays, without
+        going through the pairs. The ballots are expected to be unique.
+
+        :param ballots: The ballot matrix (U x L), padded with -1 after the last ranked candidate,
+                        where L is at least the length of the longest ballot.
+        :type ballots: np.ndarray
+        :param lengths: The lengths of the ballots (U).
+        :type lengths: np.ndarray
+        :param counts: The counts of the ballots (U).
+        :type counts: np.ndarray
+        :param num_candidates: The number of candidates.
+        :type num_candidates: int
+        :param cache: Precomputed array data, e.g., the support matrix, defaults to None.
+        :type cache: dict, optional
+        :return: A Profile instance.
+        :rtype: Profile
+        """
+        cache = dict(cache or {}, ballots=(ballots, lengths, counts))
+        return cls._from_cache(num_candidates, int(counts.sum()), cache)
+
+    @classmethod
+    def from_ragged(cls, entries: np.ndarray, offsets: np.ndarray, counts: np.ndarray,
+                    num_candidates: int, cache: Optional[dict] = None) -> "Profile":
+        """
+        Creates a Profile instance from ragged ballots, in the layout of _ragged_ballots, without
+        going through the pairs. The ballots are expected to be unique.
+
+        :param entries: The candidates of all the ballots, one ballot after the other (N).
+        :type entries: np.ndarray
+        :param offsets: The offsets of the ballots in the entries (U + 1).
+        :type offsets: np.ndarray
+        :param counts: The counts of the ballots (U).
+        :type counts: np.ndarray
+        :param num_candidates: The number of candidates.
+        :type num_candidates: int
+        :param cache: Precomputed array data, e.g., the support matrix, defaults to None.
+        :type cache: dict, optional
+        :return: A Profile instance.
+        :rtype: Profile
+        """
+        cache = dict(cache or {}, ragged=(entries, offsets, counts))
+        return cls._from_cache(num_candidates, int(counts.sum()), cache)
+
+    @classmethod
+    def _from_cache(cls, num_candidates: int, total_votes: int, cache: dict) -> "Profile":
+        """
+        Creates a profile whose ballots are in its cache of array data.
+        """
+        profile = cls.__new__(cls)
+        # The pairs are created from the arrays when needed
+        profile.pairs = None
+        profile.candidates = set(range(num_candidates))
+        profile.total_votes = total_votes
+        profile._cache = cache
+        profile._inputs = tuple(cache)
+        profile.net_preference_graph = None
+        profile.votes_per_candidate = None
+        profile.path_preference_graph = {candidate: {} for candidate in profile.candidates}
+        return profile
 
     @classmethod
     def ballot_box(cls, choices):
@@ -389,16 +526,357 @@ class Profile:
                 result_dict[pair[1]] += pair[0]
 
         self.pairs = set((value, key) for key, value in result_dict.items())
+        # The ballots changed
+        self._cache = {}
+        self._inputs = ()
 
-        # Create a Net Preference Graph
-        self.__calc_net_preference()
-
-        # Set votes_per_candidate for Plurality
-        self.__calc_votes_per_candidate()
+        # The Net Preference Graph and the votes per candidate are created again at the next access
+        self.net_preference_graph = None
+        self.votes_per_candidate = None
 
         # Initialize a Path Preference Graph
         self.path_preference_graph = {candidate: {} for candidate in self.candidates}
 
+    # ---------------------------------------------
+    # Serialization
+    # ---------------------------------------------
+    def _sections(self, matrices: bool = False) -> Tuple[bytes, List[np.ndarray]]:
+        """
+        Returns the header and the arrays of the binary format of the profile, see save.
+        """
+        entries, offsets, counts = self._ragged_ballots()
+        num_candidates = len(self.candidates)
+        flags = _WITH_MATRICES if matrices else 0
+        header = _HEADER.pack(_MAGIC, _VERSION, flags, num_candidates, len(counts), len(entries), self.total_votes)
+        sections = [entries, offsets, counts]
+        if matrices:
+            sections += [self._support_matrix(), self._positional_matrix()]
+        return header.ljust(_ALIGNMENT, b"\0"), sections
+
+    def nbytes(self, matrices: bool = False) -> int:
+        """
+        Returns the size of the profile in the binary format of save.
+
+        :param matrices: Include the support and positional matrices, defaults to False.
+        :type matrices: bool, optional
+        :return: The size in bytes.
+        :rtype: int
+        """
+        _, sections = self._sections(matrices)
+        return _ALIGNMENT + sum(8 * section.size + (-8 * section.size % _ALIGNMENT) for section in sections)
+
+    def save(self, file_path: str, matrices: bool = False):
+        """
+        Saves the profile in a binary file: a 64-byte header (magic number, format version, flags,
+        number of candidates, number of ballots, number of ranked entries, total number of votes),
+        followed by the ragged ballots (see _ragged_ballots): the entries, the offsets and the
+        counts, as little-endian 64-bit integers, each aligned on 64 bytes. The size of the file
+        is proportional to the ranked entries however truncated the ballots are, the support and
+        positional matrices being computed from them after loading when needed.
+        With matrices, they are saved as well, after the counts, for profiles whose ballots are
+        much larger than C x C and whose loads should not recompute them.
+
+        :param file_path: Path to the profile file.
+        :type file_path: str
+        :param matrices: Save the support and positional matrices (C x C), defaults to False.
+        :type matrices: bool, optional
+        """
+        header, sections = self._sections(matrices)
+        with open(file_path, "wb") as f:
+            f.write(header)
+            for section in sections:
+                np.ascontiguousarray(section, dtype="<i8").tofile(f)
+                f.write(b"\0" * (-f.tell() % _ALIGNMENT))
+
+    def save_to_buffer(self, buffer, matrices: bool = False):
+        """
+        Writes the profile in the binary format of save to a writable buffer of at least nbytes
+        bytes, e.g., a shared memory block.
+
+        :param buffer: The buffer.
+        :type buffer: memoryview
+        :param matrices: Write the support and positional matrices, defaults to False.
+        :type matrices: bool, optional
+        """
+        header, sections = self._sections(matrices)
+        data = np.frombuffer(buffer, dtype=np.uint8)
+        data[:len(header)] = np.frombuffer(header, dtype=np.uint8)
+        offset = _ALIGNMENT
+        for section in sections:
+            size = 8 * section.size
+            data[offset:offset + size].view("<i8").reshape(section.shape)[...] = section
+            offset += size + (-size % _ALIGNMENT)
+
+    @classmethod
+    def load(cls, file_path: str, mmap: bool = True) -> "Profile":
+        """
+        Loads a profile saved with save. The arrays are memory-mapped rather than read, so that
+        loading does not depend on their size, and processes loading the same file share its
+        pages. The preference graphs are built from the saved matrices, if any, or from the ballots.
+
+        :param file_path: Path to the profile file.
+        :type file_path: str
+        :param mmap: Memory-map the arrays, or read them into memory, defaults to True.
+        :type mmap: bool, optional
+        :return: A Profile instance, whose arrays are read-only when memory-mapped.
+        :rtype: Profile
+        """
+        with open(file_path, "rb") as f:
+            header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size or header[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"{file_path} is not a profile file")
+        data = np.memmap(file_path, dtype=np.uint8, mode="r") if mmap else np.fromfile(file_path, dtype=np.uint8)
+        return cls._from_data(data, file_path)
+
+    @classmethod
+    def load_from_buffer(cls, buffer) -> "Profile":
+        """
+        Creates a profile from a buffer written by save_to_buffer, e.g., a shared memory block.
+        The arrays of the profile are read-only views of the buffer, not copies.
+
+        :param buffer: The buffer.
+        :type buffer: memoryview
+        :return: A Profile instance.
+        :rtype: Profile
+        """
+        data = np.frombuffer(buffer, dtype=np.uint8)
+        data.flags.writeable = False
+        if len(data) < _HEADER.size or bytes(data[:len(_MAGIC)]) != _MAGIC:
+            raise ValueError("The buffer does not hold a profile")
+        return cls._from_data(data, "The buffer")
+
+    @classmethod
+    def _from_data(cls, data: np.ndarray, source: str) -> "Profile":
+        """
+        Creates a profile from the bytes of its binary format, with views of the bytes as arrays.
+        """
+        _, version, flags, num_candidates, num_ballots, num_entries, _ = _HEADER.unpack(bytes(data[:_HEADER.size]))
+        if version != _VERSION:
+            raise ValueError(f"Unsupported profile file version: {version}, expected {_VERSION}")
+        shapes = [(num_entries,), (num_ballots + 1,), (num_ballots,)]
+        if flags & _WITH_MATRICES:
+            shapes += [(num_candidates, num_candidates), (num_candidates, num_candidates)]
+        sections, offset = [], _ALIGNMENT
+        for shape in shapes:
+            size = 8 * int(np.prod(shape))
+            if offset + size > len(data):
+                raise ValueError(f"{source} is truncated")
+            sections.append(data[offset:offset + size].view("<i8").reshape(shape))
+            offset += size + (-size % _ALIGNMENT)
+        entries, offsets, counts = sections[:3]
+        cache = dict(zip(("support", "positional"), sections[3:]))
+        return cls.from_ragged(entries, offsets, counts, num_candidates, cache=cache)
+
+    # ---------------------------------------------
+    # Array representation
+    # ---------------------------------------------
+    def _ragged_ballots(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the ballots in a ragged (CSR-like) layout, in the iteration order of the pairs:
+        the candidates of all the ballots one after the other in a flat array, the offsets of the
+        ballots in this array, and their counts. Ballot i is entries[offsets[i]:offsets[i + 1]].
+        Unlike the ballot matrix, the memory is proportional to the ranked candidates, however
+        truncated the ballots are.
+
+        :return: The entries (N), the offsets (U + 1) and the counts (U).
+        :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray]
+        """
+        if "ragged" not in self._cache:
+            if "ballots" in self._cache:
+                ballots, lengths, counts = self._cache["ballots"]
+                # Row-major order, the padding being after the ranked candidates
+                entries = ballots[ballots >= 0]
+            else:
+                pairs = self.pairs
+                counts = np.fromiter((freq for freq, _ in pairs), dtype=np.int64, count=len(pairs))
+                lengths = np.fromiter((len(ballot) for _, ballot in pairs), dtype=np.int64, count=len(pairs))
+                entries = np.fromiter(chain.from_iterable(ballot for _, ballot in pairs), dtype=np.int64,
+                                      count=int(lengths.sum()))
+            offsets = np.concatenate(([0], np.cumsum(lengths)))
+            self._cache["ragged"] = (entries, offsets, counts)
+        return self._cache["ragged"]
+
+    def _ragged_segments(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns, for each entry of the ragged ballots, its rank in its ballot, the number of
+        entries after it in its ballot, and the count of its ballot.
+
+        :return: The ranks (N), the remaining lengths (N) and the weights (N).
+        :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray]
+        """
+        _, offsets, counts = self._ragged_ballots()
+        lengths = np.diff(offsets)
+        ranks = np.arange(offsets[-1]) - np.repeat(offsets[:-1], lengths)
+        return ranks, np.repeat(lengths, lengths) - ranks - 1, np.repeat(counts, lengths)
+
+    def ballot_trie(self) -> BallotTrie:
+        """
+        Returns the prefix trie of the ballots, built at the first call. Once built, the positional
+        counts and the evaluation utilities are computed over its nodes.
+
+        :return: The trie of the ballots.
+        :rtype: BallotTrie
+        """
+        if "trie" not in self._cache:
+            self._cache["trie"] = BallotTrie.from_profile(self)
+        return self._cache["trie"]
+
+    def _ballot_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the ballots as arrays, in the iteration order of the pairs: a matrix of the
+        ballots, padded with -1 after the last ranked candidate of truncated ballots, the
+        lengths of the ballots and their counts. Candidates are expected to be 0, ..., C-1.
+        The matrix has as many columns as the longest ballot: a single complete ballot makes it
+        U x C however truncated the others are, so the computations of the profile use the
+        ragged ballots instead, and the matrix is only built for ballot_matrix.
+
+        :return: The ballot matrix (U x L, L <= C), the ballot lengths (U) and the counts (U).
+        :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray]
+        """
+        if "ballots" not in self._cache:
+            entries, offsets, counts = self._ragged_ballots()
+            ranks, _, _ = self._ragged_segments()
+            lengths = np.diff(offsets)
+            ballots = np.full((len(counts), int(lengths.max(initial=0))), -1, dtype=np.int64)
+            ballots[np.repeat(np.arange(len(counts)), lengths), ranks] = entries
+            self._cache["ballots"] = (ballots, lengths, counts)
+        return self._cache["ballots"]
+
+    def _positions(self) -> np.ndarray:
+        """
+        Returns the position of each candidate in each ballot, in the order of _ballot_arrays.
+        Candidates missing from a ballot get the position C, after all the ranked candidates.
+
+        :return: The positions (U x C).
+        :rtype: np.ndarray
+        """
+        if "positions" not in self._cache:
+            entries, offsets, counts = self._ragged_ballots()
+            ranks, _, _ = self._ragged_segments()
+            num_candidates = len(self.candidates)
+            positions = np.full((len(counts), num_candidates), num_candidates, dtype=np.int64)
+            positions[np.repeat(np.arange(len(counts)), np.diff(offsets)), entries] = ranks
+            self._cache["positions"] = positions
+        return self._cache["positions"]
+
+    def _support_matrix(self) -> np.ndarray:
+        """
+        Returns the pairwise supports as a C x C matrix, where entry [a, b] is the number of voters
+        ranking a above b. Ballots missing a or b do not count for the pair.
+
+        :return: The support matrix.
+        :rtype: np.ndarray
+        """
+        if "support" not in self._cache:
+            entries, _, _ = self._ragged_ballots()
+            _, remaining, weights = self._ragged_segments()
+            num_candidates = len(self.candidates)
+            support = np.zeros(num_candidates * num_candidates, dtype=np.int64)
+            # Entries by decreasing number of entries after them in their ballot: the entries
+            # with a successor at distance d in their ballot come first
+            order = np.argsort(-remaining, kind="stable")
+            with_successor = np.cumsum(np.bincount(remaining)[::-1])[::-1]
+            keys, key_weights, size = [], [], 0
+            for distance in range(1, len(with_successor)):
+                above = order[:with_successor[distance]]
+                keys.append(entries[above] * num_candidates + entries[above + distance])
+                key_weights.append(weights[above])
+                size += len(above)
+                # Count the pairs by batches of bounded size
+                if size >= 2 ** 22 or distance == len(with_successor) - 1:
+                    support += np.bincount(np.concatenate(keys), weights=np.concatenate(key_weights),
+                                           minlength=num_candidates * num_candidates).astype(np.int64)
+                    keys, key_weights, size = [], [], 0
+            self._cache["support"] = support.reshape(num_candidates, num_candidates)
+        return self._cache["support"]
+
+    def _positional_matrix(self) -> np.ndarray:
+        """
+        Returns the positional counts as a C x C matrix, where entry [c, r] is the number of
+        voters ranking candidate c at position r.
+
+        :return: The positional count matrix.
+        :rtype: np.ndarray
+        """
+        if "positional" not in self._cache and "trie" in self._cache:
+            self._cache["positional"] = self._cache["trie"].positional_matrix()
+        if "positional" not in self._cache:
+            entries, _, _ = self._ragged_ballots()
+            ranks, _, weights = self._ragged_segments()
+            num_candidates = len(self.candidates)
+            positional = np.bincount(entries * num_candidates + ranks, weights=weights,
+                                     minlength=num_candidates * num_candidates)
+            self._cache["positional"] = positional.astype(np.int64).reshape(num_candidates, num_candidates)
+        return self._cache["positional"]
+
+    def _net_preference_matrix(self) -> np.ndarray:
+        """
+        Returns the net preference graph as a C x C matrix, where entry [a, b] is the preference
+        of candidate a over candidate b.
+
+        :return: The net preference matrix.
+        :rtype: np.ndarray
+        """
+        if "net_preference" not in self._cache:
+            if self._net_preference_graph is not None:
+                candidates = sorted(self.candidates)
+                self._cache["net_preference"] = np.array(
+                    [[self._net_preference_graph[a][b] for b in candidates] for a in candidates], dtype=np.int64)
+            else:
+                support = self._support_matrix()
+                self._cache["net_preference"] = support - support.T
+        return self._cache["net_preference"]
+
+    def _derive(self, pairs, net_preference_matrix: np.ndarray, votes_per_candidate: List[dict],
+                cache: Optional[dict] = None) -> "Profile":
+        """
+        Creates a profile over the same candidates from precomputed data, without recomputing the
+        preference graphs from the ballots. Used to relabel or perturb profiles cheaply.
+
+        :param pairs: The pairs of the new profile.
+        :type pairs: Set[Tuple[int, Tuple[int, ...]]]
+        :param net_preference_matrix: The net preference matrix of the new profile.
+        :type net_preference_matrix: np.ndarray
+        :param votes_per_candidate: The votes per candidate and position of the new profile.
+        :type votes_per_candidate: List[Dict[int, int]]
+        :param cache: Precomputed array data of the new profile, defaults to None.
+        :type cache: dict, optional
+        :return: The new profile.
+        :rtype: Profile
+        """
+        profile = Profile.__new__(Profile)
+        profile.pairs = pairs
+        profile.candidates = self.candidates
+        profile.total_votes = sum(pair[0] for pair in pairs)
+        # The Net Preference Graph is created from the matrix at the first access
+        profile.net_preference_graph = None
+        profile.votes_per_candidate = votes_per_candidate
+        profile.path_preference_graph = {candidate: {} for candidate in self.candidates}
+        profile._cache = dict(cache or {})
+        profile._cache["net_preference"] = net_preference_matrix
+        profile._inputs = tuple(profile._cache)
+        return profile
+
+    def _cold_copy(self) -> "Profile":
+        """
+        Returns a copy of the profile sharing its ballots and the data it was created with, but
+        none of the data derived since, e.g., to measure the memory of a rule as on a new profile.
+
+        :return: The copy.
+        :rtype: Profile
+        """
+        profile = Profile.__new__(Profile)
+        # Pairs created from the arrays are derived data
+        profile.pairs = None if {"ballots", "ragged"} & set(self._inputs) else self._pairs
+        profile.candidates = self.candidates
+        profile.total_votes = self.total_votes
+        profile._cache = {key: self._cache[key] for key in self._inputs}
+        profile._inputs = self._inputs
+        profile.net_preference_graph = None
+        profile.votes_per_candidate = None
+        profile.path_preference_graph = {candidate: {} for candidate in self.candidates}
+        return profile
+
     def __str__(self):
         ballot_distribution = "Ballots:\n" + "\n".join(
             [f"\t{pair[0]} instances of ballot {pair[1]}" for pair in
@@ -0,0 +1,261 @@
+"""
+Cost-aware scheduling
+Runs a batch of rule x profile tasks over several workers, e.g., threads submitting to the warm
+processes of compsoc.server.WorkerPool, so that the batch does not end with one worker running
+the slowest rule while the others are idle.
+
+The cost of a task is predicted from the past runs of its rule, scaled by the numbers of
+candidates and voters of its profile with exponents fitted on these runs. The tasks are dealt
+longest-expected-first to the least loaded worker, each worker runs its own tasks longest first,
+and a worker running out of tasks steals the shortest task of the worker with the most expected
+work left. The report compares the makespan with a lower bound of the optimal one.
+"""
+
+import json
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# A task: the name of the rule, the numbers of candidates and voters of the profile, and any payload
+Task = Tuple[str, int, int, Any]
+
+
+class CostModel:
+    """
+    Predicts the time of a rule on a profile of C candidates and V voters as a * C ** b * V ** c,
+    fitted by least squares on the logarithms of the past times of the rule. The exponents are
+    pulled towards default ones, so that a rule with few or similar past runs still gets a
+    scaling.
+
+    Attributes:
+        observations (Dict[str, List[Tuple[int, int, float]]]): The past (C, V, seconds) of each rule.
+        exponents (Tuple[float, float]): The default exponents of C and V.
+        default_cost (float): The time of a rule without past runs on 10 candidates and 100 voters,
+            when no rule has any.
+        prior (float): The weight of the default exponents in the fit, as many past runs.
+    """
+
+    def __init__(self, exponents: Tuple[float, float] = (2., 1.), default_cost: float = 1e-3, prior: float = 0.01):
+        """
+        Initializes a model without past runs.
+
+        :param exponents: The default exponents of C and V, defaults to (2., 1.): the rule scores
+                          each of the C candidates over the ballots.
+        :type exponents: Tuple[float, float], optional
+        :param default_cost: The time in seconds of a rule without past runs on 10 candidates and 100
+                             voters, when no rule has any, defaults to 1e-3.
+        :type default_cost: float, optional
+        :param prior: The weight of the default exponents in the fit, defaults to 0.01.
+        :type prior: float, optional
+        """
+        self.observations: Dict[str, List[Tuple[int, int, float]]] = {}
+        self.exponents = exponents
+        self.default_cost = default_cost
+        self.prior = prior
+        self._fits: Dict[str, np.ndarray] = {}
+
+    def observe(self, rule: str, num_candidates: int, num_voters: int, seconds: float):
+        """
+        Records the time of a run.
+
+        :param rule: The name of the rule.
+        :type rule: str
+        :param num_candidates: The number of candidates of the profile.
+        :type num_candidates: int
+        :param num_voters: The number of voters of the profile.
+        :type num_voters: int
+        :param seconds: The time of the run in seconds.
+        :type seconds: float
+        """
+        self.observations.setdefault(rule, []).append((num_candidates, num_voters, seconds))
+        self._fits.pop(rule, None)
+
+    def observe_results(self, result: Dict[str, Dict[str, float]], num_candidates: int, num_voters: int):
+        """
+        Records the times of a trial evaluated with telemetry, see compsoc.evaluate.evaluate_voting_rules.
+
+        :param result: The metrics of each rule in the trial, with "wall_time".
+        :type result: Dict[str, Dict[str, float]]
+        :param num_candidates: The number of candidates of the profile.
+        :type num_candidates: int
+        :param num_voters: The number of voters of the profile.
+        :type num_voters: int
+        """
+        for rule, metrics in result.items():
+            if "wall_time" in metrics:
+                self.observe(rule, num_candidates, num_voters, metrics["wall_time"])
+
+    def _fit(self, rule: str) -> np.ndarray:
+        """
+        Returns the coefficients (log a, b, c) of a rule with past runs.
+        """
+        if rule not in self._fits:
+            runs = np.array(self.observations[rule], dtype=float)
+            weight = math.sqrt(self.prior)
+            design = np.vstack([np.column_stack([np.ones(len(runs)), np.log(runs[:, 0]), np.log(runs[:, 1])]),
+                                [[0., weight, 0.], [0., 0., weight]]])
+            target = np.concatenate([np.log(np.maximum(runs[:, 2], 1e-9)),
+                                     [weight * self.exponents[0], weight * self.exponents[1]]])
+            self._fits[rule] = np.linalg.lstsq(design, target, rcond=None)[0]
+        return self._fits[rule]
+
+    def predict(self, rule: str, num_candidates: int, num_voters: int) -> float:
+        """
+        Predicts the time of a rule on a profile. A rule without past runs is predicted as the
+        median of the rules with some.
+
+        :param rule: The name of the rule.
+        :type rule: str
+        :param num_candidates: The number of candidates of the profile.
+        :type num_candidates: int
+        :param num_voters: The number of voters of the profile.
+        :type num_voters: int
+        :return: The predicted time in seconds.
+        :rtype: float
+        """
+        features = np.array([1., math.log(max(num_candidates, 1)), math.log(max(num_voters, 1))])
+        if rule in self.observations:
+            return float(math.exp(features @ self._fit(rule)))
+        if self.observations:
+            return float(np.median([self.predict(known, num_candidates, num_voters) for known in self.observations]))
+        return self.default_cost * (num_candidates / 10) ** self.exponents[0] * (num_voters / 100) ** self.exponents[1]
+
+    def save(self, file_path: str):
+        """
+        Saves the past runs in a JSON file.
+
+        :param file_path: Path to the file.
+        :type file_path: str
+        """
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump({"exponents": self.exponents, "default_cost": self.default_cost, "prior": self.prior,
+                       "observations": self.observations}, f)
+
+    @classmethod
+    def load(cls, file_path: str) -> "CostModel":
+        """
+        Loads a model saved with save.
+
+        :param file_path: Path to the file.
+        :type file_path: str
+        :return: The model.
+        :rtype: CostModel
+        """
+        with open(file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        model = cls(tuple(data["exponents"]), data["default_cost"], data["prior"])
+        for rule, runs in data["observations"].items():
+            model.observations[rule] = [tuple(run) for run in runs]
+        return model
+
+
+def lpt_assignment(costs: List[float], workers: int) -> List[List[int]]:
+    """
+    Deals the tasks longest first to the least loaded worker (longest processing time first),
+    whose makespan is at most 4/3 of the optimal one.
+
+    :param costs: The cost of each task.
+    :type costs: List[float]
+    :param workers: The number of workers.
+    :type workers: int
+    :return: The tasks of each worker, longest first.
+    :rtype: List[List[int]]
+    """
+    queues, loads = [[] for _ in range(workers)], [0.] * workers
+    for task in sorted(range(len(costs)), key=lambda t: -costs[t]):
+        worker = min(range(workers), key=loads.__getitem__)
+        queues[worker].append(task)
+        loads[worker] += costs[task]
+    return queues
+
+
+def run_schedule(tasks: List[Task], run: Callable[[Task], Any], workers: int,
+                 cost_model: Optional[CostModel] = None, steal: bool = True) -> Tuple[List[Any], dict]:
+    """
+    Runs tasks on worker threads, dealt by expected cost, with work stealing. The times of the
+    tasks are recorded in the cost model. The function run is called from the threads, and should
+    release the GIL while the task runs, e.g., by waiting for a process or a server.
+
+    :param tasks: The tasks (rule, candidates, voters, payload).
+    :type tasks: List[Task]
+    :param run: Runs a task and returns its result.
+    :type run: Callable[[Task], Any]
+    :param workers: The number of workers.
+    :type workers: int
+    :param cost_model: The predictor of the costs, updated with the times of the tasks, defaults
+                       to None: a new model.
+    :type cost_model: CostModel, optional
+    :param steal: Whether idle workers steal the tasks of the others, defaults to True.
+    :type steal: bool, optional
+    :return: The results, in the order of the tasks, and a report: the makespan, its lower bound
+             "ideal" (the largest of the mean busy time and the longest task), their "ratio", the
+             "predicted_makespan" of the initial assignment, and "workers", the "busy" time and the
+             numbers of "tasks" and "steals" of each worker.
+    :rtype: Tuple[List[Any], dict]
+    """
+    cost_model = cost_model if cost_model is not None else CostModel()
+    costs = [cost_model.predict(rule, c, v) for rule, c, v, _ in tasks]
+    assignment = lpt_assignment(costs, workers)
+    predicted_makespan = max((sum(costs[t] for t in queue) for queue in assignment), default=0.)
+    queues = [deque(queue) for queue in assignment]
+    remaining = [sum(costs[t] for t in queue) for queue in assignment]
+    results, durations = [None] * len(tasks), [0.] * len(tasks)
+    busy, counts, steals = [0.] * workers, [0] * workers, [0] * workers
+    errors = []
+    lock = threading.Lock()
+
+    def next_task(worker: int) -> Optional[int]:
+        with lock:
+            if errors:
+                return None
+            if queues[worker]:
+                task = queues[worker].popleft()
+                remaining[worker] -= costs[task]
+                return task
+            if not steal:
+                return None
+            victim = max(range(workers), key=lambda w: remaining[w] if queues[w] else -1.)
+            if not queues[victim]:
+                return None
+            # The shortest task of the most loaded worker, which keeps running its longest ones
+            task = queues[victim].pop()
+            remaining[victim] -= costs[task]
+            steals[worker] += 1
+            return task
+
+    def work(worker: int):
+        while True:
+            task = next_task(worker)
+            if task is None:
+                return
+            start = time.perf_counter()
+            try:
+                results[task] = run(tasks[task])
+            except Exception as error:
+                with lock:
+                    errors.append(error)
+                return
+            durations[task] = time.perf_counter() - start
+            busy[worker] += durations[task]
+            counts[worker] += 1
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=work, args=(worker,), daemon=True) for worker in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    makespan = time.perf_counter() - start
+    if errors:
+        raise errors[0]
+    for (rule, c, v, _), duration in zip(tasks, durations):
+        cost_model.observe(rule, c, v, duration)
+    ideal = max(sum(durations) / workers, max(durations, default=0.))
+    report = {"makespan": makespan, "ideal": ideal, "ratio": makespan / ideal if ideal else 1.,
+              "predicted_makespan": predicted_makespan,
+              "workers": [{"busy": b, "tasks": n, "steals": s} for b, n, s in zip(busy, counts, steals)]}
+    return results, report
@@ -0,0 +1,336 @@
+"""
+Rule execution server
+A local stand-in for the execute_rule API of the competition (see the README), to run the rules
+offline or to load-test clients. The submitted code is run by warm worker processes, started
+ahead of the requests with the evaluation modules already imported, and each worker keeps the
+compiled code objects of the submissions by hash of their source. A batch endpoint evaluates a
+submission against many profiles in a single request.
+
+POST /execute_rule        {"code", "pairs", "topn", "timeout"} -> {"result": {"top", "topn"}}
+POST /execute_rule_batch  {"code", "profiles", "topn", "timeout"} -> {"results": [{"top", "topn"}, ...]}
+GET  /health              -> {"status": "ok", "workers": ...}
+
+python -m compsoc.server --port 8000 --workers 4
+
+The submitted code is executed as is, without any sandboxing: only serve trusted code, and keep
+the default local address.
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import multiprocessing
+import os
+import queue
+import sys
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional, Tuple
+
+# The pairs of a profile: (frequency, ballot)
+Pairs = List[Tuple[int, Tuple[int, ...]]]
+
+
+class SchemaError(ValueError):
+    """
+    Raised when a request does not match the schema of its endpoint.
+    """
+
+
+def _parse_pairs(pairs) -> Pairs:
+    if not isinstance(pairs, list) or not pairs:
+        raise SchemaError("pairs must be a non-empty list")
+    parsed = []
+    for pair in pairs:
+        if not isinstance(pair, dict) or not isinstance(pair.get("frequency"), int) \
+                or not isinstance(pair.get("ballot"), list) \
+                or not all(isinstance(c, int) for c in pair["ballot"]):
+            raise SchemaError(f"Invalid pair {pair!r}, expected {{'frequency': int, 'ballot': List[int]}}")
+        parsed.append((pair["frequency"], tuple(pair["ballot"])))
+    return parsed
+
+
+def parse_request(payload: dict, batch: bool = False) -> Tuple[str, List[Pairs], int, Optional[float]]:
+    """
+    Validates a request against the CodeInput schema of the API, or against its batch variant,
+    where "pairs" is replaced by "profiles", a list of lists of pairs.
+
+    :param payload: The decoded JSON body of the request.
+    :type payload: dict
+    :param batch: Whether the request is a batch, defaults to False.
+    :type batch: bool, optional
+    :return: The code, the pairs of each profile, topn and the timeout in seconds.
+    :rtype: Tuple[str, List[Pairs], int, Optional[float]]
+    """
+    if not isinstance(payload, dict):
+        raise SchemaError("The body must be a JSON object")
+    code, topn, timeout = payload.get("code"), payload.get("topn", 1), payload.get("timeout", 60)
+    if not isinstance(code, str):
+        raise SchemaError("code must be a string")
+    if not isinstance(topn, int) or topn < 1:
+        raise SchemaError("topn must be a positive integer")
+    if timeout is not None and (not isinstance(timeout, (int, float)) or timeout <= 0):
+        raise SchemaError("timeout must be a positive number or null")
+    if batch:
+        profiles = payload.get("profiles")
+        if not isinstance(profiles, list) or not profiles:
+            raise SchemaError("profiles must be a non-empty list of lists of pairs")
+        return code, [_parse_pairs(pairs) for pairs in profiles], topn, timeout
+    return code, [_parse_pairs(payload.get("pairs"))], topn, timeout
+
+
+def _compiled(code: str, cache: OrderedDict, cache_size: int):
+    """
+    Returns the code object of a submission, compiled at its first submission and kept in a
+    least recently used cache keyed by the SHA-256 of the source.
+    """
+    key = hashlib.sha256(code.encode("utf-8")).hexdigest()
+    if key in cache:
+        cache.move_to_end(key)
+    else:
+        cache[key] = compile(code, f"<submission {key[:12]}>", "exec")
+        if len(cache) > cache_size:
+            cache.popitem(last=False)
+    return cache[key]
+
+
+def load_rule(code_object) -> Callable:
+    """
+    Executes the code of a submission in a fresh namespace, and returns its rule: the last
+    function it defines.
+
+    :param code_object: The compiled code of the submission.
+    :type code_object: code
+    :return: The rule.
+    :rtype: Callable[[Profile, int], any]
+    """
+    namespace = {"__name__": "submission"}
+    exec(code_object, namespace)
+    functions = [value for value in namespace.values()
+                 if inspect.isfunction(value) and value.__module__ == "submission"]
+    if not functions:
+        raise ValueError("The code does not define any function")
+    return functions[-1]
+
+
+def _work(connection, cache_size: int):
+    """
+    Loop of a worker process: evaluates the tasks (code, profiles, topn) received on the
+    connection, and sends back (True, results) or (False, error message).
+    """
+    # Warm up: the evaluation is imported and run once before the first task
+    from compsoc.evaluate import get_rule_utility
+    from compsoc.profile import Profile
+    from compsoc.voting_rules.borda import borda_rule
+    get_rule_utility(Profile({(1, (0, 1, 2)), (2, (2, 1, 0))}), borda_rule, 1)
+    cache = OrderedDict()
+    while True:
+        try:
+            code, profiles, topn = connection.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            code_object = _compiled(code, cache, cache_size)
+            results = []
+            for pairs in profiles:
+                # Every profile gets a fresh namespace, as separate calls to the API would
+                rule = load_rule(code_object)
+                results.append(get_rule_utility(Profile(set(pairs)), rule, topn))
+            connection.send((True, results))
+        except Exception as error:
+            connection.send((False, f"{type(error).__name__}: {error}"))
+
+
+class _Worker:
+    """
+    A worker process and the connection to it.
+    """
+
+    def __init__(self, context, cache_size: int):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_work, args=(child, cache_size), daemon=True)
+        self.process.start()
+        child.close()
+
+    def run(self, task: tuple, timeout: Optional[float]):
+        self.connection.send(task)
+        if not self.connection.poll(timeout):
+            raise TimeoutError(f"The rule did not finish within {timeout} seconds")
+        return self.connection.recv()
+
+    def close(self):
+        self.connection.close()
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+
+
+class WorkerPool:
+    """
+    A pool of warm worker processes, each running one task at a time. A worker that times out
+    or dies is replaced by a new one.
+
+    Attributes:
+        size (int): The number of workers.
+        cache_size (int): The number of compiled submissions kept by each worker.
+    """
+
+    def __init__(self, size: Optional[int] = None, cache_size: int = 128):
+        self.size = size or os.cpu_count() or 1
+        self.cache_size = cache_size
+        self._context = multiprocessing.get_context()
+        self._idle = queue.Queue()
+        for _ in range(self.size):
+            self._idle.put(_Worker(self._context, cache_size))
+
+    def execute(self, code: str, profiles: List[Pairs], topn: int, timeout: Optional[float] = None) -> List[dict]:
+        """
+        Evaluates a rule on profiles in one worker, waiting for an idle worker first.
+
+        :param code: The code of the submission.
+        :type code: str
+        :param profiles: The pairs of each profile.
+        :type profiles: List[Pairs]
+        :param topn: The number of top candidates to consider for utility calculation.
+        :type topn: int
+        :param timeout: The time limit of the evaluation in seconds, defaults to None.
+        :type timeout: float, optional
+        :return: The utilities of the rule on each profile, see get_rule_utility.
+        :rtype: List[dict]
+        """
+        worker = self._idle.get()
+        try:
+            succeeded, value = worker.run((code, profiles, topn), timeout)
+        except TimeoutError:
+            worker.close()
+            worker = _Worker(self._context, self.cache_size)
+            raise
+        except (EOFError, OSError):
+            worker.close()
+            worker = _Worker(self._context, self.cache_size)
+            raise RuntimeError("The worker exited while running the rule")
+        finally:
+            self._idle.put(worker)
+        if not succeeded:
+            raise RuntimeError(value)
+        return value
+
+    def close(self):
+        """
+        Stops the workers.
+        """
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "RuleServer"
+
+    def _reply(self, status: int, body: dict):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() != "chunked":
+            return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        # Streamed bodies, e.g., the pairs of a large profile, see compsoc.client
+        chunks = []
+        while True:
+            size = int(self.rfile.readline().split(b";")[0], 16)
+            chunk = self.rfile.read(size + 2)[:size]
+            if not size:
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._reply(200, {"status": "ok", "workers": self.server.pool.size})
+        else:
+            self._reply(404, {"detail": "Not Found"})
+
+    def do_POST(self):
+        if self.path not in ("/execute_rule", "/execute_rule_batch"):
+            self._reply(404, {"detail": "Not Found"})
+            return
+        batch = self.path == "/execute_rule_batch"
+        try:
+            payload = json.loads(self._read_body())
+            code, profiles, topn, timeout = parse_request(payload, batch)
+        except (ValueError, TypeError) as error:
+            self._reply(422, {"detail": str(error)})
+            return
+        try:
+            results = self.server.pool.execute(code, profiles, topn, timeout)
+        except TimeoutError as error:
+            self._reply(408, {"detail": str(error)})
+        except RuntimeError as error:
+            self._reply(400, {"detail": str(error)})
+        else:
+            self._reply(200, {"results": results} if batch else {"result": results[0]})
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class RuleServer(ThreadingHTTPServer):
+    """
+    The HTTP server of the rule execution API, backed by a pool of warm workers.
+
+    Attributes:
+        pool (WorkerPool): The workers.
+        verbose (bool): Whether the requests are logged.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int] = ("127.0.0.1", 8000), workers: Optional[int] = None,
+                 cache_size: int = 128, verbose: bool = False):
+        """
+        Starts the workers and binds the server, which serves once serve_forever is called.
+
+        :param address: The host and port, defaults to ("127.0.0.1", 8000); port 0 picks a free port.
+        :type address: Tuple[str, int], optional
+        :param workers: The number of workers, defaults to the number of CPUs.
+        :type workers: int, optional
+        :param cache_size: The number of compiled submissions kept by each worker, defaults to 128.
+        :type cache_size: int, optional
+        :param verbose: Log the requests if True, defaults to False.
+        :type verbose: bool, optional
+        """
+        self.pool = WorkerPool(workers, cache_size)
+        self.verbose = verbose
+        super().__init__(address, _Handler)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local server of the execute_rule API")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind")
+    parser.add_argument("--port", type=int, default=8000, help="Port to bind")
+    parser.add_argument("--workers", type=int, help="Number of worker processes, defaults to the CPUs")
+    parser.add_argument("--cache-size", type=int, default=128, help="Compiled submissions kept per worker")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Logs the requests")
+    args = parser.parse_args(argv)
+    with RuleServer((args.host, args.port), args.workers, args.cache_size, args.verbose) as server:
+        print(f"Serving on http://{server.server_address[0]}:{server.server_address[1]}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Shared-memory profiles
+Evaluates many rules on one large profile in parallel, one rule per task. The arrays of the
+profile (see Profile.save for the layout) are published once in a shared memory block: the
+worker processes attach to the block and read the arrays in place, instead of receiving a copy of
+the pairs. Unless they are larger than the ballots, the support and positional matrices are
+computed once and published as well, instead of being recomputed by every worker.
+
+The block is owned by the SharedProfile that creates it, and released when it is closed, when
+it is garbage collected, or at the exit of the interpreter. If the process is killed, the
+resource tracker of multiprocessing removes the block.
+"""
+
+import multiprocessing
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, List, Optional, Tuple
+
+from compsoc.evaluate import _rule_utility, _trace_rule
+from compsoc.profile import Profile
+from compsoc.trace import Tracer, get_tracer
+
+# The profile and the rules of a worker process, see _initialize
+_profile: Optional[Profile] = None
+_rules: List[Callable] = []
+
+
+def _release(block: SharedMemory):
+    """
+    Unmaps and removes a shared memory block.
+    """
+    try:
+        block.close()
+    except BufferError:
+        # Arrays still refer to the block: it is unmapped when they are collected
+        pass
+    try:
+        block.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class _Attachment(SharedMemory):
+    """
+    A shared memory block attached by a profile, unmapped once the arrays of the profile are
+    collected, in whatever order the profile releases them.
+    """
+
+    def close(self):
+        try:
+            super().close()
+        except BufferError:
+            # Arrays still refer to the block: it is unmapped when they are collected
+            pass
+
+
+class SharedProfile:
+    """
+    A profile published in a shared memory block, used as a context manager:
+
+    with SharedProfile(profile) as shared:
+        profile = SharedProfile.attach(shared.name)  # In any process
+
+    Attributes:
+        name (str): The name of the shared memory block.
+        nbytes (int): The size of the profile in the block.
+    """
+
+    def __init__(self, profile: Profile, matrices: Optional[bool] = None):
+        """
+        Publishes a profile in a new shared memory block.
+
+        :param profile: The profile.
+        :type profile: Profile
+        :param matrices: Publish the support and positional matrices (C x C), defaults to None:
+                         if they are not larger than the ballots.
+        :type matrices: bool, optional
+        """
+        if matrices is None:
+            _, offsets, _ = profile._ragged_ballots()
+            num_candidates = len(profile.candidates)
+            matrices = 2 * num_candidates * num_candidates <= int(offsets[-1])
+        self.nbytes = profile.nbytes(matrices)
+        self._block = SharedMemory(create=True, size=self.nbytes)
+        self._finalizer = weakref.finalize(self, _release, self._block)
+        profile.save_to_buffer(self._block.buf, matrices)
+        self.name = self._block.name
+
+    def __enter__(self) -> "SharedProfile":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        """
+        Whether the block was released.
+        """
+        return not self._finalizer.alive
+
+    def close(self):
+        """
+        Releases the block. The profiles attached to it must not be used afterwards.
+        """
+        self._finalizer()
+
+    @staticmethod
+    def attach(name: str) -> Profile:
+        """
+        Creates a profile from the arrays of a shared memory block, without copying them. The
+        block stays mapped while the profile is alive.
+
+        :param name: The name of the block.
+        :type name: str
+        :return: The profile, whose arrays are read-only.
+        :rtype: Profile
+        """
+        block = _Attachment(name=name)
+        profile = Profile.load_from_buffer(block.buf)
+        # The block is unmapped with the profile, and only removed by its owner
+        profile._cache["shared_memory"] = block
+        return profile
+
+
+def _initialize(name: str, rules: List[Callable]):
+    """
+    Attaches a worker process to the profile.
+    """
+    global _profile, _rules
+    _profile = SharedProfile.attach(name)
+    _rules = rules
+
+
+def _evaluate(index: int, topn: int, verbose: bool, telemetry: bool, axioms: bool,
+              memory: bool) -> Tuple[Dict[str, float], List[int]]:
+    """
+    Evaluates a rule in a worker process, and returns its results and its ranking, traced by the
+    parent process.
+    """
+    return _rule_utility(_profile, _rules[index], topn, verbose, telemetry, axioms, memory)
+
+
+def evaluate_rules_shared(profile: Profile, rules: List[Callable[[Profile, int], any]], topn: int,
+                          processes: Optional[int] = None, verbose: bool = False, telemetry: bool = False,
+                          axioms: bool = False, context=None, tracer: Optional[Tracer] = None,
+                          memory: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    Evaluates rules on a profile concurrently, each in one of the worker processes, which share
+    the arrays of the profile. The rules are sent to the workers when they start, which needs
+    them to be picklable, unless the processes are forked (the default on Linux).
+
+    :param profile: The profile.
+    :type profile: Profile
+    :param rules: The rules.
+    :type rules: List[Callable[[Profile, int], any]]
+    :param topn: The number of top candidates to consider for utility calculation.
+    :type topn: int
+    :param processes: The number of worker processes, defaults to the number of CPUs.
+    :type processes: int, optional
+    :param verbose: Print additional information if True, defaults to False.
+    :type verbose: bool, optional
+    :param telemetry: Record the performance of each rule if True, defaults to False.
+    :type telemetry: bool, optional
+    :param axioms: Check Pareto optimality and unanimity of each rule if True, defaults to False.
+    :type axioms: bool, optional
+    :param context: The multiprocessing context, defaults to the default one.
+    :type context: multiprocessing.context.BaseContext, optional
+    :param tracer: Traces the rules and a sample of the ballots with their utilities from this
+                   process, once the workers are done, defaults to None: the current tracer,
+                   see compsoc.trace.
+    :type tracer: Tracer, optional
+    :param memory: Record the peak memory of each rule if True, defaults to False.
+    :type memory: bool, optional
+    :return: The results of each rule, by name, in the order of the rules, see get_rule_utility.
+    :rtype: Dict[str, Dict[str, float]]
+    """
+    with SharedProfile(profile) as shared, \
+            ProcessPoolExecutor(processes, mp_context=context or multiprocessing.get_context(),
+                                initializer=_initialize, initargs=(shared.name, rules)) as executor:
+        futures = [executor.submit(_evaluate, index, topn, verbose, telemetry, axioms, memory)
+                   for index in range(len(rules))]
+        outcomes = [future.result() for future in futures]
+    tracer = tracer if tracer is not None else get_tracer()
+    results = {}
+    for rule, (result, elected) in zip(rules, outcomes):
+        _trace_rule(tracer, profile, rule.__name__, topn, result, elected)
+        results[rule.__name__] = result
+    return results
@@ -0,0 +1,297 @@
+"""
+Sharded sweeps
+Runs the trials of a grid of configurations (candidates, voters, voter model, distortion ratio)
+over several processes or machines sharing a filesystem. The (configuration, trial) cells are
+dealt round-robin to the shards, and the seed of each cell only depends on the global seed, the
+configuration and the trial, so that the results do not depend on the number of shards. The
+trials of two configurations differing only by their distortion ratio share their profiles.
+
+Each shard appends the results of its cells to its own file, one JSON line per cell, and resumes
+from it when restarted. Once all the shards are done, the merge checks that every cell ran
+exactly once with the same sweep, and aggregates the cells in the order of the grid: the summary
+and the figures are the same as a single-node run (--shard 0/1).
+
+python -m compsoc.sweep run --shard 0/4 --directory sweep --candidates 5 10 --voters 100 1000 --trials 50
+python -m compsoc.sweep merge --directory sweep --figures figures
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+from itertools import product
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+from compsoc.aggregate import ResultAggregator
+from compsoc.evaluate import evaluate_voting_rules
+
+# Keys of a configuration, in the order of the grid
+CONFIGURATION_KEYS = ("num_candidates", "num_voters", "voter_model", "distortion_ratio", "num_topn")
+
+
+def make_grid(candidates: List[int], voters: List[int], voter_models: List[str],
+              distortion_ratios: List[float] = (0.0,), num_topn: int = 2) -> List[dict]:
+    """
+    Lists the configurations of a grid.
+
+    :param candidates: The numbers of candidates.
+    :type candidates: List[int]
+    :param voters: The numbers of voters.
+    :type voters: List[int]
+    :param voter_models: The voter models.
+    :type voter_models: List[str]
+    :param distortion_ratios: The distortion ratios, defaults to (0.0,).
+    :type distortion_ratios: List[float], optional
+    :param num_topn: The number of top candidates to consider, defaults to 2.
+    :type num_topn: int, optional
+    :return: The configurations, with the keys of CONFIGURATION_KEYS.
+    :rtype: List[dict]
+    """
+    return [dict(zip(CONFIGURATION_KEYS, (c, v, m, float(d), num_topn)))
+            for c, v, m, d in product(candidates, voters, voter_models, distortion_ratios)]
+
+
+def make_sweep(configurations: List[dict], trials: int, seed: int = 0) -> dict:
+    """
+    Describes a sweep: its configurations, the number of trials of each, and the global seed.
+
+    :param configurations: The configurations, see make_grid.
+    :type configurations: List[dict]
+    :param trials: The number of trials of each configuration.
+    :type trials: int
+    :param seed: The global seed, defaults to 0.
+    :type seed: int, optional
+    :return: The sweep.
+    :rtype: dict
+    """
+    return {"configurations": [dict(c) for c in configurations], "trials": trials, "seed": seed}
+
+
+def parse_shard(shard: str) -> Tuple[int, int]:
+    """
+    Parses a shard "i/N", the i-th of N shards, from 0.
+
+    :param shard: The shard.
+    :type shard: str
+    :return: The index of the shard and the number of shards.
+    :rtype: Tuple[int, int]
+    """
+    match = re.fullmatch(r"(\d+)/(\d+)", shard.strip())
+    if not match or not int(match.group(1)) < int(match.group(2)):
+        raise ValueError(f"Invalid shard {shard!r}, expected i/N with 0 <= i < N")
+    return int(match.group(1)), int(match.group(2))
+
+
+def cells(sweep: dict, shard: int = 0, num_shards: int = 1) -> Iterator[Tuple[int, int]]:
+    """
+    Lists the (configuration, trial) cells of a shard, dealt round-robin in the order of the grid.
+
+    :param sweep: The sweep, see make_sweep.
+    :type sweep: dict
+    :param shard: The index of the shard, defaults to 0.
+    :type shard: int, optional
+    :param num_shards: The number of shards, defaults to 1.
+    :type num_shards: int, optional
+    :return: The indices of the configuration and of the trial of each cell.
+    :rtype: Iterator[Tuple[int, int]]
+    """
+    all_cells = product(range(len(sweep["configurations"])), range(sweep["trials"]))
+    return (cell for index, cell in enumerate(all_cells) if index % num_shards == shard)
+
+
+def cell_seed(sweep: dict, configuration: int, trial: int) -> int:
+    """
+    Derives the seed of a cell from the global seed, the configuration without its distortion
+    ratio, and the trial.
+
+    :param sweep: The sweep, see make_sweep.
+    :type sweep: dict
+    :param configuration: The index of the configuration.
+    :type configuration: int
+    :param trial: The index of the trial.
+    :type trial: int
+    :return: The seed, in [0, 2 ** 32).
+    :rtype: int
+    """
+    c = sweep["configurations"][configuration]
+    key = [sweep["seed"], c["num_candidates"], c["num_voters"], *c["voter_model"].encode("utf-8"), trial]
+    return int(np.random.SeedSequence(key).generate_state(1)[0])
+
+
+def shard_path(directory: str, shard: int, num_shards: int) -> str:
+    """
+    Returns the path of the results file of a shard.
+    """
+    return os.path.join(directory, f"shard-{shard}-of-{num_shards}.jsonl")
+
+
+def _read_shard(path: str) -> Tuple[dict, List[dict]]:
+    """
+    Reads the header and the cells of a results file, ignoring a truncated last line.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.read().split("\n")
+    header, records = json.loads(lines[0]), []
+    for line in lines[1:]:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            # The end of the file, possibly cut by an interruption
+            break
+    return header, records
+
+
+def run_shard(sweep: dict, directory: str, shard: int = 0, num_shards: int = 1, log=None) -> str:
+    """
+    Runs the cells of a shard, appending the results to its file in the directory. The cells
+    already in the file, e.g., before an interruption, are not run again.
+
+    :param sweep: The sweep, see make_sweep.
+    :type sweep: dict
+    :param directory: The directory of the results files, shared by all the shards.
+    :type directory: str
+    :param shard: The index of the shard, defaults to 0.
+    :type shard: int, optional
+    :param num_shards: The number of shards, defaults to 1.
+    :type num_shards: int, optional
+    :param log: A text stream for progress messages, defaults to None.
+    :type log: TextIO, optional
+    :return: The path of the results file.
+    :rtype: str
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = shard_path(directory, shard, num_shards)
+    header = {"sweep": sweep, "shard": shard, "num_shards": num_shards}
+    done = set()
+    if os.path.exists(path):
+        existing, records = _read_shard(path)
+        if existing != header:
+            raise ValueError(f"{path} belongs to another sweep or shard")
+        done = {(r["configuration"], r["trial"]) for r in records}
+        # Rewrite the complete lines only
+        lines = [json.dumps(header)] + [json.dumps(r) for r in records]
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header) + "\n")
+    with open(path, "a", encoding="utf-8") as f:
+        for configuration, trial in cells(sweep, shard, num_shards):
+            if (configuration, trial) in done:
+                continue
+            c = sweep["configurations"][configuration]
+            if log:
+                print(f"shard {shard}/{num_shards} configuration {configuration} trial {trial}", file=log, flush=True)
+            result = evaluate_voting_rules(c["num_candidates"], c["num_voters"], c["num_topn"], c["voter_model"],
+                                           distortion_ratio=c["distortion_ratio"],
+                                           seed=cell_seed(sweep, configuration, trial))
+            f.write(json.dumps({"configuration": configuration, "trial": trial, "result": result}) + "\n")
+            f.flush()
+    return path
+
+
+def merge_shards(directory: str) -> Tuple[dict, List[ResultAggregator]]:
+    """
+    Merges the results files of the shards of a sweep, checking that they all belong to the same
+    sweep and that every cell ran exactly once. The cells are aggregated in the order of the
+    grid, whatever the number of shards.
+
+    :param directory: The directory of the results files.
+    :type directory: str
+    :return: The sweep, and the aggregated trials of each configuration.
+    :rtype: Tuple[dict, List[ResultAggregator]]
+    """
+    paths = sorted(glob.glob(os.path.join(directory, "shard-*-of-*.jsonl")))
+    if not paths:
+        raise ValueError(f"No results files in {directory}")
+    shards = [_read_shard(path) for path in paths]
+    sweep, num_shards = shards[0][0]["sweep"], shards[0][0]["num_shards"]
+    if any(header["sweep"] != sweep or header["num_shards"] != num_shards for header, _ in shards):
+        raise ValueError("The results files belong to different sweeps")
+    missing_shards = sorted(set(range(num_shards)) - {header["shard"] for header, _ in shards})
+    if missing_shards:
+        raise ValueError(f"Missing shards {missing_shards} of {num_shards}")
+    results = {}
+    for _, records in shards:
+        for record in records:
+            cell = (record["configuration"], record["trial"])
+            if cell in results:
+                raise ValueError(f"Cell {cell} ran more than once")
+            results[cell] = record["result"]
+    missing = [cell for cell in cells(sweep) if cell not in results]
+    if missing:
+        raise ValueError(f"{len(missing)} cells did not run, e.g., {missing[0]}")
+    aggregators = [ResultAggregator() for _ in sweep["configurations"]]
+    for configuration, trial in cells(sweep):
+        aggregators[configuration].add(results[configuration, trial])
+    return sweep, aggregators
+
+
+def summarize(sweep: dict, aggregators: List[ResultAggregator]) -> List[dict]:
+    """
+    Summarizes the configurations of a merged sweep, in the format of plot.plot_summaries.
+
+    :param sweep: The sweep.
+    :type sweep: dict
+    :param aggregators: The aggregated trials of each configuration.
+    :type aggregators: List[ResultAggregator]
+    :return: Each configuration, with its number of trials and the summary of its trials.
+    :rtype: List[dict]
+    """
+    return [{"voter_model": c["voter_model"], "num_voters": c["num_voters"], "num_candidates": c["num_candidates"],
+             "num_topn": c["num_topn"], "number_iterations": sweep["trials"],
+             "distortion_ratio": c["distortion_ratio"], "summary": aggregator.summary(["top", "topn"])}
+            for c, aggregator in zip(sweep["configurations"], aggregators)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sharded sweeps of the evaluation of the rules")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run the cells of a shard")
+    run_parser.add_argument("--shard", default="0/1", help="Shard i/N to run, from 0")
+    run_parser.add_argument("--directory", default="sweep", help="Directory of the results files, shared by the shards")
+    run_parser.add_argument("--candidates", type=int, nargs="+", default=[5], help="Numbers of candidates")
+    run_parser.add_argument("--voters", type=int, nargs="+", default=[100], help="Numbers of voters")
+    run_parser.add_argument("--models", nargs="+", default=["random"], help="Voter models")
+    run_parser.add_argument("--distortions", type=float, nargs="+", default=[0.0], help="Distortion ratios")
+    run_parser.add_argument("--topn", type=int, default=2, help="Top N")
+    run_parser.add_argument("--trials", type=int, default=10, help="Trials per configuration")
+    run_parser.add_argument("--seed", type=int, default=0, help="Global seed of the sweep")
+    run_parser.add_argument("-v", "--verbose", action="store_true", help="Logs the cells")
+    merge_parser = commands.add_parser("merge", help="Merge the results of the shards")
+    merge_parser.add_argument("--directory", default="sweep", help="Directory of the results files")
+    merge_parser.add_argument("--output", help="JSON file of the summaries, defaults to <directory>/summary.json")
+    merge_parser.add_argument("--figures", help="Directory of the figures, none if not given")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        shard, num_shards = parse_shard(args.shard)
+        sweep = make_sweep(make_grid(args.candidates, args.voters, args.models, args.distortions, args.topn),
+                           args.trials, args.seed)
+        print(run_shard(sweep, args.directory, shard, num_shards, sys.stderr if args.verbose else None))
+        return 0
+
+    try:
+        sweep, aggregators = merge_shards(args.directory)
+    except ValueError as error:
+        print(f"Cannot merge: {error}", file=sys.stderr)
+        return 1
+    summaries = summarize(sweep, aggregators)
+    output = args.output or os.path.join(args.directory, "summary.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"sweep": sweep, "configurations": summaries}, f, indent=1)
+    print(output)
+    if args.figures:
+        # Matplotlib is only needed for the figures
+        from compsoc.plot import plot_summaries
+        for path in plot_summaries(summaries, args.figures):
+            print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Tournament graphs
+Functions on the net preference matrix of a profile as a whole, where entry [a, b] is the
+preference of candidate a over candidate b (see Profile._net_preference_matrix). Candidate a
+beats candidate b when the entry [a, b] is positive.
+"""
+
+from typing import Optional, Set
+
+import numpy as np
+
+
+def _off_diagonal(net_preference: np.ndarray) -> np.ndarray:
+    return ~np.eye(len(net_preference), dtype=bool)
+
+
+def copeland_scores(net_preference: np.ndarray, tie_credit: Optional[float] = None) -> np.ndarray:
+    """
+    Computes the Copeland scores of all the candidates.
+
+    :param net_preference: The net preference matrix.
+    :type net_preference: np.ndarray
+    :param tie_credit: The credit of a pairwise tie, a win being worth 1 and a loss 0. Defaults to
+                       None, for the number of wins minus the number of losses.
+    :type tie_credit: float, optional
+    :return: The Copeland score of each candidate.
+    :rtype: np.ndarray
+    """
+    if tie_credit is None:
+        return np.sign(net_preference).sum(axis=1)
+    wins = (net_preference > 0).sum(axis=1)
+    ties = ((net_preference == 0) & _off_diagonal(net_preference)).sum(axis=1)
+    return wins + tie_credit * ties
+
+
+def simpson_scores(net_preference: np.ndarray) -> np.ndarray:
+    """
+    Computes the Simpson (minimax) scores of all the candidates, i.e., their worst net preference
+    against another candidate.
+
+    :param net_preference: The net preference matrix.
+    :type net_preference: np.ndarray
+    :return: The Simpson score of each candidate.
+    :rtype: np.ndarray
+    """
+    masked = np.where(_off_diagonal(net_preference), net_preference, np.iinfo(np.int64).max)
+    return masked.min(axis=1)
+
+
+def condorcet_winner(net_preference: np.ndarray) -> Optional[int]:
+    """
+    Finds the Condorcet winner, who beats every other candidate.
+
+    :param net_preference: The net preference matrix.
+    :type net_preference: np.ndarray
+    :return: The Condorcet winner, or None if there is none.
+    :rtype: Optional[int]
+    """
+    beats = (net_preference > 0).sum(axis=1)
+    winners = np.flatnonzero(beats == len(net_preference) - 1)
+    return int(winners[0]) if len(winners) else None
+
+
+def condorcet_loser(net_preference: np.ndarray) -> Optional[int]:
+    """
+    Finds the Condorcet loser, who is beaten by every other candidate.
+
+    :param net_preference: The net preference matrix.
+    :type net_preference: np.ndarray
+    :return: The Condorcet loser, or None if there is none.
+    :rtype: Optional[int]
+    """
+    return condorcet_winner(-net_preference)
+
+
+def _top_components(dominance: np.ndarray) -> Set[int]:
+    """
+    Returns the candidates of the strongly connected components of a dominance graph that no
+    candidate outside of the component dominates.
+    """
+    # SciPy is slow to import, and only needed for the Smith and Schwartz sets
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    _, labels = connected_components(csr_matrix(dominance), directed=True, connection="strong")
+    sources, targets = np.nonzero(dominance)
+    crossing = labels[sources] != labels[targets]
+    dominated = np.zeros(labels.max() + 1, dtype=bool)
+    dominated[labels[targets[crossing]]] = True
+    return set(np.flatnonzero(~dominated[labels]).tolist())
+
+
+def smith_set(net_preference: np.ndarray) -> Set[int]:
+    """
+    Computes the Smith set, the smallest set of candidates who all beat every candidate outside
+    of the set. It is the top strongly connected component of the beats-or-ties graph.
+
+    :param net_preference: The net preference matrix.
+    :type net_preference: np.ndarray
+    :return: The Smith set.
+    :rtype: Set[int]
+    """
+    return _top_components((net_preference >= 0) & _off_diagonal(net_preference))
+
+
+def schwartz_set(net_preference: np.ndarray) -> Set[int]:
+    """
+    Computes the Schwartz set, the union of the minimal sets of candidates unbeaten by any
+    candidate outside of the set. It is the union of the top strongly connected components of
+    the beats graph.
+
+    :param net_preference: The net preference matrix.
+    :type net_preference: np.ndarray
+    :return: The Schwartz set.
+    :rtype: Set[int]
+    """
+    return _top_components(net_preference > 0)
@@ -0,0 +1,162 @@
+"""
+Tracing
+Structured diagnostics of the evaluation, as JSON lines: one event per trial ("trial"), per
+profile ("profile") and per rule ("rule") at the info level, and a sample of the ballots with
+their utilities ("ballot") at the debug level. The ballots are sampled at a given rate, and at
+most max_ballots of them per event source, so that tracing a large profile stays cheap.
+
+The evaluation functions trace to the current tracer, disabled unless set with set_tracer:
+
+with Tracer("trace.jsonl", level=DEBUG, ballot_rate=0.01) as tracer:
+    set_tracer(tracer)
+    evaluate_voting_rules(5, 10 ** 6, 2, "random")
+"""
+
+import json
+import random
+import sys
+import threading
+import time
+from typing import List, Optional, TextIO, Union
+
+import numpy as np
+
+# Levels, as in the logging module
+DEBUG = 10
+INFO = 20
+WARNING = 30
+
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING}
+
+
+def _jsonable(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (np.ndarray, set, frozenset)):
+        return list(value.tolist() if isinstance(value, np.ndarray) else value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class Tracer:
+    """
+    Writes events as JSON lines, each with its time ("time"), its name ("event"), its level
+    ("level") and its fields. A tracer without a file is disabled, and costs a comparison per
+    event.
+
+    Attributes:
+        level (int): The lowest level of the events written.
+        ballot_rate (float): The fraction of the ballots sampled.
+        max_ballots (int): The maximum number of ballots sampled at a time.
+    """
+
+    def __init__(self, file: Optional[Union[str, TextIO]] = None, level: int = INFO, ballot_rate: float = 0.01,
+                 max_ballots: int = 100, seed: Optional[int] = None):
+        """
+        Initializes a tracer.
+
+        :param file: The path of the JSONL file, or a text stream, defaults to None: disabled.
+        :type file: Union[str, TextIO], optional
+        :param level: The lowest level of the events written, defaults to INFO.
+        :type level: int, optional
+        :param ballot_rate: The fraction of the ballots sampled at the debug level, defaults to 0.01.
+        :type ballot_rate: float, optional
+        :param max_ballots: The maximum number of ballots sampled at a time, defaults to 100.
+        :type max_ballots: int, optional
+        :param seed: The seed of the sampling, defaults to None.
+        :type seed: int, optional
+        """
+        self.level = level if file is not None else sys.maxsize
+        self.ballot_rate = ballot_rate
+        self.max_ballots = max_ballots
+        self._owned = isinstance(file, str)
+        self._file = open(file, "a", encoding="utf-8") if self._owned else file
+        # Independent of the generators of the voter models
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "Tracer":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def enabled(self, level: int = INFO) -> bool:
+        """
+        Whether the events of a level are written.
+
+        :param level: The level, defaults to INFO.
+        :type level: int, optional
+        :return: True if they are written.
+        :rtype: bool
+        """
+        return level >= self.level
+
+    def emit(self, event: str, level: int = INFO, **fields):
+        """
+        Writes an event, if its level is enabled.
+
+        :param event: The name of the event.
+        :type event: str
+        :param level: The level of the event, defaults to INFO.
+        :type level: int, optional
+        :param fields: The fields of the event, JSON serializable or NumPy values.
+        """
+        if level < self.level:
+            return
+        line = json.dumps({"time": time.time(), "event": event, "level": level, **fields}, default=_jsonable)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def sample(self, size: int) -> List[int]:
+        """
+        Samples the indices of ballot_rate of size items, at most max_ballots, in increasing order.
+
+        :param size: The number of items.
+        :type size: int
+        :return: The sampled indices.
+        :rtype: List[int]
+        """
+        count = min(self.max_ballots, size, int(self.ballot_rate * size + self._random.random()))
+        return sorted(self._random.sample(range(size), count))
+
+    def close(self):
+        """
+        Flushes the events, and closes the file if the tracer opened it.
+        """
+        if self._file is None:
+            return
+        with self._lock:
+            if self._owned:
+                self._file.close()
+            else:
+                self._file.flush()
+            self._file = None
+            self.level = sys.maxsize
+
+
+# The tracer of the evaluation functions
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """
+    Returns the current tracer, disabled by default.
+
+    :return: The tracer.
+    :rtype: Tracer
+    """
+    return _tracer
+
+
+def set_tracer(tracer: Optional[Tracer]) -> Tracer:
+    """
+    Sets the current tracer.
+
+    :param tracer: The tracer, or None to disable tracing.
+    :type tracer: Tracer, optional
+    :return: The previous tracer.
+    :rtype: Tracer
+    """
+    global _tracer
+    previous, _tracer = _tracer, tracer if tracer is not None else Tracer()
+    return previous
@@ -0,0 +1,180 @@
+"""
+Ballot trie
+A prefix tree over the unique ballots of a profile, where each node is a prefix shared by some
+ballots and holds the number of voters whose ballot starts with it. Computations that only depend
+on the prefixes of the ballots, e.g., positional tallies, first places and top n utilities, run
+over the nodes rather than over every position of every ballot, and truncating the ballots is
+cutting the trie at a given depth.
+
+The nodes are stored level by level, the root (the empty prefix) first, so that a parent always
+comes before its children.
+"""
+
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from compsoc.profile import Profile
+
+
+class BallotTrie:
+    """
+    A prefix tree over ballots, as arrays indexed by node.
+
+    Attributes:
+        parent (np.ndarray): The parent of each node, -1 for the root.
+        candidate (np.ndarray): The last candidate of the prefix of each node, -1 for the root.
+        count (np.ndarray): The number of voters whose ballot starts with the prefix of each node.
+        terminal (np.ndarray): The number of voters whose ballot is the prefix of each node.
+        levels (np.ndarray): The index of the first node of each depth, and the number of nodes.
+        num_candidates (int): The number of candidates.
+    """
+
+    def __init__(self, parent: np.ndarray, candidate: np.ndarray, count: np.ndarray, terminal: np.ndarray,
+                 levels: np.ndarray, num_candidates: int):
+        self.parent = parent
+        self.candidate = candidate
+        self.count = count
+        self.terminal = terminal
+        self.levels = levels
+        self.num_candidates = num_candidates
+
+    @classmethod
+    def from_profile(cls, profile: "Profile") -> "BallotTrie":
+        """
+        Builds the trie of the ballots of a profile, one level at a time: the nodes of a level are
+        the unique (parent, candidate) pairs of the ballots long enough to reach it.
+
+        :param profile: The voting profile.
+        :type profile: Profile
+        :return: The trie of the ballots.
+        :rtype: BallotTrie
+        """
+        entries, offsets, counts = profile._ragged_ballots()
+        num_candidates = len(profile.candidates)
+        lengths = np.diff(offsets)
+        # Node of the prefix of each ballot read so far, starting at the root
+        node = np.zeros(len(counts), dtype=np.int64)
+        parents, candidates, node_counts = [np.array([-1])], [np.array([-1])], [np.array([counts.sum()])]
+        levels = [0, 1]
+        for depth in range(int(lengths.max(initial=0))):
+            active = np.flatnonzero(lengths > depth)
+            keys, inverse = np.unique(node[active] * num_candidates + entries[offsets[active] + depth],
+                                      return_inverse=True)
+            parents.append(keys // num_candidates)
+            candidates.append(keys % num_candidates)
+            node_counts.append(np.bincount(inverse.ravel(), weights=counts[active]).astype(np.int64))
+            node[active] = levels[-1] + inverse.ravel()
+            levels.append(levels[-1] + len(keys))
+        terminal = np.bincount(node, weights=counts, minlength=levels[-1]).astype(np.int64)
+        return cls(np.concatenate(parents), np.concatenate(candidates), np.concatenate(node_counts).astype(np.int64),
+                   terminal, np.array(levels), num_candidates)
+
+    @property
+    def num_nodes(self) -> int:
+        """
+        The number of nodes, including the root.
+        """
+        return len(self.parent)
+
+    @property
+    def depth(self) -> np.ndarray:
+        """
+        The depth of each node, 0 for the root.
+        """
+        return np.repeat(np.arange(len(self.levels) - 1), np.diff(self.levels))
+
+    def truncate(self, depth: int) -> "BallotTrie":
+        """
+        Cuts the ballots after their first candidates, by dropping the deeper nodes.
+
+        :param depth: The number of candidates kept in each ballot.
+        :type depth: int
+        :return: The trie of the truncated ballots.
+        :rtype: BallotTrie
+        """
+        depth = min(depth, len(self.levels) - 2)
+        end = self.levels[depth + 1]
+        terminal = self.terminal[:end].copy()
+        # The voters of the cut branches end at the deepest kept level
+        terminal[self.levels[depth]:end] = self.count[self.levels[depth]:end]
+        return BallotTrie(self.parent[:end], self.candidate[:end], self.count[:end], terminal,
+                          self.levels[:depth + 2], self.num_candidates)
+
+    def positional_matrix(self) -> np.ndarray:
+        """
+        Computes the positional counts, where entry [c, r] is the number of voters ranking
+        candidate c at position r, from the nodes.
+
+        :return: The positional count matrix (C x C).
+        :rtype: np.ndarray
+        """
+        num_candidates = self.num_candidates
+        positional = np.bincount(self.candidate[1:] * num_candidates + self.depth[1:] - 1, weights=self.count[1:],
+                                 minlength=num_candidates * num_candidates)
+        return positional.astype(np.int64).reshape(num_candidates, num_candidates)
+
+    def first_places(self, eliminated: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Computes the number of voters ranking each candidate first among the remaining ones. The
+        first remaining candidate of a voter is the first node of their path whose candidate is
+        not eliminated, and the paths are shared by the voters of a node.
+
+        :param eliminated: The mask of the eliminated candidates, defaults to none.
+        :type eliminated: np.ndarray, optional
+        :return: The number of first places of each candidate, 0 for the eliminated ones.
+        :rtype: np.ndarray
+        """
+        if eliminated is None:
+            eliminated = np.zeros(self.num_candidates, dtype=bool)
+        # Whether the candidates of all the strict ancestors of each node are eliminated
+        open_path = np.ones(self.num_nodes, dtype=bool)
+        removed = np.concatenate(([True], eliminated[self.candidate[1:]]))
+        for start, end in zip(self.levels[1:-1], self.levels[2:]):
+            parents = self.parent[start:end]
+            open_path[start:end] = open_path[parents] & removed[parents]
+        first = open_path & ~removed
+        return np.bincount(self.candidate[first], weights=self.count[first],
+                           minlength=self.num_candidates).astype(np.int64)
+
+    def utilities(self, elected: List[int], topn: int) -> Tuple[float, float]:
+        """
+        Sums the utilities of the voters for a ranking of the candidates, see
+        compsoc.evaluate.voter_subjective_utility_for_elected_candidate, over the nodes of the
+        first n levels.
+
+        :param elected: The candidates, ranked.
+        :type elected: List[int]
+        :param topn: The number of top candidates to consider for utility calculation.
+        :type topn: int
+        :return: The total utility for the top candidates and for the top n candidates of the voters.
+        :rtype: Tuple[float, float]
+        """
+        num_candidates = len(elected)
+        increments = np.empty(max(elected) + 1)
+        increments[elected] = (num_candidates - np.arange(num_candidates)) / num_candidates
+        top = slice(1, self.levels[min(1, len(self.levels) - 2) + 1])
+        top_n = slice(1, self.levels[min(topn, len(self.levels) - 2) + 1])
+        return (float(self.count[top] @ increments[self.candidate[top]]),
+                float(self.count[top_n] @ increments[self.candidate[top_n]]))
+
+    def to_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Lists the ballots of the trie, one per node where some voters' ballot ends, in the layout
+        of Profile._ballot_arrays (see Profile.from_arrays).
+
+        :return: The ballot matrix (U x L), the ballot lengths (U) and the counts (U).
+        :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray]
+        """
+        depth = self.depth
+        ends = np.flatnonzero((self.terminal > 0) & (depth > 0))
+        lengths = depth[ends]
+        ballots = np.full((len(ends), int(lengths.max(initial=0))), -1, dtype=np.int64)
+        nodes, rows = ends, np.arange(len(ends))
+        # Walk up from the last candidate of each ballot to the root
+        while len(nodes):
+            ballots[rows, depth[nodes] - 1] = self.candidate[nodes]
+            nodes = self.parent[nodes]
+            rows, nodes = rows[nodes > 0], nodes[nodes > 0]
+        return ballots, lengths, self.terminal[ends]
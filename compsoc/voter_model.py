@@ -9,10 +9,7 @@ from collections import Counter
 from itertools import permutations
 from typing import List, Optional, Tuple
 
-import matplotlib.pylab as plt
 import numpy as np
-import scipy.stats as ss
-from matplotlib.ticker import MaxNLocator
 
 from compsoc.profile import Profile
 from compsoc.utils import int_list_to_str
@@ -33,6 +30,9 @@ def generate_gaussian_votes(mu: float,
                             num_voters: int,
                             num_candidates: int,
                             plot_save: Optional[bool] = False) -> List[Tuple[int, Tuple[int, ...]]]:
+    # SciPy and Matplotlib are slow to import, and only needed here
+    import scipy.stats as ss
+
     # Gaussian generation of votes over candidates
     ballot_permutations = list(permutations(range(num_candidates)))
     x = np.arange(-len(ballot_permutations) / 2., len(ballot_permutations) / 2.)
@@ -52,6 +52,9 @@ def generate_gaussian_votes(mu: float,
     # Remove rankings with 0 occurence
     ballots = [(int(dist[i]), tuple(ballot_permutations[i])) for i, _ in enumerate(x) if dist[i]]
     if plot_save:
+        import matplotlib.pylab as plt
+        from matplotlib.ticker import MaxNLocator
+
         _, ax = plt.subplots()
         dist_non_null_index = np.array([i for i, x in enumerate(dist) if x])
         plt.plot(x[dist_non_null_index], dist[dist_non_null_index], 'b.-', lw=0.4)
@@ -111,7 +114,6 @@ def get_pairs_from_model(num_candidates: int, num_voters: int, voters_model: str
         alpha = tuple(np.random.uniform(low, high, num_candidates))
         pairs = generate_multinomial_dirichlet_votes(alpha, num_voters, num_candidates)
     elif voters_model == 'gaussian':
-        print(kwargs)
         mu = kwargs.get('mu', 2)
         stdv = kwargs.get('stdv', 1)
         pairs = generate_gaussian_votes(mu, stdv, num_voters, num_candidates)
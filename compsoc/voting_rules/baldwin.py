@@ -0,0 +1,23 @@
+"""
+Computes the Baldwin score for a candidate.
+"""
+from compsoc.elimination import elimination_scores, lowest_borda
+from compsoc.profile import Profile
+
+
+def baldwin_rule(profile: Profile, candidate: int) -> int:
+    """
+    Calculates the Baldwin score for a candidate based on a profile, i.e., the
+    round in which the candidate is eliminated. The scores of all the candidates are computed at
+    the first call, and kept with the profile.
+
+    :param profile: The voting profile.
+    :type profile: VotingProfile
+    :param candidate: The base candidate for scoring.
+    :type candidate: int
+    :return: The Baldwin score for the candidate.
+    :rtype: int
+    """
+    if "baldwin" not in profile._cache:
+        profile._cache["baldwin"] = elimination_scores(profile, lowest_borda)
+    return profile._cache["baldwin"][candidate]
@@ -27,3 +27,7 @@ def borda_rule(profile: Profile, candidate: int) -> int:
     
     # return the total score
     return scores
+
+
+# The score of a candidate only depends on its own positions
+borda_rule.local = True
@@ -32,4 +32,6 @@ def get_borda_gamma(gamma: float = 0.5) -> Callable[[int], float]:
                   for pair in profile.pairs]
         return sum(scores)
 
+    # The score of a candidate only depends on its own positions
+    borda_gamma.local = True
     return borda_gamma
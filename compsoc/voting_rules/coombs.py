@@ -0,0 +1,23 @@
+"""
+Computes the Coombs score for a candidate.
+"""
+from compsoc.elimination import elimination_scores, most_last_places
+from compsoc.profile import Profile
+
+
+def coombs_rule(profile: Profile, candidate: int) -> int:
+    """
+    Calculates the Coombs score for a candidate based on a profile, i.e., the
+    round in which the candidate is eliminated. The scores of all the candidates are computed at
+    the first call, and kept with the profile.
+
+    :param profile: The voting profile.
+    :type profile: VotingProfile
+    :param candidate: The base candidate for scoring.
+    :type candidate: int
+    :return: The Coombs score for the candidate.
+    :rtype: int
+    """
+    if "coombs" not in profile._cache:
+        profile._cache["coombs"] = elimination_scores(profile, most_last_places)
+    return profile._cache["coombs"][candidate]
@@ -1,7 +1,10 @@
 """
 Computes the Copeland score for a candidate.
 """
+from typing import Callable
+
 import numpy as np
+from compsoc.pairwise import pairwise_tally
 from compsoc.profile import Profile
 
 
@@ -16,10 +19,43 @@ def copeland_rule(profile: Profile, candidate: int) -> int:
     :return: The Copeland score for the candidate.
     :rtype: int
     """
-    scores = []
-    for m in profile.candidates:
-        preference = profile.get_net_preference(candidate,
-                                                m)  # preference over m
-        scores.append(np.sign(preference))  # win or not
+    # Preferences over all candidates, win or not
+    preferences = pairwise_tally(profile).row(candidate)
     # Return the total score
-    return sum(scores)
+    return int(np.sign(preferences).sum())
+
+
+def get_copeland_alpha(alpha: float = 0.5) -> Callable[[int], float]:
+    """
+    Returns a callable function for the Copeland method where a pairwise tie is worth alpha,
+    a win 1 and a loss 0.
+
+    :param alpha: The credit of a pairwise tie, defaults to 0.5.
+    :type alpha: float, optional
+    :return: A callable function for the Copeland alpha method.
+    :rtype: Callable[[int], float]
+    """
+
+    def copeland_alpha(profile: Profile, candidate: int) -> float:
+        """
+        Calculates the Copeland alpha score for a candidate based on a profile.
+
+        :param profile: The voting profile.
+        :type profile: VotingProfile
+        :param candidate: The base candidate for scoring.
+        :type candidate: int
+        :return: The Copeland alpha score for the candidate.
+        :rtype: float
+        """
+        preferences = pairwise_tally(profile).row(candidate)
+        # The candidate ties with itself
+        ties = np.count_nonzero(preferences == 0) - 1
+        return float(np.count_nonzero(preferences > 0) + alpha * ties)
+
+    # The score of a candidate only depends on its own net preferences
+    copeland_alpha.local = True
+    return copeland_alpha
+
+
+# The score of a candidate only depends on its own net preferences
+copeland_rule.local = True
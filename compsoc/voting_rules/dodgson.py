@@ -0,0 +1,36 @@
+"""
+Computes the Dodgson score for a candidate.
+"""
+from compsoc.dodgson import dodgson_bounds, dodgson_score
+from compsoc.profile import Profile
+
+
+def dodgson_rule(profile: Profile, candidate: int) -> float:
+    """
+    Calculates the Dodgson score for a candidate based on a profile, i.e., minus the smallest
+    number of swaps of adjacent candidates in the ballots making it a Condorcet winner. The
+    score is exact, for small instances.
+
+    :param profile: The voting profile.
+    :type profile: VotingProfile
+    :param candidate: The base candidate for scoring.
+    :type candidate: int
+    :return: The Dodgson score for the candidate.
+    :rtype: float
+    """
+    return -dodgson_score(profile, candidate)
+
+
+def dodgson_approx_rule(profile: Profile, candidate: int) -> float:
+    """
+    Calculates an approximate Dodgson score for a candidate in polynomial time, i.e., minus the
+    number of swaps of a greedy solution (see compsoc.dodgson.dodgson_bounds for its error).
+
+    :param profile: The voting profile.
+    :type profile: VotingProfile
+    :param candidate: The base candidate for scoring.
+    :type candidate: int
+    :return: The approximate Dodgson score for the candidate.
+    :rtype: float
+    """
+    return -dodgson_bounds(profile, candidate)[1]
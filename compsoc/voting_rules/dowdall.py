@@ -22,3 +22,7 @@ def dowdall_rule(profile: Profile, candidate: int) -> int:
               for pair in profile.pairs]
     # Return the total score
     return sum(scores)
+
+
+# The score of a candidate only depends on its own positions
+dowdall_rule.local = True
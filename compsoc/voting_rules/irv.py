@@ -0,0 +1,23 @@
+"""
+Computes the Instant-Runoff Voting (IRV) score for a candidate.
+"""
+from compsoc.elimination import elimination_scores, fewest_first_places
+from compsoc.profile import Profile
+
+
+def irv_rule(profile: Profile, candidate: int) -> int:
+    """
+    Calculates the Instant-Runoff Voting (IRV) score for a candidate based on a profile, i.e., the
+    round in which the candidate is eliminated. The scores of all the candidates are computed at
+    the first call, and kept with the profile.
+
+    :param profile: The voting profile.
+    :type profile: VotingProfile
+    :param candidate: The base candidate for scoring.
+    :type candidate: int
+    :return: The Instant-Runoff Voting (IRV) score for the candidate.
+    :rtype: int
+    """
+    if "irv" not in profile._cache:
+        profile._cache["irv"] = elimination_scores(profile, fewest_first_places)
+    return profile._cache["irv"][candidate]
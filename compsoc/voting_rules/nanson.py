@@ -0,0 +1,23 @@
+"""
+Computes the Nanson score for a candidate.
+"""
+from compsoc.elimination import elimination_scores, below_average_borda
+from compsoc.profile import Profile
+
+
+def nanson_rule(profile: Profile, candidate: int) -> int:
+    """
+    Calculates the Nanson score for a candidate based on a profile, i.e., the
+    round in which the candidate is eliminated. The scores of all the candidates are computed at
+    the first call, and kept with the profile.
+
+    :param profile: The voting profile.
+    :type profile: VotingProfile
+    :param candidate: The base candidate for scoring.
+    :type candidate: int
+    :return: The Nanson score for the candidate.
+    :rtype: int
+    """
+    if "nanson" not in profile._cache:
+        profile._cache["nanson"] = elimination_scores(profile, below_average_borda)
+    return profile._cache["nanson"][candidate]
@@ -0,0 +1,89 @@
+"""
+Computes the Ranked Pairs (Tideman) score for a candidate.
+"""
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+from compsoc.profile import Profile
+
+
+def _bits(mask: int):
+    """
+    Iterates over the indices of the set bits of an integer.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def ranked_pairs_scores(net_preference: np.ndarray, tie_breaker: Optional[Sequence[int]] = None) -> List[int]:
+    """
+    Computes the Ranked Pairs scores of all the candidates. The pairwise majorities are sorted
+    once by decreasing margin, then locked in this order unless they would create a cycle. The
+    transitive closure of the locked graph is kept as bitsets, so that checking for a cycle is a
+    single bit test. Majorities with the same margin are ordered by the tie breaker: (a, b) comes
+    before (c, d) if a is preferred to c, or if a = c and d is preferred to b.
+
+    :param net_preference: The net preference matrix.
+    :type net_preference: np.ndarray
+    :param tie_breaker: The candidates by order of preference, defaults to increasing candidate ids.
+    :type tie_breaker: Sequence[int], optional
+    :return: The score of each candidate, the number of candidates it is locked above.
+    :rtype: List[int]
+    """
+    num_candidates = len(net_preference)
+    priority = np.empty(num_candidates, dtype=np.int64)
+    priority[list(tie_breaker) if tie_breaker is not None else np.arange(num_candidates)] = \
+        np.arange(num_candidates)
+    winners, losers = np.nonzero(net_preference > 0)
+    order = np.lexsort((-priority[losers], priority[winners], -net_preference[winners, losers]))
+    # descendants[c] has bit d set if c is locked above d, ancestors[c] if d is locked above c
+    descendants = [0] * num_candidates
+    ancestors = [0] * num_candidates
+    for winner, loser in zip(winners[order].tolist(), losers[order].tolist()):
+        if (descendants[winner] >> loser) & 1 or (descendants[loser] >> winner) & 1:
+            # Already implied by the locked pairs, or would create a cycle
+            continue
+        above = ancestors[winner] | (1 << winner)
+        below = descendants[loser] | (1 << loser)
+        for candidate in _bits(above):
+            descendants[candidate] |= below
+        for candidate in _bits(below):
+            ancestors[candidate] |= above
+    return [bin(mask).count("1") for mask in descendants]
+
+
+def get_ranked_pairs(tie_breaker: Optional[Sequence[int]] = None) -> Callable[[Profile, int], int]:
+    """
+    Returns a callable function for the Ranked Pairs method with the specified tie breaker.
+
+    :param tie_breaker: The candidates by order of preference, defaults to increasing candidate ids.
+    :type tie_breaker: Sequence[int], optional
+    :return: A callable function for the Ranked Pairs method.
+    :rtype: Callable[[Profile, int], int]
+    """
+    key = ("ranked_pairs", None if tie_breaker is None else tuple(tie_breaker))
+
+    def ranked_pairs(profile: Profile, candidate: int) -> int:
+        """
+        Calculates the Ranked Pairs score for a candidate based on a profile, i.e., the number of
+        candidates it is locked above. The scores of all the candidates are computed at the first
+        call, and kept with the profile.
+
+        :param profile: The voting profile.
+        :type profile: VotingProfile
+        :param candidate: The base candidate for scoring.
+        :type candidate: int
+        :return: The Ranked Pairs score for the candidate.
+        :rtype: int
+        """
+        if key not in profile._cache:
+            profile._cache[key] = ranked_pairs_scores(profile._net_preference_matrix(), tie_breaker)
+        return profile._cache[key][candidate]
+
+    return ranked_pairs
+
+
+ranked_pairs_rule = get_ranked_pairs()
+ranked_pairs_rule.__name__ = "ranked_pairs_rule"
@@ -2,6 +2,8 @@
 Computes the Simpson score for a candidate.
 """
 
+import numpy as np
+from compsoc.pairwise import pairwise_tally
 from compsoc.profile import Profile
 
 
@@ -17,7 +19,10 @@ def simpson_rule(profile: Profile, candidate: int) -> int:
     :rtype: int
     """
     # Get pairwise scores
-    scores = [profile.get_net_preference(candidate, m) for m in
-              profile.candidates - {candidate}]
+    scores = np.delete(pairwise_tally(profile).row(candidate), candidate)
     # Return the minimum score in scores
-    return min(scores)
+    return int(scores.min())
+
+
+# The score of a candidate only depends on its own net preferences
+simpson_rule.local = True
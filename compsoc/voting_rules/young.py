@@ -0,0 +1,36 @@
+"""
+Computes the Young score for a candidate.
+"""
+from compsoc.dodgson import young_bounds, young_score
+from compsoc.profile import Profile
+
+
+def young_rule(profile: Profile, candidate: int) -> float:
+    """
+    Calculates the Young score for a candidate based on a profile, i.e., minus the smallest
+    number of voters to remove to make it a Condorcet winner. The score is exact, for small
+    instances.
+
+    :param profile: The voting profile.
+    :type profile: VotingProfile
+    :param candidate: The base candidate for scoring.
+    :type candidate: int
+    :return: The Young score for the candidate.
+    :rtype: float
+    """
+    return -young_score(profile, candidate)
+
+
+def young_approx_rule(profile: Profile, candidate: int) -> float:
+    """
+    Calculates an approximate Young score for a candidate in polynomial time, i.e., minus the
+    number of removed voters of a greedy solution (see compsoc.dodgson.young_bounds for its error).
+
+    :param profile: The voting profile.
+    :type profile: VotingProfile
+    :param candidate: The base candidate for scoring.
+    :type candidate: int
+    :return: The approximate Young score for the candidate.
+    :rtype: float
+    """
+    return -young_bounds(profile, candidate)[1]
@@ -9,10 +9,101 @@ import importlib
 import inspect
 import re
 
-from tqdm import trange
+from tqdm import tqdm
 
+from compsoc.adaptive import CRITERIA, max_half_width, run_adaptive
+from compsoc.aggregate import ResultAggregator
 from compsoc.plot import plot_comparison_results
-from compsoc.evaluate import evaluate_voting_rules
+from compsoc.evaluate import evaluate_voting_rules, summarize_telemetry
+from compsoc.trace import LEVELS, Tracer, set_tracer
+
+
+def print_telemetry(title, results):
+    """
+    Prints the per-rule telemetry summary of a series of iterations.
+    """
+    summary = summarize_telemetry(results)
+    print(f"\n{title}")
+    memory = all("peak_memory" in rule_summary for rule_summary in summary.values())
+    print(f"{'Rule':<24} {'Wall (s)':>10} {'Mean wall (s)':>14} {'CPU (s)':>10} {'Calls':>8}"
+          + (f" {'Peak mem (KiB)':>15}" if memory else ""))
+    for rule_name, rule_summary in sorted(summary.items(), key=lambda x: x[1]["wall_time"], reverse=True):
+        print(f"{rule_name:<24} {rule_summary['wall_time']:>10.4f} {rule_summary['mean_wall_time']:>14.6f} "
+              f"{rule_summary['cpu_time']:>10.4f} {rule_summary['calls']:>8}"
+              + (f" {rule_summary['peak_memory'] / 1024:>15.1f}" if memory else ""))
+
+
+def print_axioms(title, results):
+    """
+    Prints the per-rule rates of satisfaction of the axioms over a series of iterations.
+    """
+    print(f"\n{title}")
+    print(f"{'Rule':<24} {'Pareto':>8} {'Unanimity':>10}")
+    for rule_name in results.rules:
+        rates = [results.mean(rule_name, axiom) for axiom in ("pareto", "unanimity")]
+        print(f"{rule_name:<24} {rates[0]:>8.3f} {rates[1]:>10.3f}")
+
+
+def run_trials(args, distortion_ratio=0.0):
+    """
+    Runs the trials of a configuration, num_iterations of them, or with --adaptive until the
+    confidence intervals are narrower than the target width, and returns the aggregated trials.
+    """
+    progress = tqdm(total=args.num_iterations)
+
+    def trial(index):
+        progress.update()
+        return evaluate_voting_rules(args.num_candidates,
+                                     args.num_voters,
+                                     args.num_topn,
+                                     args.voters_model,
+                                     distortion_ratio=distortion_ratio,
+                                     verbose=args.verbose,
+                                     telemetry=args.telemetry,
+                                     memory=args.memory,
+                                     axioms=args.axioms,
+                                     seed=None if args.seed is None else args.seed + index)
+
+    # Results, aggregated as the iterations run
+    results = ResultAggregator()
+    with progress:
+        if args.adaptive is None:
+            for index in range(args.num_iterations):
+                results.add(trial(index))
+            return results
+        results, differences = run_adaptive(trial, args.adaptive, criterion=args.criterion,
+                                            min_trials=args.min_iterations, max_trials=args.num_iterations,
+                                            results=results)
+    watched = results if args.criterion == "means" else differences
+    print(f"\n{results.count(results.rules[0], 'top')} iterations, largest confidence interval of the "
+          f"{args.criterion}: {2 * max_half_width(watched):.4f}")
+    return results
+
+
+def run(args):
+    """
+    Runs the trials of the configuration, without and with distortion, and renders their figures.
+    """
+    results = run_trials(args)
+    plot_comparison_results(args.voters_model, results, args.num_voters, args.num_candidates,
+                            args.num_topn, results.count(results.rules[0], "top"),
+                            distortion_ratio=0.0, save_figure=True, encode=False)
+    if args.telemetry:
+        print_telemetry("Telemetry", results)
+    if args.axioms:
+        print_axioms("Axioms", results)
+
+    if args.distortion_ratio == 0.0:
+        return
+
+    results2 = run_trials(args, args.distortion_ratio)
+    plot_comparison_results(args.voters_model, results2, args.num_voters, args.num_candidates,
+                            args.num_topn, results2.count(results2.rules[0], "top"),
+                            distortion_ratio=args.distortion_ratio, save_figure=True, encode=False)
+    if args.telemetry:
+        print_telemetry(f"Telemetry with distortion ratio {args.distortion_ratio}", results2)
+    if args.axioms:
+        print_axioms(f"Axioms with distortion ratio {args.distortion_ratio}", results2)
 
 
 def main():
@@ -32,7 +123,7 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("num_candidates", type=int, help="Number of candidates")
     parser.add_argument("num_voters", type=int, help="Number of voters")
-    parser.add_argument("num_iterations", type=int, help="Number of iterations")
+    parser.add_argument("num_iterations", type=int, help="Number of iterations, the maximum one with --adaptive")
     parser.add_argument("num_topn", type=int, help="Top N.")
     parser.add_argument("distortion_ratio", type=float, help="Distort ratio")
     parser.add_argument("voters_model", type=str,
@@ -40,32 +131,34 @@ def main():
                         help=f"Model for the generation of voters: "
                              f"{', '.join(voters_model_distributions)}")
     parser.add_argument("-v", "--verbose", action="store_true",
-                        help="Increases output verbosity")
+                        help="Prints the ballots and the rankings")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Writes the events of the trials, profiles and rules to a JSONL file")
+    parser.add_argument("--trace-level", choices=LEVELS, default="info",
+                        help="debug also traces a sample of the ballots")
+    parser.add_argument("--ballot-rate", type=float, default=0.01,
+                        help="Fraction of the ballots traced at the debug level")
+    parser.add_argument("--max-ballots", type=int, default=100,
+                        help="Maximum number of ballots traced per profile and rule")
+    parser.add_argument("-t", "--telemetry", action="store_true",
+                        help="Records the time and calls of each rule")
+    parser.add_argument("-m", "--memory", action="store_true",
+                        help="Also records the peak memory of each rule, ranking once more with traced allocations")
+    parser.add_argument("-a", "--axioms", action="store_true",
+                        help="Checks Pareto optimality and unanimity of each rule")
+    parser.add_argument("--adaptive", type=float, metavar="WIDTH",
+                        help="Runs iterations until the 95%% confidence intervals are narrower than WIDTH")
+    parser.add_argument("--criterion", choices=CRITERIA, default="means",
+                        help="Intervals of the mean utilities of the rules, or of their pairwise differences")
+    parser.add_argument("--min-iterations", type=int, default=10,
+                        help="Minimum number of iterations with --adaptive")
+    parser.add_argument("--seed", type=int,
+                        help="Seed of the first iteration, the same profiles being used with and without distortion")
     args = parser.parse_args()
-    # Results
-    results = {}
-    for i in trange(args.num_iterations):
-        results[i] = evaluate_voting_rules(args.num_candidates,
-                                           args.num_voters,
-                                           args.num_topn,
-                                           args.voters_model,
-                                           verbose=True)
-    plot_comparison_results(args.voters_model, results, args.num_voters, args.num_candidates,
-                            args.num_topn, args.num_iterations, distortion_ratio=0.0, save_figure=True)
-    
-    if args.distortion_ratio == 0.0:
-        return
-
-    results2 = {}
-    for i in trange(args.num_iterations):
-        results2[i] = evaluate_voting_rules(args.num_candidates,
-                                           args.num_voters,
-                                           args.num_topn,
-                                           args.voters_model,
-                                           distortion_ratio=args.distortion_ratio,
-                                           verbose=True)
-    plot_comparison_results(args.voters_model, results2, args.num_voters, args.num_candidates,
-                            args.num_topn, args.num_iterations, distortion_ratio=args.distortion_ratio, save_figure=True)
+    args.telemetry = args.telemetry or args.memory
+    with Tracer(args.trace, LEVELS[args.trace_level], args.ballot_rate, args.max_ballots, args.seed) as tracer:
+        set_tracer(tracer)
+        run(args)
 
 
 if __name__ == "__main__":
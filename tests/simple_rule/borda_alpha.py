@@ -1,3 +1,5 @@
+import numpy as np
+
 from compsoc.profile import Profile
 from typing import Callable
 
@@ -23,8 +25,8 @@ def get_borda_alpha(alpha: float = 0.5) -> Callable[[int], float]:
         :return: The Borda alpha score for the candidate.
         :rtype: float
         """
-        scores = [pair[0] * (alpha ** pair[1].index(candidate))
-                  for pair in profile.pairs]
-        return sum(scores)
+        # Number of voters ranking the candidate at each position, shared by all the candidates
+        counts = profile.positional_counts[candidate]
+        return float(counts @ alpha ** np.arange(len(counts)))
 
     return borda_alpha
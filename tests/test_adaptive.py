@@ -0,0 +1,64 @@
+"""
+Test the adaptive trial counts.
+"""
+import random
+import unittest
+
+from compsoc.adaptive import max_half_width, paired_differences, run_adaptive
+from compsoc.aggregate import ResultAggregator, t_quantile
+
+
+def make_trial(noise, spread):
+    """
+    Returns synthetic trials: the rules share the noise of the profile, and differ by a little noise of their own.
+    """
+    def trial(index):
+        generator = random.Random(index)
+        profile = generator.gauss(0, noise)
+        return {rule: {"top": mean + profile + generator.gauss(0, spread), "topn": mean + profile}
+                for rule, mean in (("A", 10.), ("B", 11.), ("C", 12.))}
+
+    return trial
+
+
+class TestAdaptive(unittest.TestCase):
+    def test_t_quantile(self):
+        for degrees, quantile in ((5, 2.5706), (9, 2.2622), (30, 2.0423), (1000, 1.9623)):
+            self.assertAlmostEqual(t_quantile(0.975, degrees), quantile, delta=3e-3)
+
+    def test_half_width(self):
+        results = ResultAggregator([{"A": {"top": value}} for value in (1., 2., 3., 4.)])
+        self.assertAlmostEqual(results.half_width("A", "top"), t_quantile(0.975, 3) * results.std("A", "top") / 2)
+        self.assertEqual(ResultAggregator([{"A": {"top": 1.}}]).half_width("A", "top"), float("inf"))
+
+    def test_paired_differences(self):
+        differences = paired_differences({"A": {"top": 1., "topn": 2.}, "B": {"top": 3., "topn": 1.},
+                                          "C": {"top": 0., "topn": 0.}})
+        self.assertEqual(differences, {"A - B": {"top": -2., "topn": 1.}, "A - C": {"top": 1., "topn": 2.},
+                                       "B - C": {"top": 3., "topn": 1.}})
+
+    def test_stopping(self):
+        trial = make_trial(noise=5., spread=0.2)
+        results, differences = run_adaptive(trial, width=1., max_trials=2000)
+        trials = results.count("A", "top")
+        self.assertLess(trials, 2000)
+        self.assertLessEqual(2 * max_half_width(results), 1.)
+        self.assertEqual(differences.count("A - B", "top"), trials)
+        # The profile noise cancels out of the paired differences
+        paired, _ = run_adaptive(trial, width=1., criterion="differences", max_trials=2000)
+        self.assertLess(paired.count("A", "top"), trials / 10)
+        self.assertAlmostEqual(ResultAggregator([trial(i) for i in range(trials)]).mean("C", "top"),
+                               results.mean("C", "top"))
+
+    def test_caps(self):
+        trial = make_trial(noise=5., spread=0.2)
+        results, _ = run_adaptive(trial, width=1e-3, max_trials=30)
+        self.assertEqual(results.count("A", "top"), 30)
+        results, _ = run_adaptive(trial, width=1e3, min_trials=12)
+        self.assertEqual(results.count("A", "top"), 12)
+        with self.assertRaises(ValueError):
+            run_adaptive(trial, width=1., criterion="ranking")
+
+
+if __name__ == "__main__":
+    unittest.main()
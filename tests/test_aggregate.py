@@ -0,0 +1,82 @@
+"""
+Test the streaming aggregation of results and the plots of the summaries.
+"""
+import base64
+import math
+import os
+import random
+import statistics
+import tempfile
+import unittest
+
+import numpy as np
+
+from compsoc.aggregate import ResultAggregator
+from compsoc.plot import figure_name, plot_comparison_results, plot_summaries, plot_summary
+
+
+class TestAggregate(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.results = [{"A": {"top": random.random(), "topn": random.randint(0, 9), "name": "a"},
+                         "B": {"top": random.gauss(5, 2), "topn": random.random()}} for _ in range(50)]
+
+    def test_moments(self):
+        aggregator = ResultAggregator(self.results)
+        self.assertEqual(aggregator.rules, ["A", "B"])
+        for rule in ("A", "B"):
+            for metric in ("top", "topn"):
+                values = [result[rule][metric] for result in self.results]
+                self.assertEqual(aggregator.count(rule, metric), 50)
+                self.assertAlmostEqual(aggregator.mean(rule, metric), statistics.mean(values))
+                self.assertAlmostEqual(aggregator.variance(rule, metric), statistics.variance(values))
+                self.assertAlmostEqual(aggregator.total(rule, metric), sum(values))
+                self.assertEqual(aggregator.minimum(rule, metric), min(values))
+                self.assertEqual(aggregator.maximum(rule, metric), max(values))
+        # Non-numeric values are ignored
+        self.assertNotIn("name", aggregator.moments["A"])
+        summary = aggregator.summary(["top"])
+        self.assertEqual(set(summary["A"]), {"trials", "top_mean", "top_std"})
+        self.assertTrue(math.isnan(ResultAggregator(self.results[:1]).std("A", "top")))
+
+    def test_numpy_and_bool_values(self):
+        results = [{"A": {"calls": np.int64(3), "top": np.float32(0.5), "valid": True}},
+                   {"A": {"calls": np.int64(5), "top": np.float32(1.5), "valid": False}}]
+        aggregator = ResultAggregator(results)
+        self.assertEqual(aggregator.total("A", "calls"), 8)
+        self.assertEqual(aggregator.maximum("A", "calls"), 5)
+        self.assertEqual(aggregator.mean("A", "top"), 1.)
+        # Booleans are not aggregated as numbers
+        self.assertNotIn("valid", aggregator.moments["A"])
+
+    def test_merge(self):
+        merged = ResultAggregator(self.results[:20]).merge(ResultAggregator(self.results[20:]))
+        expected = ResultAggregator(self.results)
+        for rule in ("A", "B"):
+            self.assertEqual(merged.count(rule, "top"), 50)
+            self.assertAlmostEqual(merged.mean(rule, "top"), expected.mean(rule, "top"))
+            self.assertAlmostEqual(merged.variance(rule, "top"), expected.variance(rule, "top"))
+        self.assertEqual(ResultAggregator().merge(expected).summary(), expected.summary())
+
+    def test_plots(self):
+        results = {i: {rule: {"top": random.random(), "topn": random.random()} for rule in ("Borda", "Copeland")}
+                   for i in range(3)}
+        encoded = plot_comparison_results("random", results, 20, 4, 2, 3)
+        self.assertTrue(base64.b64decode(encoded).startswith(b"\x89PNG"))
+        # The results are not modified
+        self.assertNotIn("rule", results[0]["Borda"])
+        self.assertIsNone(plot_comparison_results("random", results, 20, 4, 2, 3, encode=False))
+        summary = ResultAggregator(results.values()).summary(["top", "topn"])
+        self.assertIsNone(plot_summary(summary, "random", 20, 4, 2, 3))
+        with tempfile.TemporaryDirectory() as directory:
+            configurations = [{"summary": summary, "voter_model": "random", "num_voters": 20, "num_candidates": 4,
+                               "num_topn": 2, "number_iterations": 3, "distortion_ratio": ratio}
+                              for ratio in (0.0, 0.5)]
+            paths = plot_summaries(configurations, directory, dpi=50)
+            self.assertEqual([os.path.basename(path) for path in paths],
+                             [figure_name("random", 20, 4, 3), figure_name("random", 20, 4, 3, 0.5)])
+            self.assertTrue(all(os.path.getsize(path) for path in paths))
+
+
+if __name__ == '__main__':
+    unittest.main()
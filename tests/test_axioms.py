@@ -0,0 +1,181 @@
+"""
+Test the axiom checkers.
+"""
+import unittest
+
+import numpy as np
+
+from compsoc.axioms import (_perturbed, axiom_sweep, check_anonymity, check_monotonicity, check_neutrality,
+                            check_participation, pareto_optimal, pareto_violations, perturbation_sweep,
+                            relabel_candidates, reorder_voters, unanimity)
+from compsoc.profile import Profile
+from compsoc.voting_rules.borda import borda_rule
+from compsoc.voting_rules.borda_random import borda_random_gamma
+from compsoc.voting_rules.copeland import copeland_rule
+from compsoc.voting_rules.simpson import simpson_rule
+
+
+def dictator_rule(profile: Profile, candidate: int) -> int:
+    # Candidate 0 always wins, whatever the ballots
+    return int(candidate == 0)
+
+
+class TestAxioms(unittest.TestCase):
+
+    def setUp(self):
+        self.profile = Profile({
+            (17, (1, 3, 2, 0)),
+            (40, (3, 0, 1, 2)),
+            (52, (1, 0, 2, 3)),
+            (20, (0, 1, 2, 3)),
+        })
+        self.rng = np.random.default_rng(0)
+
+    def test_relabel_candidates(self):
+        permutations = np.array([[2, 0, 3, 1], [0, 1, 2, 3]])
+        for permutation, relabeled in zip(permutations, relabel_candidates(self.profile, permutations)):
+            expected = Profile({(freq, tuple(int(permutation[c]) for c in ballot))
+                                for freq, ballot in self.profile.pairs})
+            self.assertEqual(relabeled.pairs, expected.pairs)
+            self.assertEqual(relabeled.net_preference_graph, expected.net_preference_graph)
+            self.assertEqual(relabeled.votes_per_candidate, expected.votes_per_candidate)
+            self.assertEqual(relabeled.score(borda_rule), expected.score(borda_rule))
+
+    def test_relabel_distorted_candidates(self):
+        self.profile.distort(0.5)
+        permutations = np.array([[3, 2, 1, 0]])
+        relabeled = relabel_candidates(self.profile, permutations)[0]
+        self.assertEqual(relabeled.pairs, {(17, (2, 0)), (40, (0, 3)), (52, (2, 3)), (20, (3, 2))})
+        self.assertEqual(relabeled.get_net_preference(2, 0), self.profile.get_net_preference(1, 3))
+
+    def test_reorder_voters(self):
+        orders = np.array([[3, 2, 1, 0]])
+        reordered = reorder_voters(self.profile, orders)[0]
+        self.assertEqual(reordered.pairs, list(reversed(list(self.profile.pairs))))
+        self.assertEqual(reordered.score(borda_rule), self.profile.score(borda_rule))
+
+    def test_neutrality(self):
+        self.assertEqual(check_neutrality(self.profile, borda_rule, 50, rng=self.rng), 0.)
+        self.assertEqual(check_neutrality(self.profile, copeland_rule, 50, outcome="scores", rng=self.rng), 0.)
+        self.assertGreater(check_neutrality(self.profile, dictator_rule, 50, rng=self.rng), 0.)
+
+    def test_anonymity(self):
+        self.assertEqual(check_anonymity(self.profile, borda_rule, 50, outcome="scores", rng=self.rng), 0.)
+        self.assertEqual(check_anonymity(self.profile, dictator_rule, 50, rng=self.rng), 0.)
+        # The decay is drawn at every call
+        self.assertGreater(check_anonymity(self.profile, borda_random_gamma, 50, outcome="scores",
+                                           rng=self.rng), 0.)
+
+    def test_axiom_sweep(self):
+        rates = axiom_sweep({"Borda": borda_rule, "Dictator": dictator_rule}, 4, 30, "random",
+                            num_profiles=3, num_permutations=20, distortion_ratio=0.5, seed=1)
+        self.assertEqual(rates["Borda"], {"anonymity": 0., "neutrality": 0.})
+        self.assertEqual(rates["Dictator"]["anonymity"], 0.)
+        self.assertGreater(rates["Dictator"]["neutrality"], 0.)
+
+
+def plurality_runoff_rule(profile: Profile, candidate: int) -> int:
+    # Runoff between the two plurality leaders, which is not monotonic
+    firsts = {c: sum(freq for freq, ballot in profile.pairs if ballot[0] == c) for c in profile.candidates}
+    finalists = sorted(profile.candidates, key=lambda c: (-firsts[c], c))[:2]
+    if candidate not in finalists:
+        return -1
+    other = finalists[1 - finalists.index(candidate)]
+    return int(profile.get_net_preference(candidate, other) > 0)
+
+
+class TestPerturbations(unittest.TestCase):
+
+    def setUp(self):
+        self.profile = Profile({
+            (17, (1, 3, 2, 0)),
+            (40, (3, 0, 1, 2)),
+            (52, (1, 0, 2, 3)),
+            (20, (0, 1, 2, 3)),
+        })
+
+    def test_perturbed_tallies(self):
+        # The delta updates match a profile built from the perturbed ballots
+        freqs = {ballot: freq for freq, ballot in self.profile.pairs}
+        perturbed = _perturbed(self.profile, freqs, self.profile._net_preference_matrix(),
+                               removed=(3, 0, 1, 2), added=(3, 1, 0, 2))
+        expected = Profile({(17, (1, 3, 2, 0)), (39, (3, 0, 1, 2)), (1, (3, 1, 0, 2)),
+                            (52, (1, 0, 2, 3)), (20, (0, 1, 2, 3))})
+        self.assertEqual(perturbed.pairs, expected.pairs)
+        self.assertEqual(perturbed.net_preference_graph, expected.net_preference_graph)
+        self.assertEqual(perturbed.votes_per_candidate, expected.votes_per_candidate)
+        self.assertEqual(perturbed.total_votes, 129)
+
+    def test_monotonic_rules(self):
+        for rule in (borda_rule, copeland_rule, simpson_rule):
+            checks, witnesses = check_monotonicity(self.profile, rule, max_steps=3)
+            self.assertGreater(checks, 0)
+            self.assertEqual(witnesses, [])
+
+    def test_non_monotonic_rule(self):
+        # 0 wins the runoff against 2; raising 0 above 2 in one ballot (2, 0, 1)
+        # makes 1 a finalist instead of 2, and 1 beats 0
+        profile = Profile({(2, (2, 0, 1)), (4, (2, 1, 0)), (5, (0, 2, 1)), (5, (1, 0, 2))})
+        self.assertEqual(profile.winners(plurality_runoff_rule), {0})
+        _, witnesses = check_monotonicity(profile, plurality_runoff_rule)
+        self.assertTrue(witnesses)
+        self.assertEqual(witnesses[0]["new_ballot"], (0, 2, 1))
+        self.assertEqual(witnesses[0]["new_winners"], {1})
+
+    def test_participation(self):
+        checks, witnesses = check_participation(self.profile, borda_rule)
+        self.assertEqual(checks, 2 * len(self.profile.pairs))
+        self.assertEqual(witnesses, [])
+
+    def test_perturbation_sweep(self):
+        report = perturbation_sweep([borda_rule], 4, 20, "random", num_profiles=5, seed=0)
+        self.assertGreater(report["borda_rule"]["monotonicity"]["checks"], 0)
+        self.assertEqual(report["borda_rule"]["monotonicity"]["violations"], 0)
+        self.assertEqual(report["borda_rule"]["participation"]["violations"], 0)
+
+
+class TestPareto(unittest.TestCase):
+
+    def setUp(self):
+        self.profile = Profile({
+            (17, (1, 3, 2, 0)),
+            (40, (3, 0, 1, 2)),
+            (52, (1, 0, 2, 3)),
+            (20, (0, 1, 2, 3)),
+        })
+
+    def test_pareto_dominance_matrix(self):
+        dominance = self.profile.pareto_dominance_matrix()
+        expected = {(a, b) for a in range(4) for b in range(4) if a != b and
+                    all(ballot.index(a) < ballot.index(b) for _, ballot in self.profile.pairs)}
+        self.assertEqual({tuple(pair) for pair in np.argwhere(dominance).tolist()}, expected)
+        self.assertEqual(expected, {(1, 2)})
+
+    def test_distorted_pareto_dominance_matrix(self):
+        self.profile.distort(0.5)
+        dominance = self.profile.pareto_dominance_matrix()
+        # Every voter ranks 1 or 0 while 2 is always missing
+        self.assertTrue(dominance[1, 2])
+        self.assertTrue(dominance[0, 2])
+        # No voter ranks 2, so 2 does not dominate itself
+        self.assertFalse(dominance[2, 2])
+        self.assertFalse(dominance[2].any())
+
+    def test_pareto_optimal(self):
+        ranking = self.profile.ranking(borda_rule)
+        self.assertTrue(pareto_optimal(self.profile, ranking))
+        self.assertEqual(pareto_violations(self.profile, ranking), [])
+        # 2 is dominated by 1
+        self.assertFalse(pareto_optimal(self.profile, [(2, 3), (1, 2), (0, 1), (3, 0)]))
+        self.assertEqual(pareto_violations(self.profile, [(2, 3), (1, 2), (0, 1), (3, 0)]), [(1, 2)])
+
+    def test_unanimity(self):
+        # Voters disagree on their first choice
+        self.assertTrue(unanimity(self.profile, [(2, 3), (1, 2), (0, 1), (3, 0)]))
+        profile = Profile({(3, (2, 0, 1)), (2, (2, 1, 0))})
+        self.assertTrue(unanimity(profile, profile.ranking(borda_rule)))
+        self.assertFalse(unanimity(profile, [(0, 1), (1, 1), (2, 0)]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Test the benchmark suite.
+"""
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from compsoc.benchmark import compare, main, run_benchmarks, run_import_benchmarks, time_import
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_run_benchmarks(self):
+        records = run_benchmarks([4], [20], repeat=2, pattern=r"^(profile|rule\.borda\.)")
+        names = {record["name"] for record in records}
+        self.assertEqual(names, {"profile.init", "profile.distort", "rule.borda.score",
+                                 "rule.borda.ranking", "rule.borda.winners"})
+        for record in records:
+            self.assertEqual((record["candidates"], record["voters"]), (4, 20))
+            self.assertEqual(len(record["times"]), 2)
+            self.assertLessEqual(record["min"], record["median"])
+
+    def test_over_budget_is_skipped(self):
+        # A negative budget puts every benchmark over budget at the smallest point
+        records = run_benchmarks([3, 4], [10, 20], repeat=1, budget=-1., pattern=r"^profile\.init$")
+        self.assertEqual([(r["candidates"], r["voters"]) for r in records], [(3, 10)])
+
+    def test_import_benchmarks(self):
+        records = run_import_benchmarks(["compsoc.profile"], repeat=2)
+        self.assertEqual([(r["name"], r["candidates"], r["voters"]) for r in records],
+                         [("import.compsoc.profile", 0, 0)])
+        self.assertEqual(len(records[0]["times"]), 2)
+
+    def test_lightweight_imports(self):
+        # Executing rules and evaluating them does not load the plotting and statistics libraries
+        for module in ("compsoc.profile", "compsoc.voting_rules.copeland", "compsoc.evaluate"):
+            self.assertEqual(time_import(module)["heavy"], [], module)
+        self.assertIn("matplotlib", time_import("compsoc.plot")["heavy"])
+
+    def test_compare(self):
+        baseline = [{"name": "a", "candidates": 5, "voters": 100, "median": 1.0},
+                    {"name": "b", "candidates": 5, "voters": 100, "median": 1.0}]
+        current = [{"name": "a", "candidates": 5, "voters": 100, "median": 1.1},
+                   {"name": "b", "candidates": 5, "voters": 100, "median": 1.5},
+                   {"name": "c", "candidates": 5, "voters": 100, "median": 1.0}]
+        comparisons = compare(baseline, current, threshold=0.2)
+        self.assertEqual([c["name"] for c in comparisons], ["a", "b", "c"])
+        self.assertEqual([c["status"] for c in comparisons], ["ok", "regression", "new"])
+        self.assertEqual([c["regression"] for c in comparisons], [False, True, False])
+
+    def test_compare_missing(self):
+        # Skipped after going over budget at a smaller grid point: flagged, not dropped
+        baseline = [{"name": "a", "candidates": 5, "voters": 100, "median": 1.0},
+                    {"name": "a", "candidates": 10, "voters": 100, "median": 2.0}]
+        current = [{"name": "a", "candidates": 5, "voters": 100, "median": 1.0}]
+        comparisons = compare(baseline, current)
+        self.assertEqual([c["status"] for c in comparisons], ["ok", "missing"])
+        self.assertTrue(comparisons[1]["regression"])
+        self.assertIsNone(comparisons[1]["current"])
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [os.path.join(directory, name) for name in ("baseline.json", "current.json")]
+            for path, records in zip(paths, (baseline, current)):
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump({"results": records}, f)
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                self.assertEqual(main(["compare", *paths]), 1)
+            self.assertIn("MISSING", output.getvalue())
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(main(["compare", paths[0], paths[0]]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Test the asynchronous client of the execute_rule API.
+"""
+import asyncio
+import json
+import threading
+import unittest
+
+import numpy as np
+
+from compsoc.client import ExecutionError, RuleClient, encode_request, execute_all, iter_pairs
+from compsoc.evaluate import get_rule_utility
+from compsoc.profile import Profile
+from compsoc.server import RuleServer
+from compsoc.voter_model import generate_random_votes
+from compsoc.voting_rules.borda import borda_rule
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+BORDA = """
+from compsoc.profile import Profile
+
+def borda_rule(profile: Profile, candidate: int) -> int:
+    top_score = len(profile.candidates) - 1
+    return sum(pair[0] * (top_score - pair[1].index(candidate)) for pair in profile.pairs)
+"""
+
+
+class TestEncoding(unittest.TestCase):
+    def test_encode_request(self):
+        profile = Profile(set(generate_random_votes(50, 5)))
+        body = json.loads(b"".join(encode_request(BORDA, profile, topn=2, chunk_pairs=3)))
+        self.assertEqual(body["code"], BORDA)
+        self.assertEqual((body["topn"], body["timeout"]), (2, 60))
+        self.assertEqual(sorted((pair["frequency"], tuple(pair["ballot"])) for pair in body["pairs"]),
+                         sorted(profile.pairs))
+
+    def test_pairs_from_arrays(self):
+        # The pairs of a profile built from arrays are read without creating profile.pairs
+        profile = Profile.from_arrays(np.array([[0, 1, 2], [2, 1, -1]]), np.array([3, 2]), np.array([4, 1]), 3)
+        self.assertEqual(list(iter_pairs(profile)), [{"frequency": 4, "ballot": [0, 1, 2]},
+                                                     {"frequency": 1, "ballot": [2, 1]}])
+        self.assertIsNone(profile._pairs)
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class TestClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = RuleServer(("127.0.0.1", 0), workers=2)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/execute_rule"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_execute_many(self):
+        profiles = [Profile(set(generate_random_votes(20, 4))) for _ in range(6)]
+        expected = [get_rule_utility(profile, borda_rule, 2) for profile in profiles]
+        for stream in (False, True):
+            results = execute_all([(BORDA, profile, 2) for profile in profiles], self.url, max_concurrency=3,
+                                  stream=stream)
+            self.assertEqual(results, expected)
+
+    def test_errors(self):
+        results = execute_all([(BORDA, [(1, (0, 1))], 1), ("def rule(:", [(1, (0, 1))], 1)], self.url)
+        self.assertEqual(results[0], {"top": 1.0, "topn": 1.0})
+        self.assertIsInstance(results[1], ExecutionError)
+        self.assertEqual(results[1].status, 400)
+
+    def test_retries(self):
+        # The transient statuses are retried, the other errors are not
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) < 3:
+                return httpx.Response(503, json={"detail": "Busy"})
+            return httpx.Response(200, json={"result": {"top": 1.0, "topn": 1.0}})
+
+        async def run(transport, retries):
+            async with RuleClient(self.url, retries=retries, backoff=0.001, transport=transport) as client:
+                return await client.execute(BORDA, [(1, (0, 1))])
+
+        self.assertEqual(asyncio.run(run(httpx.MockTransport(handler), 3)), {"top": 1.0, "topn": 1.0})
+        self.assertEqual(len(calls), 3)
+        calls.clear()
+        with self.assertRaises(ExecutionError) as error:
+            asyncio.run(run(httpx.MockTransport(handler), 1))
+        self.assertEqual((error.exception.status, error.exception.detail), (503, "Busy"))
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
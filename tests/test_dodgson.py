@@ -0,0 +1,114 @@
+"""
+Test the Dodgson and Young scores.
+"""
+import itertools
+import math
+import random
+import unittest
+
+import numpy as np
+
+from compsoc.dodgson import dodgson_bounds, dodgson_score, young_bounds, young_score
+from compsoc.profile import Profile
+from compsoc.voter_model import get_profile_from_model
+from compsoc.voting_rules.dodgson import dodgson_approx_rule, dodgson_rule
+from compsoc.voting_rules.young import young_approx_rule, young_rule
+
+
+def is_condorcet_winner(ballots, candidate, num_candidates):
+    wins = {}
+    for ballot in ballots:
+        if candidate in ballot:
+            position = ballot.index(candidate)
+            for i, other in enumerate(ballot):
+                wins[other] = wins.get(other, 0) + (1 if i > position else -1 if i < position else 0)
+    return all(wins.get(other, 0) > 0 for other in range(num_candidates) if other != candidate)
+
+
+def naive_dodgson(ballots, candidate, num_candidates):
+    """
+    Tries every number of swaps of the candidate in every ballot.
+    """
+    best = math.inf
+    moves = [range(ballot.index(candidate) + 1) if candidate in ballot else [0] for ballot in ballots]
+    for depths in itertools.product(*moves):
+        swapped = []
+        for ballot, depth in zip(ballots, depths):
+            if depth:
+                p = ballot.index(candidate)
+                ballot = ballot[:p - depth] + (candidate,) + ballot[p - depth:p] + ballot[p + 1:]
+            swapped.append(ballot)
+        if sum(depths) < best and is_condorcet_winner(swapped, candidate, num_candidates):
+            best = sum(depths)
+    return best
+
+
+def naive_young(ballots, candidate, num_candidates):
+    """
+    Tries every subset of voters to remove.
+    """
+    for removed in range(len(ballots)):
+        for kept in itertools.combinations(ballots, len(ballots) - removed):
+            if is_condorcet_winner(kept, candidate, num_candidates):
+                return removed
+    return math.inf
+
+
+class TestDodgson(unittest.TestCase):
+    def setUp(self):
+        self.profile = Profile({(1, (2, 1, 0, 3)), (2, (2, 3, 0, 1)), (1, (3, 2, 0, 1))})
+
+    def test_dodgson(self):
+        # Candidate 0 has to gain 3 voters over 2 and 2 over 3: moving it to the top of the two
+        # (2, 3, 0, 1) ballots and above 2 in the two other ballots costs 5 swaps
+        self.assertEqual(dodgson_score(self.profile, 0), 5)
+        self.assertEqual(dodgson_bounds(self.profile, 0), (5, 6))
+        self.assertEqual([dodgson_score(self.profile, c) for c in range(4)], [5, 7, 0, 2])
+
+    def test_young(self):
+        # Candidate 0 is ranked below 2 in every ballot
+        self.assertEqual([young_score(self.profile, c) for c in range(4)], [math.inf, math.inf, 0, 3])
+
+    def test_against_naive(self):
+        random.seed(0)
+        for _ in range(50):
+            num_candidates = random.randint(3, 4)
+            ballots = []
+            for _ in range(random.randint(1, 6)):
+                ballot = random.sample(range(num_candidates), num_candidates)
+                ballots.append(tuple(ballot[:random.randint(1, num_candidates)]))
+            pairs = {(ballots.count(ballot), ballot) for ballot in ballots}
+            profile = Profile(pairs, num_candidates=num_candidates)
+            for candidate in range(num_candidates):
+                score = dodgson_score(profile, candidate)
+                self.assertEqual(score, naive_dodgson(ballots, candidate, num_candidates))
+                lower, upper = dodgson_bounds(profile, candidate)
+                self.assertTrue(lower <= score <= upper)
+                score = young_score(profile, candidate)
+                self.assertEqual(score, naive_young(ballots, candidate, num_candidates))
+                lower, upper = young_bounds(profile, candidate)
+                self.assertTrue(lower <= score <= upper)
+
+    def test_max_nodes(self):
+        with self.assertRaises(ValueError):
+            dodgson_score(self.profile, 0, max_nodes=1)
+
+    def test_rules(self):
+        # Memphis (0), Nashville (1), Chattanooga (2), Knoxville (3): Nashville is the Condorcet winner
+        profile = Profile({(42, (0, 1, 2, 3)), (26, (1, 2, 3, 0)), (15, (2, 3, 1, 0)), (17, (3, 2, 1, 0))})
+        for rule in (dodgson_rule, dodgson_approx_rule, young_rule, young_approx_rule):
+            self.assertEqual(profile.winners(rule), {1})
+            self.assertEqual(profile.score(rule)[1], (1, 0))
+
+    def test_approximation_scale(self):
+        np.random.seed(0)
+        profile = get_profile_from_model(30, 2000, "random")
+        for candidate in range(3):
+            lower, upper = dodgson_bounds(profile, candidate)
+            self.assertLessEqual(lower, upper)
+            lower, upper = young_bounds(profile, candidate)
+            self.assertLessEqual(lower, upper)
+
+
+if __name__ == '__main__':
+    unittest.main()
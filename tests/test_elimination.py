@@ -0,0 +1,98 @@
+"""
+Test the elimination engine and rules.
+"""
+import unittest
+
+import numpy as np
+
+from compsoc.elimination import EliminationState
+from compsoc.profile import Profile
+from compsoc.voter_model import get_profile_from_model
+from compsoc.voting_rules.baldwin import baldwin_rule
+from compsoc.voting_rules.coombs import coombs_rule
+from compsoc.voting_rules.irv import irv_rule
+from compsoc.voting_rules.nanson import nanson_rule
+
+
+def naive_tallies(profile: Profile, eliminated: set):
+    """
+    First and last place tallies, restricting every ballot to the remaining candidates.
+    """
+    num_remaining = len(profile.candidates) - len(eliminated)
+    first, last = np.zeros(len(profile.candidates)), np.zeros(len(profile.candidates))
+    for freq, ballot in profile.pairs:
+        ballot = [c for c in ballot if c not in eliminated]
+        if ballot:
+            first[ballot[0]] += freq
+        if ballot and len(ballot) == num_remaining:
+            last[ballot[-1]] += freq
+    return first.tolist(), last.tolist()
+
+
+def naive_borda(profile: Profile, eliminated: set):
+    """
+    Borda scores among the remaining candidates, ranked candidates beating the missing ones.
+    """
+    scores = np.zeros(len(profile.candidates))
+    for freq, ballot in profile.pairs:
+        ballot = [c for c in ballot if c not in eliminated]
+        num_missing = len(profile.candidates) - len(eliminated) - len(ballot)
+        for i, candidate in enumerate(ballot):
+            scores[candidate] += freq * (len(ballot) - 1 - i + num_missing)
+    return scores.tolist()
+
+
+class TestElimination(unittest.TestCase):
+
+    def test_incremental_tallies(self):
+        np.random.seed(0)
+        for distortion_ratio in (0.0, 0.4, 0.8):
+            profile = get_profile_from_model(7, 200, "random")
+            profile.distort(distortion_ratio)
+            state = EliminationState(profile)
+            eliminated = set()
+            for losers in ([3], [0, 5], [6], [1]):
+                state.eliminate(losers)
+                eliminated.update(losers)
+                first, last = naive_tallies(profile, eliminated)
+                self.assertEqual(state.first_places.tolist(), first)
+                self.assertEqual(state.last_places.tolist(), last)
+                self.assertEqual(state.borda_scores().tolist(),
+                                 [0 if c in eliminated else s for c, s in enumerate(naive_borda(profile, eliminated))])
+
+    def test_irv(self):
+        # 0 has the most first places, but 2 is eliminated and its voters move to 1
+        profile = Profile({(8, (0, 1, 2)), (7, (1, 0, 2)), (4, (2, 1, 0))})
+        self.assertEqual(profile.ranking(irv_rule), [(1, 2), (0, 1), (2, 0)])
+        profile = Profile({(10, (0, 1, 2)), (5, (1, 0, 2)), (4, (2, 1, 0))})
+        self.assertEqual(profile.winners(irv_rule), {0})
+
+    def test_coombs(self):
+        # 0 is ranked last by the most voters (11), then 2 (15 out of 19)
+        profile = Profile({(8, (0, 1, 2)), (7, (1, 2, 0)), (4, (2, 1, 0))})
+        self.assertEqual(profile.score(coombs_rule), [(0, 0), (1, 2), (2, 1)])
+        # 0 has a majority of first places and is never eliminated
+        profile = Profile({(10, (0, 1, 2)), (9, (1, 2, 0))})
+        self.assertEqual(profile.winners(coombs_rule), {0})
+
+    def test_baldwin_and_nanson(self):
+        # Borda scores 0: 42 * 3 = 126, 1: 194, 2: 173, 3: 107
+        profile = Profile({(42, (0, 1, 2, 3)), (26, (1, 2, 3, 0)), (15, (2, 3, 1, 0)), (17, (3, 2, 1, 0))})
+        self.assertEqual(profile.score(baldwin_rule), [(0, 1), (1, 3), (2, 2), (3, 0)])
+        # 0 and 3 are below average, then 1 beats 2
+        self.assertEqual(profile.score(nanson_rule), [(0, 0), (1, 2), (2, 1), (3, 0)])
+
+    def test_condorcet_winner(self):
+        # Baldwin and Nanson always elect the Condorcet winner
+        np.random.seed(1)
+        for _ in range(10):
+            profile = get_profile_from_model(6, 51, "random")
+            net_preference = profile._net_preference_matrix()
+            winners = np.flatnonzero((net_preference > 0).sum(axis=1) == 5)
+            if len(winners):
+                self.assertEqual(profile.winners(baldwin_rule), {int(winners[0])})
+                self.assertEqual(profile.winners(nanson_rule), {int(winners[0])})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Test the evaluation functions.
+"""
+import tracemalloc
+import unittest
+
+import numpy as np
+
+from compsoc.evaluate import get_rule_utility, evaluate_voting_rules, summarize_telemetry, \
+    voter_subjective_utility_for_elected_candidate
+from compsoc.profile import Profile
+from compsoc.voting_rules.borda import borda_rule
+
+
+class TestEvaluate(unittest.TestCase):
+
+    def setUp(self):
+        self.profile = Profile({
+            (3, (0, 1, 2)),
+            (2, (1, 0, 2)),
+            (1, (2, 0, 1))
+        })
+
+    def test_rule_utility_without_telemetry(self):
+        utility = get_rule_utility(self.profile, borda_rule, 1)
+        self.assertEqual(set(utility), {"top", "topn"})
+
+    def test_rule_utility_distorted(self):
+        profile = Profile({(3, (0, 1)), (2, (1,)), (1, (2, 0, 1)), (4, (3, 2))}, num_candidates=4, distorted=True)
+        elected = [c for c, _ in profile.ranking(borda_rule)]
+        expected = [0., 0.]
+        for freq, ballot in profile.pairs:
+            u, u_n = voter_subjective_utility_for_elected_candidate(elected, ballot, topn=2)
+            expected[0] += freq * u
+            expected[1] += freq * u_n
+        utility = get_rule_utility(profile, borda_rule, 2)
+        self.assertAlmostEqual(utility["top"], expected[0])
+        self.assertAlmostEqual(utility["topn"], expected[1])
+
+    def test_rule_utility_with_telemetry(self):
+        utility = get_rule_utility(self.profile, borda_rule, 1, telemetry=True)
+        # Utilities are unchanged by the instrumentation
+        self.assertEqual(utility["top"], 4.666666666666666)
+        self.assertEqual(utility["topn"], 4.666666666666666)
+        # One call into the scorer per candidate
+        self.assertEqual(utility["calls"], 3)
+        self.assertGreaterEqual(utility["wall_time"], 0.)
+        self.assertGreaterEqual(utility["cpu_time"], 0.)
+        # The memory is only measured on request
+        self.assertNotIn("peak_memory", utility)
+
+    def test_rule_utility_with_memory(self):
+        tracing = []
+
+        def traced_rule(profile, candidate):
+            tracing.append(tracemalloc.is_tracing())
+            return borda_rule(profile, candidate)
+
+        utility = get_rule_utility(self.profile, traced_rule, 1, telemetry=True, memory=True)
+        # The times and calls come from an untraced ranking, the memory from a traced one
+        self.assertEqual(tracing, [False] * 3 + [True] * 3)
+        self.assertEqual(utility["calls"], 3)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_memory_cold_cache(self):
+        def caching_rule(profile, candidate):
+            # Computes and caches 10 ** 6 bytes of scores at the first call
+            if "caching_rule" not in profile._cache:
+                profile._cache["caching_rule"] = np.ones(125000, dtype=np.int64)
+            return int(profile._cache["caching_rule"][candidate])
+
+        first = get_rule_utility(self.profile, caching_rule, 1, memory=True)
+        # The cache of the profile is already filled, but not the one of the measured copy
+        second = get_rule_utility(self.profile, caching_rule, 1, memory=True)
+        for utility in (first, second):
+            self.assertGreaterEqual(utility["peak_memory"], 10 ** 6)
+
+    def test_rule_utility_with_axioms(self):
+        utility = get_rule_utility(self.profile, borda_rule, 1, axioms=True)
+        self.assertEqual(utility["pareto"], 1.)
+        self.assertEqual(utility["unanimity"], 1.)
+
+    def test_seed(self):
+        # The same seed gives the same profile, hence the same results
+        results = [evaluate_voting_rules(5, 30, 2, "random", seed=seed) for seed in (7, 8, 7)]
+        self.assertEqual(results[0], results[2])
+        self.assertNotEqual(results[0], results[1])
+
+    def test_summarize_telemetry(self):
+        results = {i: evaluate_voting_rules(4, 20, 2, "random", telemetry=True) for i in range(3)}
+        summary = summarize_telemetry(results)
+        self.assertEqual(set(summary), set(results[0]))
+        for rule_summary in summary.values():
+            self.assertEqual(rule_summary["trials"], 3)
+            self.assertEqual(rule_summary["calls"], 3 * 4)
+            self.assertAlmostEqual(rule_summary["mean_wall_time"], rule_summary["wall_time"] / 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Test the multiwinner committee rules.
+"""
+import time
+import unittest
+
+import numpy as np
+
+from compsoc.multiwinner import bloc, chamberlin_courant, get_committee_rule, pav, sntv
+from compsoc.profile import Profile
+from compsoc.voter_model import get_profile_from_model
+
+
+class TestMultiwinner(unittest.TestCase):
+    def setUp(self):
+        self.profile = Profile({(6, (0, 1, 2, 3)), (5, (1, 0, 2, 3)), (4, (2, 3, 1, 0)), (2, (3, 2, 0, 1))})
+
+    def test_sntv(self):
+        self.assertEqual(sntv(self.profile, 2), [0, 1])
+        self.assertEqual(sntv(self.profile, 3), [0, 1, 2])
+
+    def test_bloc(self):
+        # Top 2 positions: 0 -> 11, 1 -> 11, 2 -> 6, 3 -> 6
+        self.assertEqual(bloc(self.profile, 2), [0, 1])
+
+    def test_chamberlin_courant(self):
+        # Greedy takes the best single representative 1 (31), then 2 (43 in total), while the
+        # optimal committee is {0, 2} (44)
+        self.assertEqual(chamberlin_courant(self.profile, 2), [1, 2])
+        self.assertEqual(chamberlin_courant(self.profile, 2, exact=True), [0, 2])
+
+    def test_pav(self):
+        self.assertEqual(sorted(pav(self.profile, 2, approval_depth=1)), [0, 1])
+        self.assertEqual(pav(self.profile, 2, approval_depth=2, exact=True), [0, 2])
+
+    def test_greedy_close_to_exact(self):
+        # The greedy committee reaches at least 1 - 1/e of the optimum
+        np.random.seed(0)
+        profile = get_profile_from_model(8, 50, "multinomial_dirichlet")
+        counts = profile._ballot_arrays()[2]
+        positions = profile._positions()
+        utilities = np.where(positions < 8, 7 - positions, 0)
+        for k in (2, 3):
+            greedy = chamberlin_courant(profile, k)
+            exact = chamberlin_courant(profile, k, exact=True)
+            self.assertEqual(len(set(greedy)), k)
+            value = counts @ utilities[:, greedy].max(axis=1)
+            optimum = counts @ utilities[:, exact].max(axis=1)
+            self.assertGreaterEqual(value, (1 - 1 / np.e) * optimum)
+
+    def test_exact_limit(self):
+        with self.assertRaises(ValueError):
+            pav(self.profile, 2, exact=True, max_committees=5)
+
+    def test_committee_rule(self):
+        rule = get_committee_rule(chamberlin_courant, 2)
+        self.assertEqual(self.profile.ranking(rule)[:2], [(1, 2), (2, 1)])
+
+    def test_large(self):
+        np.random.seed(0)
+        profile = get_profile_from_model(200, 2000, "random")
+        start = time.perf_counter()
+        for method in (sntv, bloc, chamberlin_courant, pav):
+            self.assertEqual(len(set(method(profile, 20))), 20)
+        self.assertLess(time.perf_counter() - start, 10.)
+
+
+if __name__ == '__main__':
+    unittest.main()
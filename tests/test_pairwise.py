@@ -0,0 +1,86 @@
+"""
+Test the sparse and dense pairwise tallies.
+"""
+import random
+import unittest
+
+import numpy as np
+
+from compsoc.pairwise import pair_density, pairwise_tally
+from compsoc.profile import Profile
+from compsoc.tournament import condorcet_loser, condorcet_winner, copeland_scores, simpson_scores
+from compsoc.voting_rules.copeland import copeland_rule
+from compsoc.voting_rules.simpson import simpson_rule
+
+
+def naive_net_preference(pairs, num_candidates, unranked_below):
+    net_preference = np.zeros((num_candidates, num_candidates), dtype=np.int64)
+    for count, ballot in pairs:
+        for a in range(num_candidates):
+            for b in range(num_candidates):
+                if a in ballot and b in ballot:
+                    net_preference[a, b] += count * np.sign(ballot.index(b) - ballot.index(a))
+                elif unranked_below:
+                    net_preference[a, b] += count * ((a in ballot) - (b in ballot))
+    return net_preference
+
+
+class TestPairwise(unittest.TestCase):
+    def setUp(self):
+        self.pairs = {(3, (0, 1)), (2, (2,)), (4, (3, 0)), (1, (1, 4))}
+        self.profile = Profile(self.pairs, num_candidates=6, distorted=True)
+
+    def test_semantics(self):
+        tally = pairwise_tally(self.profile, sparse=True)
+        self.assertEqual(tally.row(0).tolist(), [0, 3, 0, -4, 0, 0])
+        # Ranked candidates beat the unranked ones: the 4 voters of (3, 0) prefer 0 to 1, and the 3
+        # voters of (0, 1) prefer 0 to 3
+        tally = pairwise_tally(self.profile, unranked_below=True, sparse=True)
+        self.assertEqual(tally.row(0).tolist(), [0, 6, 5, -1, 6, 7])
+        self.assertEqual(tally.row(2).tolist(), [-5, -2, 0, -2, 1, 2])
+
+    def test_against_naive(self):
+        random.seed(0)
+        for _ in range(100):
+            num_candidates = random.randint(2, 10)
+            pairs = set()
+            for _ in range(random.randint(1, 6)):
+                ballot = tuple(random.sample(range(num_candidates), random.randint(1, min(3, num_candidates))))
+                pairs.add((random.randint(1, 4), ballot))
+            for unranked_below in (False, True):
+                expected = naive_net_preference(pairs, num_candidates, unranked_below)
+                for sparse in (False, True):
+                    profile = Profile(pairs, num_candidates=num_candidates, distorted=True)
+                    tally = pairwise_tally(profile, unranked_below, sparse)
+                    self.assertEqual(tally.sparse, sparse)
+                    self.assertTrue((tally.to_dense() == expected).all())
+                    self.assertEqual(tally.copeland_scores().tolist(), copeland_scores(expected).tolist())
+                    self.assertEqual(tally.copeland_scores(0.5).tolist(), copeland_scores(expected, 0.5).tolist())
+                    self.assertEqual(tally.simpson_scores().tolist(), simpson_scores(expected).tolist())
+                    self.assertEqual(tally.condorcet_winner(), condorcet_winner(expected))
+                    self.assertEqual(tally.condorcet_loser(), condorcet_loser(expected))
+
+    def test_automatic_layout(self):
+        # 3 ballots of 2 candidates rank 6 ordered pairs together, out of 36
+        self.assertAlmostEqual(pair_density(self.profile), 6 / 36)
+        self.assertFalse(pairwise_tally(self.profile).sparse)
+        pairs = {(1, (c, c + 1)) for c in range(0, 100, 2)}
+        profile = Profile(pairs, num_candidates=100, distorted=True)
+        self.assertTrue(pairwise_tally(profile).sparse)
+        self.assertNotIn("support", profile._cache)
+        # Derived profiles keep their dense net preference matrix
+        profile._net_preference_matrix()
+        self.assertFalse(pairwise_tally(Profile(pairs, 100, True)._derive(
+            pairs, profile._net_preference_matrix(), profile.votes_per_candidate)).sparse)
+
+    def test_rules(self):
+        pairs = {(3, (c, (c + 1) % 50)) for c in range(50)} | {(1, (7, 3))}
+        profile = Profile(pairs, num_candidates=50, distorted=True)
+        expected = Profile(pairs, num_candidates=50, distorted=True)._net_preference_matrix()
+        self.assertTrue(pairwise_tally(profile).sparse)
+        self.assertEqual([score for _, score in profile.score(copeland_rule)], copeland_scores(expected).tolist())
+        self.assertEqual([score for _, score in profile.score(simpson_rule)], simpson_scores(expected).tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
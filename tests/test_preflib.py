@@ -0,0 +1,93 @@
+"""
+Test the PrefLib loader.
+"""
+import gzip
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from compsoc.preflib import parse_lines, read_preflib
+from compsoc.profile import Profile
+from compsoc.voting_rules.borda import borda_rule
+
+SOI = """# FILE NAME: 00000-00000001.soi
+# DATA TYPE: soi
+# NUMBER ALTERNATIVES: 4
+# ALTERNATIVE NAME 1: a
+# ALTERNATIVE NAME 2: b
+# ALTERNATIVE NAME 3: c
+# ALTERNATIVE NAME 4: d
+17: 2,4,3,1
+40: 4,1,2
+52: 2,1
+20: 1
+"""
+
+TOC = """# DATA TYPE: toc
+# NUMBER ALTERNATIVES: 4
+3: 1,{2,3},4
+2: 2,1,3,4
+1: {1,2,3,4}
+4: 1,{3,2},4
+"""
+
+
+class TestPreflib(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, text, compress=False):
+        path = os.path.join(self.directory.name, name)
+        with (gzip.open if compress else open)(path, "wt") as f:
+            f.write(text)
+        return path
+
+    def test_parse_lines(self):
+        counts, lengths, alternatives = parse_lines([b"7: 1,2,3", b"2: 3"])
+        self.assertEqual(counts.tolist(), [7, 2])
+        self.assertEqual(lengths.tolist(), [3, 1])
+        self.assertEqual(alternatives.tolist(), [0, 1, 2, 2])
+        counts, lengths, alternatives = parse_lines([b"3: 1,{2,3},4", b"1: 2,1"], ties=True)
+        self.assertEqual(lengths.tolist(), [1, 2])
+        self.assertEqual(alternatives.tolist(), [0, 1, 0])
+
+    def test_soi(self):
+        expected = Profile({(17, (1, 3, 2, 0)), (40, (3, 0, 1)), (52, (1, 0)), (20, (0,))}, num_candidates=4)
+        for compress in (False, True):
+            path = self.write("votes.soi" + (".gz" if compress else ""), SOI, compress)
+            # Chunks smaller than a line
+            for chunk_size in (7, 2 ** 24):
+                profile = read_preflib(path, chunk_size=chunk_size)
+                self.assertEqual(set(profile.pairs), expected.pairs)
+                self.assertEqual(profile.candidates, {0, 1, 2, 3})
+                self.assertEqual(profile.total_votes, 129)
+                self.assertEqual(profile.net_preference_graph, expected.net_preference_graph)
+                self.assertEqual(profile.votes_per_candidate, expected.votes_per_candidate)
+                self.assertEqual(profile.score(borda_rule), expected.score(borda_rule))
+
+    def test_toc(self):
+        # Ballots are cut before their first group of ties, and the all-tied ballot is dropped
+        profile = read_preflib(self.write("votes.toc", TOC))
+        self.assertEqual(set(profile.pairs), {(7, (0,)), (2, (1, 0, 2, 3))})
+
+    def test_soc(self):
+        np.random.seed(0)
+        ballots = [tuple(np.random.permutation(5).tolist()) for _ in range(200)]
+        lines = [f"{ballots.count(b)}: " + ",".join(str(c + 1) for c in b) for b in sorted(set(ballots))]
+        profile = read_preflib(self.write("votes.soc", "# NUMBER ALTERNATIVES: 5\n" + "\n".join(lines)))
+        expected = Profile.ballot_box(ballots)
+        self.assertEqual(set(profile.pairs), expected.pairs)
+        self.assertEqual(profile.net_preference_graph, expected.net_preference_graph)
+
+    def test_unknown_type(self):
+        with self.assertRaises(ValueError):
+            read_preflib(self.write("votes.txt", SOI))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,12 @@
+import os
+import tempfile
 import unittest
+
+import numpy as np
+
 from compsoc.profile import Profile
 from compsoc.voting_rules.borda import borda_rule
+from compsoc.voting_rules.irv import irv_rule
 
 
 class TestProfile(unittest.TestCase):
@@ -44,8 +50,123 @@ class TestProfile(unittest.TestCase):
         self.assertEqual(self.profile.winners(test_rule), expected_winners)
 
     def test_parse_voting_data(self):
-        # TODO: Implement this test.
-        pass
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "votes.soc")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("# NUMBER ALTERNATIVES: 4\n")
+                f.write("\n".join(f"{freq}: " + ",".join(str(c + 1) for c in ballot)
+                                   for freq, ballot in self.test_data))
+            profile = Profile.parse_voting_data(path)
+        self.assertEqual(set(profile.pairs), self.test_data)
+        self.assertEqual(profile.total_votes, 129)
+        self.assertEqual(profile.score(borda_rule), self.profile.score(borda_rule))
+
+    def test_ragged_ballots(self):
+        profile = Profile({(3, (0, 1)), (2, (1,)), (1, (2, 0, 1)), (4, (3, 2))}, num_candidates=4, distorted=True)
+        entries, offsets, counts = profile._ragged_ballots()
+        # One entry per ranked candidate, no padding
+        self.assertEqual(len(entries), 8)
+        ballots = {(int(count), tuple(entries[offsets[i]:offsets[i + 1]].tolist())) for i, count in enumerate(counts)}
+        self.assertEqual(ballots, profile.pairs)
+        self.assertEqual(profile.get_net_preference(0, 1), 4)
+        self.assertEqual(profile.get_net_preference(3, 2), 4)
+        self.assertEqual(profile.get_net_preference(2, 0), 1)
+        self.assertEqual(profile._positional_matrix()[:, 0].tolist(), [3, 2, 1, 4])
+        self.assertEqual(profile._positional_matrix()[:, 1].tolist(), [1, 3, 4, 0])
+
+    def test_array_api(self):
+        profile = Profile({(3, (0, 1)), (2, (1,)), (1, (2, 0, 1)), (4, (3, 2))}, num_candidates=4, distorted=True)
+        for ballot, length, count, positions in zip(profile.ballot_matrix, profile.ballot_lengths,
+                                                    profile.ballot_counts, profile.positions):
+            ranked = tuple(ballot[:length].tolist())
+            self.assertIn((count, ranked), profile.pairs)
+            self.assertTrue((ballot[length:] == -1).all())
+            self.assertEqual([positions[c] for c in ranked], list(range(length)))
+            self.assertEqual(sorted(positions[positions == 4].tolist() + list(range(length))),
+                             list(range(length)) + [4] * (4 - length))
+        self.assertEqual(profile.positional_counts.tolist(), profile._positional_matrix().tolist())
+        self.assertEqual(profile.pairwise_support[2, 0], 1)
+        self.assertEqual(profile.net_preferences[0, 1], profile.get_net_preference(0, 1))
+        # Read-only views of the arrays shared by the rules
+        for array in (profile.ballot_matrix, profile.positions, profile.positional_counts, profile.net_preferences):
+            with self.assertRaises(ValueError):
+                array[0] = 0
+        self.assertTrue(np.shares_memory(profile.positional_counts, profile._positional_matrix()))
+        self.assertTrue(profile._positional_matrix().flags.writeable)
+        top_score = len(self.profile.candidates) - 1
+        scores = self.profile.positional_counts @ np.arange(top_score, -1, -1)
+        self.assertEqual(list(enumerate(scores.tolist())), self.profile.score(borda_rule))
+        # From arrays, the ballot matrix is as wide as the longest ballot, the positions as the candidates
+        profile = Profile.from_arrays(np.array([[0, 1], [9, -1]]), np.array([2, 1]), np.array([3, 2]), 10)
+        self.assertEqual(profile.ballot_matrix.shape, (2, 2))
+        self.assertEqual(profile.positions.shape, (2, 10))
+
+    def test_no_ballot_matrix(self):
+        # Short ballots and one complete ballot: the padded matrix would be U x C
+        pairs = {(1, tuple(range(200)))} | {(2, (c, (c + 1) % 200, (c + 7) % 200)) for c in range(200)}
+        profile = Profile(pairs, num_candidates=200, distorted=True)
+        # The computations of the profile and of the elimination engine use the ragged ballots
+        profile.ranking(irv_rule)
+        self.assertEqual(len(profile.net_preference_graph), 200)
+        self.assertEqual(len(profile.votes_per_candidate), 200)
+        self.assertEqual(sorted(profile.ballot_lengths.tolist()), [3] * 200 + [200])
+        self.assertEqual(profile.ballot_counts.sum(), 401)
+        self.assertNotIn("ballots", profile._cache)
+        self.assertEqual(profile.ballot_matrix.shape, (201, 200))
+
+    def test_save_load(self):
+        self.profile.distort(0.5)
+        profile = Profile(self.profile.pairs, num_candidates=4, distorted=True)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.bin")
+            for matrices, mmap in ((False, True), (False, False), (True, True), (True, False)):
+                profile.save(path, matrices=matrices)
+                loaded = Profile.load(path, mmap=mmap)
+                self.assertEqual("support" in loaded._cache, matrices)
+                self.assertEqual(set(loaded.pairs), profile.pairs)
+                self.assertEqual(loaded.candidates, profile.candidates)
+                self.assertEqual(loaded.total_votes, profile.total_votes)
+                self.assertEqual(loaded.net_preference_graph, profile.net_preference_graph)
+                self.assertEqual(loaded.votes_per_candidate, profile.votes_per_candidate)
+                self.assertEqual(loaded.score(borda_rule), profile.score(borda_rule))
+                self.assertEqual(isinstance(loaded._ragged_ballots()[0], np.memmap), mmap)
+            del loaded
+
+    def test_save_size(self):
+        # Few short ballots over many candidates: the file does not grow with C x C
+        ballots = np.array([[0, 1, 2], [2999, 5, 7]])
+        profile = Profile.from_arrays(ballots, np.array([3, 3]), np.array([600, 400]), num_candidates=3000)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.bin")
+            profile.save(path)
+            self.assertEqual(os.path.getsize(path), profile.nbytes())
+            self.assertLess(os.path.getsize(path), 1024)
+            loaded = Profile.load(path)
+            self.assertEqual(loaded.pairwise_support[2999, 5], 400)
+            self.assertEqual(loaded.positional_counts[2, 2], 600)
+            del loaded
+        self.assertEqual(profile.nbytes(matrices=True), profile.nbytes() + 2 * 8 * 3000 * 3000)
+        # One complete ballot among 1000 short ones: the file holds the ranked entries, not U x C
+        entries = np.concatenate([np.arange(3000), np.arange(3000)[:3000]])
+        offsets = np.concatenate([[0, 3000], 3000 + 3 * np.arange(1, 1001)])
+        profile = Profile.from_ragged(entries, offsets, np.ones(1001, dtype=np.int64), num_candidates=3000)
+        self.assertLess(profile.nbytes(), 8 * (len(entries) + 2 * 1001 + 1) + 4 * 64)
+        self.assertNotIn("ballots", profile._cache)
+
+    def test_load_invalid(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.bin")
+            self.profile.save(path)
+            with open(path, "r+b") as f:
+                # Format version
+                f.seek(8)
+                f.write(b"\xff")
+            with self.assertRaises(ValueError):
+                Profile.load(path)
+            with open(path, "wb") as f:
+                f.write(b"17: 2,4,3,1")
+            with self.assertRaises(ValueError):
+                Profile.load(path)
 
     def test_ballot_box(self):
         choices = [
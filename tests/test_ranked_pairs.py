@@ -0,0 +1,55 @@
+"""
+Test the Ranked Pairs rule.
+"""
+import unittest
+
+import numpy as np
+
+from compsoc.profile import Profile
+from compsoc.voting_rules.ranked_pairs import get_ranked_pairs, ranked_pairs_rule, ranked_pairs_scores
+
+
+class TestRankedPairs(unittest.TestCase):
+
+    def test_tennessee(self):
+        # Memphis (0), Nashville (1), Chattanooga (2), Knoxville (3)
+        profile = Profile({
+            (42, (0, 1, 2, 3)),
+            (26, (1, 2, 3, 0)),
+            (15, (2, 3, 1, 0)),
+            (17, (3, 2, 1, 0)),
+        })
+        self.assertEqual(profile.ranking(ranked_pairs_rule), [(1, 3), (2, 2), (3, 1), (0, 0)])
+        self.assertEqual(profile.winners(ranked_pairs_rule), {1})
+
+    def test_cycle(self):
+        # 0 > 1 (5), 1 > 2 (3) are locked, 2 > 0 (1) would create a cycle
+        net_preference = np.array([[0, 5, -1], [-5, 0, 3], [1, -3, 0]])
+        self.assertEqual(ranked_pairs_scores(net_preference), [2, 1, 0])
+
+    def test_tie_breaker(self):
+        # A cycle where all margins are equal
+        net_preference = np.array([[0, 1, -1], [-1, 0, 1], [1, -1, 0]])
+        # (0, 1) is locked first, then (1, 2); (2, 0) would create a cycle
+        self.assertEqual(ranked_pairs_scores(net_preference), [2, 1, 0])
+        # (2, 0) is locked first, then (1, 2); (0, 1) would create a cycle
+        self.assertEqual(ranked_pairs_scores(net_preference, tie_breaker=[2, 1, 0]), [0, 2, 1])
+        profile = Profile({(1, (0, 1, 2)), (1, (1, 2, 0)), (1, (2, 0, 1))})
+        self.assertEqual(profile.winners(get_ranked_pairs([2, 1, 0])), {1})
+
+    def test_condorcet_winner_wins(self):
+        rng = np.random.default_rng(0)
+        margins = rng.integers(1, 50, (30, 30)) * rng.choice([-1, 1], (30, 30))
+        upper = np.triu(margins, 1)
+        net_preference = upper - upper.T
+        # 7 beats everyone
+        net_preference[7, :] = np.abs(net_preference[7, :])
+        net_preference[:, 7] = -net_preference[7, :]
+        scores = ranked_pairs_scores(net_preference)
+        self.assertEqual(int(np.argmax(scores)), 7)
+        # Without zero margins, the locked graph is a total order
+        self.assertEqual(sorted(scores), list(range(30)))
+
+
+if __name__ == "__main__":
+    unittest.main()
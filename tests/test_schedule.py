@@ -0,0 +1,75 @@
+"""
+Test the cost-aware scheduling of rule x profile tasks.
+"""
+import os
+import tempfile
+import time
+import unittest
+
+from compsoc.schedule import CostModel, lpt_assignment, run_schedule
+
+
+def sleep_task(task):
+    time.sleep(task[3])
+    return task[0]
+
+
+class TestSchedule(unittest.TestCase):
+    def test_cost_model(self):
+        model = CostModel()
+        self.assertAlmostEqual(model.predict("new", 20, 1000), 1e-3 * 4 * 10)
+        # A rule in C ** 3 * V
+        for c in (5, 10, 20):
+            for v in (100, 1000):
+                model.observe("cubic", c, v, 1e-6 * c ** 3 * v)
+        self.assertAlmostEqual(model.predict("cubic", 40, 10 ** 4) / (1e-6 * 40 ** 3 * 10 ** 4), 1., delta=0.05)
+        # A single run scales with the default exponents
+        model.observe("borda", 10, 100, 0.01)
+        self.assertAlmostEqual(model.predict("borda", 20, 100), 0.04, delta=1e-6)
+        # A rule without past runs gets the median of the others
+        self.assertAlmostEqual(model.predict("new", 10, 100), (model.predict("cubic", 10, 100) + 0.01) / 2)
+        model.observe_results({"copeland": {"top": 1., "wall_time": 0.5}, "other": {"top": 2.}}, 10, 100)
+        self.assertEqual(set(model.observations), {"cubic", "borda", "copeland"})
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "costs.json")
+            model.save(path)
+            loaded = CostModel.load(path)
+        self.assertEqual(loaded.observations, model.observations)
+        self.assertEqual(loaded.predict("cubic", 7, 300), model.predict("cubic", 7, 300))
+
+    def test_lpt_assignment(self):
+        queues = lpt_assignment([1., 5., 2., 4., 3., 3.], 3)
+        self.assertEqual(sorted(sum(queues, [])), list(range(6)))
+        self.assertEqual([sum([1., 5., 2., 4., 3., 3.][t] for t in queue) for queue in queues], [6., 6., 6.])
+
+    def test_run_schedule(self):
+        # One slow rule among fast ones, known from the past runs
+        model = CostModel()
+        model.observe("slow", 10, 100, 0.2)
+        model.observe("fast", 10, 100, 0.02)
+        tasks = [("fast", 10, 100, 0.02)] * 20 + [("slow", 10, 100, 0.2)]
+        results, report = run_schedule(tasks, sleep_task, 3, model)
+        self.assertEqual(results, [task[0] for task in tasks])
+        self.assertEqual(sum(w["tasks"] for w in report["workers"]), 21)
+        self.assertAlmostEqual(report["predicted_makespan"], 0.2, delta=1e-6)
+        self.assertLess(report["ratio"], 1.5)
+        self.assertEqual(len(model.observations["fast"]), 21)
+
+    def test_stealing(self):
+        # Wrong predictions: the tasks predicted equal are not, the idle workers steal
+        tasks = [("rule", 10, 100, 0.1 if i % 4 == 0 else 0.005) for i in range(24)]
+        _, report = run_schedule(tasks, sleep_task, 4)
+        self.assertGreater(sum(w["steals"] for w in report["workers"]), 0)
+        _, without = run_schedule(tasks, sleep_task, 4, steal=False)
+        self.assertEqual(sum(w["steals"] for w in without["workers"]), 0)
+
+    def test_errors(self):
+        def failing(task):
+            raise ValueError(task[0])
+
+        with self.assertRaises(ValueError):
+            run_schedule([("rule", 10, 100, None)] * 3, failing, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
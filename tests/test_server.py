@@ -0,0 +1,98 @@
+"""
+Test the local rule execution server.
+"""
+import json
+import threading
+import unittest
+from collections import OrderedDict
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from compsoc.server import RuleServer, SchemaError, _compiled, load_rule, parse_request
+
+PAIRS = [{"frequency": 5, "ballot": [1, 2, 3]},
+         {"frequency": 6, "ballot": [3, 2, 1]},
+         {"frequency": 6, "ballot": [1, 3, 2]}]
+
+BORDA = """
+from compsoc.profile import Profile
+
+def borda_rule(profile: Profile, candidate: int) -> int:
+    top_score = len(profile.candidates) - 1
+    return sum(pair[0] * (top_score - pair[1].index(candidate)) for pair in profile.pairs)
+"""
+
+
+class TestServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = RuleServer(("127.0.0.1", 0), workers=2)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def post(self, path, body):
+        request = Request(self.url + path, data=json.dumps(body).encode(), headers={"Content-Type": "application/json"})
+        try:
+            with urlopen(request) as response:
+                return response.status, json.loads(response.read())
+        except HTTPError as error:
+            return error.code, json.loads(error.read())
+
+    def test_execute_rule(self):
+        # The examples of the README
+        body = {"code": "def example_function(profile, candidate):\n return 42", "pairs": PAIRS, "topn": 1}
+        self.assertEqual(self.post("/execute_rule", body), (200, {"result": {"top": 13.0, "topn": 13.0}}))
+        body["code"] = BORDA
+        self.assertEqual(self.post("/execute_rule", body), (200, {"result": {"top": 15.0, "topn": 15.0}}))
+
+    def test_batch(self):
+        profiles = [PAIRS, PAIRS[:1], [{"frequency": 2, "ballot": [0, 1]}, {"frequency": 1, "ballot": [1, 0]}]]
+        status, body = self.post("/execute_rule_batch", {"code": BORDA, "profiles": profiles, "topn": 2})
+        self.assertEqual(status, 200)
+        expected = [self.post("/execute_rule", {"code": BORDA, "pairs": pairs, "topn": 2})[1]["result"]
+                    for pairs in profiles]
+        self.assertEqual(body["results"], expected)
+
+    def test_errors(self):
+        self.assertEqual(self.post("/execute_rule", {"code": BORDA, "pairs": []})[0], 422)
+        self.assertEqual(self.post("/execute_rule", {"code": BORDA, "pairs": PAIRS, "topn": 0})[0], 422)
+        self.assertEqual(self.post("/unknown", {})[0], 404)
+        status, body = self.post("/execute_rule", {"code": "def rule(profile, candidate):\n return 1 / 0",
+                                                   "pairs": PAIRS})
+        self.assertEqual(status, 400)
+        self.assertIn("ZeroDivisionError", body["detail"])
+
+    def test_timeout(self):
+        body = {"code": "def rule(profile, candidate):\n while True:\n  pass", "pairs": PAIRS, "timeout": 0.5}
+        self.assertEqual(self.post("/execute_rule", body)[0], 408)
+        # The stuck worker is replaced
+        for _ in range(3):
+            self.assertEqual(self.post("/execute_rule", {"code": BORDA, "pairs": PAIRS})[0], 200)
+
+    def test_compile_cache(self):
+        cache = OrderedDict()
+        code_object = _compiled(BORDA, cache, 2)
+        self.assertIs(_compiled(BORDA, cache, 2), code_object)
+        _compiled("x = 1", cache, 2)
+        _compiled("x = 2", cache, 2)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNot(_compiled(BORDA, cache, 2), code_object)
+        self.assertEqual(load_rule(code_object).__name__, "borda_rule")
+        with self.assertRaises(ValueError):
+            load_rule(_compiled("x = 1", cache, 2))
+
+    def test_parse_request(self):
+        code, profiles, topn, timeout = parse_request({"code": "", "pairs": PAIRS})
+        self.assertEqual((profiles[0][0], topn, timeout), ((5, (1, 2, 3)), 1, 60))
+        with self.assertRaises(SchemaError):
+            parse_request({"code": "", "pairs": [{"frequency": "5", "ballot": [1]}]})
+
+
+if __name__ == '__main__':
+    unittest.main()
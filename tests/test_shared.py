@@ -0,0 +1,92 @@
+"""
+Test the evaluation of rules on a profile in shared memory.
+"""
+import multiprocessing
+import unittest
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from compsoc.evaluate import get_rule_utility
+from compsoc.profile import Profile
+from compsoc.shared import SharedProfile, evaluate_rules_shared
+from compsoc.voter_model import generate_random_votes
+from compsoc.voting_rules.borda import borda_rule
+from compsoc.voting_rules.borda_gamma import get_borda_gamma
+from compsoc.voting_rules.copeland import copeland_rule
+from compsoc.voting_rules.simpson import simpson_rule
+
+
+def failing_rule(profile, candidate):
+    raise RuntimeError("Invalid rule")
+
+
+class TestShared(unittest.TestCase):
+    def setUp(self):
+        profile = Profile(set(generate_random_votes(200, 6)))
+        profile.distort(0.3)
+        self.profile = Profile(profile.pairs, num_candidates=6, distorted=True)
+
+    def assertReleased(self, name):
+        with self.assertRaises(FileNotFoundError):
+            SharedMemory(name=name)
+
+    def test_attach(self):
+        with SharedProfile(self.profile) as shared:
+            self.assertEqual(shared.nbytes, self.profile.nbytes(matrices=True))
+            profile = SharedProfile.attach(shared.name)
+            self.assertEqual(set(profile.pairs), set(self.profile.pairs))
+            self.assertEqual(profile.total_votes, self.profile.total_votes)
+            np.testing.assert_array_equal(profile.net_preferences, self.profile.net_preferences)
+            np.testing.assert_array_equal(profile.positional_counts, self.profile.positional_counts)
+            self.assertEqual(profile.ranking(borda_rule), self.profile.ranking(borda_rule))
+            # The arrays are read in place, and cannot be modified
+            self.assertFalse(profile._ragged_ballots()[0].flags.writeable)
+            del profile
+        self.assertTrue(shared.closed)
+        self.assertReleased(shared.name)
+        # Released when collected too
+        shared = SharedProfile(self.profile)
+        name = shared.name
+        del shared
+        self.assertReleased(name)
+
+    def test_matrices(self):
+        # Larger than the ballots: the workers compute the matrices from the ballots
+        profile = Profile.from_arrays(np.array([[0, 1], [9, 3]]), np.array([2, 2]), np.array([5, 2]), 10)
+        with SharedProfile(profile) as shared:
+            self.assertEqual(shared.nbytes, profile.nbytes())
+            attached = SharedProfile.attach(shared.name)
+            self.assertNotIn("support", attached._cache)
+            np.testing.assert_array_equal(attached.pairwise_support, profile.pairwise_support)
+            del attached
+
+    @unittest.skipIf("fork" not in multiprocessing.get_all_start_methods(), "Needs forked processes")
+    def test_evaluate(self):
+        gamma_rule = get_borda_gamma(0.5)
+        rules = [borda_rule, copeland_rule, simpson_rule, gamma_rule]
+        results = evaluate_rules_shared(self.profile, rules, 2, processes=2, context=multiprocessing.get_context("fork"))
+        self.assertEqual(list(results), [rule.__name__ for rule in rules])
+        for rule in rules:
+            self.assertEqual(results[rule.__name__], get_rule_utility(self.profile, rule, 2))
+
+    def test_errors(self):
+        # The block is released when a rule fails
+        names = []
+        original = SharedProfile.__init__
+
+        def init(shared, profile):
+            original(shared, profile)
+            names.append(shared.name)
+
+        SharedProfile.__init__ = init
+        try:
+            with self.assertRaises(RuntimeError):
+                evaluate_rules_shared(self.profile, [borda_rule, failing_rule], 1, processes=2)
+        finally:
+            SharedProfile.__init__ = original
+        self.assertReleased(names[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
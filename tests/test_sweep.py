@@ -0,0 +1,75 @@
+"""
+Test the sharded sweeps.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from compsoc.sweep import cell_seed, cells, main, make_grid, make_sweep, merge_shards, parse_shard, run_shard, \
+    shard_path, summarize
+
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.sweep = make_sweep(make_grid([3, 4], [15], ["random"], [0.0, 0.5]), trials=3, seed=1)
+
+    def test_cells(self):
+        self.assertEqual(parse_shard("1/3"), (1, 3))
+        for shard in ("3/3", "1", "a/b"):
+            with self.assertRaises(ValueError):
+                parse_shard(shard)
+        shards = [list(cells(self.sweep, i, 5)) for i in range(5)]
+        self.assertEqual(sorted(sum(shards, [])), list(cells(self.sweep)))
+        self.assertEqual(len(list(cells(self.sweep))), 4 * 3)
+        # The distorted trials reuse the profiles of the undistorted ones
+        self.assertEqual(cell_seed(self.sweep, 0, 2), cell_seed(self.sweep, 1, 2))
+        self.assertNotEqual(cell_seed(self.sweep, 0, 2), cell_seed(self.sweep, 2, 2))
+        self.assertNotEqual(cell_seed(self.sweep, 0, 1), cell_seed(self.sweep, 0, 2))
+
+    def test_merge(self):
+        with tempfile.TemporaryDirectory() as single, tempfile.TemporaryDirectory() as sharded:
+            run_shard(self.sweep, single)
+            for shard in range(3):
+                run_shard(self.sweep, sharded, shard, 3)
+            expected = summarize(*merge_shards(single))
+            self.assertEqual(summarize(*merge_shards(sharded)), expected)
+            self.assertEqual([c["summary"]["Borda"]["trials"] for c in expected], [3] * 4)
+            # An interrupted shard resumes from its complete lines
+            path = shard_path(sharded, 1, 3)
+            with open(path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+            with open(path, "w", encoding="utf-8") as f:
+                f.writelines(lines[:2] + [lines[2][:10]])
+            with self.assertRaises(ValueError):
+                merge_shards(sharded)
+            run_shard(self.sweep, sharded, 1, 3)
+            self.assertEqual(summarize(*merge_shards(sharded)), expected)
+            # Missing and foreign shards are rejected
+            os.remove(shard_path(sharded, 2, 3))
+            with self.assertRaises(ValueError):
+                merge_shards(sharded)
+            run_shard(make_sweep(self.sweep["configurations"], trials=3, seed=2), sharded, 2, 3)
+            with self.assertRaises(ValueError):
+                merge_shards(sharded)
+            with self.assertRaises(ValueError):
+                run_shard(self.sweep, sharded, 2, 3)
+
+    def test_processes(self):
+        arguments = ["--candidates", "3", "--voters", "10", "--distortions", "0", "0.5", "--trials", "2"]
+        with tempfile.TemporaryDirectory() as directory:
+            processes = [subprocess.Popen([sys.executable, "-m", "compsoc.sweep", "run", "--shard", f"{i}/2",
+                                           "--directory", directory] + arguments, stdout=subprocess.DEVNULL)
+                         for i in range(2)]
+            self.assertEqual([process.wait() for process in processes], [0, 0])
+            output = os.path.join(directory, "summary.json")
+            self.assertEqual(main(["merge", "--directory", directory, "--output", output]), 0)
+            with open(output, "r", encoding="utf-8") as f:
+                summaries = json.load(f)["configurations"]
+            self.assertEqual([c["distortion_ratio"] for c in summaries], [0.0, 0.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Test the tournament graph functions.
+"""
+import unittest
+
+import numpy as np
+
+from compsoc.profile import Profile
+from compsoc.tournament import (condorcet_loser, condorcet_winner, copeland_scores, schwartz_set,
+                                simpson_scores, smith_set)
+from compsoc.voting_rules.copeland import copeland_rule, get_copeland_alpha
+from compsoc.voting_rules.simpson import simpson_rule
+
+
+class TestTournament(unittest.TestCase):
+
+    def setUp(self):
+        self.profile = Profile({
+            (17, (1, 3, 2, 0)),
+            (40, (3, 0, 1, 2)),
+            (52, (1, 0, 2, 3)),
+            (20, (0, 1, 2, 3)),
+        })
+        self.net_preference = self.profile._net_preference_matrix()
+        # 0 > 1 > 2 > 0 is a cycle, and 3 loses against all
+        self.cycle = np.array([[0, 1, -1, 3],
+                               [-1, 0, 1, 3],
+                               [1, -1, 0, 3],
+                               [-3, -3, -3, 0]])
+
+    def test_copeland_scores(self):
+        self.assertEqual(copeland_scores(self.net_preference).tolist(),
+                         [score for _, score in self.profile.score(copeland_rule)])
+        # With a tie: 0 beats 2, ties with 1
+        net_preference = np.array([[0, 0, 2], [0, 0, 2], [-2, -2, 0]])
+        self.assertEqual(copeland_scores(net_preference, tie_credit=0.5).tolist(), [1.5, 1.5, 0.])
+        self.assertEqual([score for _, score in Profile({(1, (0, 1, 2)), (1, (1, 0, 2))}).score(
+            get_copeland_alpha(0.5))], [1.5, 1.5, 0.])
+
+    def test_simpson_scores(self):
+        self.assertEqual(simpson_scores(self.net_preference).tolist(),
+                         [score for _, score in self.profile.score(simpson_rule)])
+
+    def test_condorcet(self):
+        self.assertEqual(condorcet_winner(self.net_preference), 1)
+        self.assertEqual(condorcet_loser(self.net_preference), 3)
+        self.assertIsNone(condorcet_winner(self.cycle))
+        self.assertEqual(condorcet_loser(self.cycle), 3)
+
+    def test_smith_and_schwartz_sets(self):
+        self.assertEqual(smith_set(self.net_preference), {1})
+        self.assertEqual(schwartz_set(self.net_preference), {1})
+        self.assertEqual(smith_set(self.cycle), {0, 1, 2})
+        self.assertEqual(schwartz_set(self.cycle), {0, 1, 2})
+        # 0 and 1 tie and both beat 2: the Smith set keeps both, as does the Schwartz set
+        net_preference = np.array([[0, 0, 2], [0, 0, 2], [-2, -2, 0]])
+        self.assertEqual(smith_set(net_preference), {0, 1})
+        self.assertEqual(schwartz_set(net_preference), {0, 1})
+        # 0 beats 1, ties with 2, and 2 ties with 1: one unbeaten set {0, 2} in Schwartz
+        net_preference = np.array([[0, 2, 0], [-2, 0, 0], [0, 0, 0]])
+        self.assertEqual(smith_set(net_preference), {0, 1, 2})
+        self.assertEqual(schwartz_set(net_preference), {0, 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
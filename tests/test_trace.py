@@ -0,0 +1,96 @@
+"""
+Test the structured tracing of the evaluation.
+"""
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+from compsoc.evaluate import evaluate_voting_rules, get_rule_utility
+from compsoc.profile import Profile
+from compsoc.trace import DEBUG, INFO, Tracer, get_tracer, set_tracer
+from compsoc.voter_model import generate_random_votes
+from compsoc.voting_rules.borda import borda_rule
+
+
+def events(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+class TestTrace(unittest.TestCase):
+    def setUp(self):
+        self.profile = Profile(set(generate_random_votes(500, 5)))
+
+    def test_levels(self):
+        self.assertFalse(Tracer().enabled(DEBUG))
+        stream = io.StringIO()
+        tracer = Tracer(stream, level=INFO)
+        self.assertTrue(tracer.enabled(INFO))
+        self.assertFalse(tracer.enabled(DEBUG))
+        tracer.emit("kept", answer=42)
+        tracer.emit("dropped", DEBUG)
+        self.assertEqual([(e["event"], e["level"], e["answer"]) for e in events(stream)], [("kept", INFO, 42)])
+        tracer.close()
+        tracer.emit("closed")
+        self.assertEqual(len(events(stream)), 1)
+
+    def test_sampling(self):
+        tracer = Tracer(io.StringIO(), ballot_rate=0.1, max_ballots=20, seed=0)
+        samples = [tracer.sample(1000) for _ in range(50)]
+        self.assertTrue(all(len(sample) == 20 for sample in samples))
+        self.assertTrue(all(sample == sorted(set(sample)) for sample in samples))
+        self.assertAlmostEqual(sum(len(tracer.sample(50)) for _ in range(1000)) / 1000, 5, delta=0.5)
+        self.assertEqual(Tracer(io.StringIO(), ballot_rate=1., max_ballots=100).sample(7), list(range(7)))
+
+    def test_rule_events(self):
+        stream = io.StringIO()
+        result = get_rule_utility(self.profile, borda_rule, 2, tracer=Tracer(stream, DEBUG, ballot_rate=1., max_ballots=5))
+        rule_events = events(stream)
+        self.assertEqual(rule_events[0]["event"], "rule")
+        self.assertEqual((rule_events[0]["top"], rule_events[0]["topn"]), (result["top"], result["topn"]))
+        self.assertEqual(rule_events[0]["ranking"], [c for c, _ in self.profile.ranking(borda_rule)])
+        ballots = rule_events[1:]
+        self.assertEqual(len(ballots), 5)
+        for ballot in ballots:
+            self.assertIn((ballot["count"], tuple(ballot["ballot"])), self.profile.pairs)
+            self.assertEqual(ballot["rule"], borda_rule.__name__)
+
+    def _trace_trial(self, level, processes=None):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.jsonl")
+            with Tracer(path, level, ballot_rate=1., seed=0) as tracer:
+                previous = set_tracer(tracer)
+                try:
+                    self.assertIs(get_tracer(), tracer)
+                    result = evaluate_voting_rules(4, 30, 2, "random", seed=3, processes=processes)
+                finally:
+                    set_tracer(previous)
+            with open(path, "r", encoding="utf-8") as f:
+                return result, [json.loads(line) for line in f]
+
+    def test_trial_events(self):
+        result, trace = self._trace_trial(INFO)
+        self.assertEqual([e["event"] for e in trace], ["profile"] + ["rule"] * len(result) + ["trial"])
+        self.assertEqual(trace[0]["seed"], 3)
+        self.assertEqual(trace[-1]["top"], {name: r["top"] for name, r in result.items()})
+
+    @unittest.skipIf(multiprocessing.get_start_method() != "fork", "Needs forked processes")
+    def test_trial_events_processes(self):
+        # The rules evaluated by worker processes are traced by the parent process
+        result, trace = self._trace_trial(INFO, processes=2)
+        self.assertEqual([e["event"] for e in trace], ["profile"] + ["rule"] * len(result) + ["trial"])
+        self.assertEqual([e["rule"] for e in trace[1:-1]], list(result))
+        self.assertEqual(trace[-1]["top"], {name: r["top"] for name, r in result.items()})
+        # As are the sampled ballots, with the same utilities
+        _, sequential = self._trace_trial(DEBUG)
+        _, parallel = self._trace_trial(DEBUG, processes=2)
+        ballots = [e for e in parallel if e["event"] == "ballot" and "rule" in e]
+        self.assertTrue(ballots)
+        timeless = [[{k: v for k, v in e.items() if k not in ("time", "duration")} for e in trace]
+                    for trace in (sequential, parallel)]
+        self.assertEqual(timeless[1], timeless[0])
+
+if __name__ == "__main__":
+    unittest.main()
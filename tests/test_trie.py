@@ -0,0 +1,54 @@
+"""
+Test the ballot trie.
+"""
+import unittest
+
+import numpy as np
+
+from compsoc.evaluate import get_rule_utility
+from compsoc.profile import Profile
+from compsoc.voter_model import get_profile_from_model
+from compsoc.voting_rules.borda import borda_rule
+
+
+class TestBallotTrie(unittest.TestCase):
+    def setUp(self):
+        self.pairs = {(3, (0, 1, 2)), (2, (0, 1)), (1, (0, 2, 1)), (4, (2, 1, 0))}
+        self.profile = Profile(self.pairs, num_candidates=3, distorted=True)
+        self.trie = self.profile.ballot_trie()
+
+    def test_nodes(self):
+        # Root, 0, 2, 0-1, 0-2, 2-1, 0-1-2, 0-2-1, 2-1-0
+        self.assertEqual(self.trie.num_nodes, 9)
+        self.assertEqual(self.trie.levels.tolist(), [0, 1, 3, 6, 9])
+        self.assertEqual(self.trie.count[:3].tolist(), [10, 6, 4])
+        self.assertEqual(int(self.trie.terminal.sum()), 10)
+
+    def test_positional_matrix(self):
+        expected = self.profile._positional_matrix()
+        self.assertTrue((self.trie.positional_matrix() == expected).all())
+
+    def test_first_places(self):
+        self.assertEqual(self.trie.first_places().tolist(), [6, 0, 4])
+        # Without 0, the voters of (0, 1) and (0, 1, 2) move to 1, the one of (0, 2, 1) to 2
+        self.assertEqual(self.trie.first_places(np.array([True, False, False])).tolist(), [0, 5, 5])
+
+    def test_truncate(self):
+        ballots, lengths, counts = self.trie.truncate(1).to_arrays()
+        pairs = {(int(c), tuple(b[:n].tolist())) for b, n, c in zip(ballots, lengths, counts)}
+        self.assertEqual(pairs, {(6, (0,)), (4, (2,))})
+        np.random.seed(0)
+        profile = get_profile_from_model(6, 300, "random")
+        expected = {}
+        for count, ballot in profile.pairs:
+            expected[ballot[:3]] = expected.get(ballot[:3], 0) + count
+        truncated = Profile.from_arrays(*profile.ballot_trie().truncate(3).to_arrays(), num_candidates=6)
+        self.assertEqual(set(truncated.pairs), {(count, ballot) for ballot, count in expected.items()})
+
+    def test_utilities(self):
+        profile = Profile(self.pairs, num_candidates=3, distorted=True)
+        self.assertEqual(get_rule_utility(self.profile, borda_rule, 2), get_rule_utility(profile, borda_rule, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()